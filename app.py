@@ -1,13 +1,17 @@
 import streamlit as st
-import fastf1
-import fastf1.plotting
-from fastf1.ergast import Ergast
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
 import warnings
+from session_pool import SessionPool
+from session_store import pick_fastest
+from race_analytics import session_metrics, driver_metrics, driver_degradation
+import championship
+from simulation import simulate_championship, title_scenarios, DEFAULT_SEASONS, FASTEST_LAP_SEASONS
+from championship import season_progression
+from circuit import circuit_geometry
+from telemetry import (lap_speeds, speed_trap_summary, align_laps, delta_time, session_field_delta,
+                       session_corner_stats, corner_matrix, session_minisectors, minisector_dominance,
+                       DEFAULT_MINISECTORS)
 warnings.filterwarnings('ignore')
 
 # ==============================================================================
@@ -21,9 +25,38 @@ st.set_page_config(
 
 # Enable FastF1 Cache (Critical for speed)
 CACHE_DIR = "cache"
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
-fastf1.Cache.enable_cache(CACHE_DIR)
+
+# Distance grid (metres) used to align laps in the Telemetry Deep Dive
+TELEMETRY_RESOLUTION_M = 5.0
+# Max points per telemetry trace sent to the browser
+TELEMETRY_POINT_BUDGET = 600
+# Lap columns read by the Race Analysis dashboard (pick_fastest needs IsPersonalBest)
+DASHBOARD_LAP_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'LapTimeSec', 'IsPersonalBest', 'IsClean']
+
+# Keyed widgets of each main tab, kept in session state while the tab is not rendered
+TAB_WIDGETS = {
+    "Race Analysis": ["dash_year", "dash_event", "dash_session", "drivers_multi"],
+    "Telemetry Deep Dive": ["tel_driver1", "tel_driver2", "tel_lap1", "tel_lap2", "corner_metric", "dom_scope",
+                            "dom_group", "dom_segments"],
+    "Championship": ["hist_year"],
+    "Driver Comparison": ["comp_d1", "comp_d2"],
+}
+
+
+@st.cache_resource
+def fastf1_api():
+    """FastF1, imported on first use with its cache enabled (once per server process)."""
+    import fastf1
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fastf1.Cache.enable_cache(CACHE_DIR)
+    return fastf1
+
+
+@st.cache_resource
+def start_cache_warmer():
+    """Prefetch 2018-current championship data into the local store, once per server process."""
+    return championship.warm_in_background()
+
 
 # --- CSS: MODERN F1 THEME WITH ANIMATIONS ---
 st.markdown("""
@@ -359,42 +392,20 @@ st.markdown("""
 # 2. DATA ENGINE: DYNAMIC ANALYST SYSTEM
 # ==============================================================================
 
-@st.cache_data(ttl=86400)  # Cache for 24h
 def fetch_ergast_standings(year):
     """
-    Dynamically fetches full grid driver/team standings for ANY year using FastF1 Ergast API.
+    Full grid driver/team standings for ANY year, served from the local Ergast store
+    (fetched once per finished season). Raises ErgastUnavailable if neither is possible.
     """
-    ergast = Ergast()
-    try:
-        # Fetch Drivers
-        drivers = ergast.get_driver_standings(season=year)
-        d_df = drivers.content[0]
-        # Simplify Columns
-        d_simple = d_df[['position', 'givenName', 'familyName', 'constructorNames', 'points', 'wins']].copy()
-        d_simple['Driver'] = d_simple['givenName'] + " " + d_simple['familyName']
-        d_simple['Team'] = d_simple['constructorNames'].apply(lambda x: x[0] if len(x) > 0 else "N/A")
-        d_simple.rename(columns={'position': 'Pos', 'points': 'Points', 'wins': 'Wins'}, inplace=True)
-        d_simple = d_simple[['Pos', 'Driver', 'Team', 'Points', 'Wins']]
-
-        # Fetch Constructors
-        teams = ergast.get_constructor_standings(season=year)
-        t_df = teams.content[0]
-        t_simple = t_df[['position', 'constructorName', 'points', 'wins']].copy()
-        t_simple.rename(columns={'position': 'Pos', 'constructorName': 'Team', 'points': 'Points', 'wins': 'Wins'},
-                        inplace=True)
-
-        # Determine Champion
-        champ_driver = d_simple.iloc[0]['Driver']
-        champ_team = t_simple.iloc[0]['Team']
-
-        return {
-            'drivers': d_simple,
-            'teams': t_simple,
-            'champion_driver': champ_driver,
-            'champion_team': champ_team
-        }
-    except Exception as e:
-        return None
+    d_simple = championship.driver_standings(year)
+    t_simple = championship.constructor_standings(year)
+
+    return {
+        'drivers': d_simple,
+        'teams': t_simple,
+        'champion_driver': d_simple.iloc[0]['Driver'],
+        'champion_team': t_simple.iloc[0]['Team']
+    }
 
 
 def get_analyst_data(year):
@@ -446,16 +457,18 @@ def get_analyst_data(year):
         return fetch_ergast_standings(year)
 
 
-@st.cache_data
-def get_schedule(year):
-    """Fetches the official schedule."""
-    try:
-        schedule = fastf1.get_event_schedule(year, include_testing=False)
-        if not schedule.empty: return schedule
-    except:
-        pass
+def ergast_schedule(schedule):
+    """Schedule columns the app uses (FastF1 names) from an Ergast store schedule."""
+    frame = pd.DataFrame({'RoundNumber': schedule['Round'], 'EventName': schedule['RaceName'],
+                          'Location': schedule['Locality'], 'Country': schedule['Country'],
+                          'EventDate': schedule['Date']})
+    if 'Sprint' in schedule.columns:
+        frame['EventFormat'] = schedule['Sprint'].astype(bool).map({True: "sprint_qualifying", False: "conventional"})
+    return frame
 
-    # 2025 Fallback Calendar
+
+def fallback_schedule(year):
+    """Built-in calendar (2025 only) for when no schedule can be read."""
     if year == 2025:
         return pd.DataFrame({
             'RoundNumber': range(1, 25),
@@ -466,168 +479,158 @@ def get_schedule(year):
                           "Abu Dhabi GP"],
             'Location': ["Melbourne", "Shanghai", "Suzuka", "Sakhir", "Jeddah", "Miami", "Imola", "Monaco", "Barcelona",
                          "Montreal", "Spielberg", "Silverstone", "Spa", "Budapest", "Zandvoort", "Monza", "Baku",
-                         "Singapore", "Austin", "Mexico City", "Sao Paulo", "Las Vegas", "Lusail", "Yas Marina"]
+                         "Singapore", "Austin", "Mexico City", "Sao Paulo", "Las Vegas", "Lusail", "Yas Marina"],
+            'EventFormat': ["sprint_qualifying" if r in (2, 6, 13, 19, 21, 23) else "conventional" for r in range(1, 25)]
         })
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=600, show_spinner=False)
-def load_session_data(year, event, session_code):
-    """Load session data with telemetry - cached for speed"""
+@st.cache_data
+def official_schedule(year):
+    """Fetches the official schedule (FastF1, then the Ergast API)."""
     try:
-        session = fastf1.get_session(year, event, session_code)
-        session.load(telemetry=True, laps=True, weather=False)
-        return session
+        schedule = fastf1_api().get_event_schedule(year, include_testing=False)
+        if not schedule.empty: return schedule
     except:
-        return None
-
+        pass
 
-def get_color(driver, session):
     try:
-        return fastf1.plotting.get_driver_color(driver, session=session)
-    except:
-        return "#ffffff"
+        return ergast_schedule(championship.season_schedule(year))
+    except championship.ErgastUnavailable:
+        return fallback_schedule(year)
 
 
-def fmt_time(sec):
-    if pd.isna(sec): return ""
-    m, s = divmod(sec, 60)
-    return f"{int(m)}:{s:06.3f}"
+def get_schedule(year):
+    """
+    Schedule of a season. The local Ergast store answers first (no network,
+    no FastF1 import); FastF1 and the Ergast API are only asked once the
+    first page of a visit is out, until then the built-in calendar stands in.
+    """
+    stored = championship.stored_schedule(year)
+    if stored is not None:
+        return ergast_schedule(stored)
+    if st.session_state.get('page_rendered'):
+        return official_schedule(year)
+    return fallback_schedule(year)
 
 
-def calculate_tire_degradation(laps_df, driver):
-    """Calculate tire degradation rate per compound - optimized"""
-    try:
-        driver_laps = laps_df[laps_df['Driver'] == driver].copy()
-        
-        degradation_data = {}
-        compounds = driver_laps['Compound'].dropna().unique()
-        
-        for compound in compounds:
-            compound_laps = driver_laps[driver_laps['Compound'] == compound].copy()
-            compound_laps = compound_laps.dropna(subset=['LapTime'])
-            
-            if len(compound_laps) > 3:
-                times = compound_laps['LapTime'].dt.total_seconds()
-                
-                # Quick degradation calculation
-                if len(times) > 1:
-                    deg_rate = (times.iloc[-1] - times.iloc[0]) / len(times)
-                    degradation_data[compound] = {
-                        'rate': deg_rate,
-                        'laps': len(compound_laps),
-                        'avg_time': times.mean()
-                    }
-        
-        return degradation_data
-    except:
-        return {}
+@st.cache_data
+def run_title_simulation(standings, races, sprints, completed_races, fastest_lap, results):
+    """Monte Carlo title odds for the full grid (cached per standings snapshot)."""
+    return simulate_championship(standings, races, sprints, results=results, completed_races=completed_races,
+                                 fastest_lap=fastest_lap, seed=0)
 
 
-def analyze_sector_performance(laps_df, drivers):
-    """Analyze sector times for selected drivers - optimized"""
-    sector_data = {}
-    
+@st.cache_data
+def run_title_scenarios(standings, rounds, fastest_lap):
+    """Exact clinch / elimination status for the full grid (cached per standings snapshot)."""
+    return title_scenarios(standings, rounds, fastest_lap)
+
+
+def remaining_rounds(year, completed_races, total_races):
+    """[(round, has_sprint), ...] after round `completed_races`, from the event schedule."""
+    schedule = get_schedule(year)
+    sprints = set()
+    if 'EventFormat' in schedule.columns:
+        sprint_rows = schedule['EventFormat'].astype(str).str.contains('sprint')
+        sprints = set(schedule.loc[sprint_rows, 'RoundNumber'].astype(int))
+    return [(r, r in sprints) for r in range(completed_races + 1, total_races + 1)]
+
+
+@st.cache_resource
+def session_pool():
+    """Sessions shared by every user of this server process (see session_pool.py)."""
+    return SessionPool()
+
+
+def start_session_load(year, event, session_code):
+    """
+    Start (or join) the background load of a session into the shared pool:
+    results, then laps, then telemetry, each usable as soon as it is ready.
+    Returns the LoadJob to keep in st.session_state (see session_pool.py).
+    """
+    fastf1_api()
+    return session_pool().load_async(year, event, session_code)
+
+
+def sync_load_job():
+    """The user's background load (or None); its session becomes current once the laps are in."""
+    job = st.session_state.get("load_job")
+    if job is not None and job.handle is not None:
+        st.session_state.session_obj = job.handle
+    return job
+
+
+def show_load_progress(job, ready):
+    """Progress of a background load; reruns the page whenever a new tier is ready."""
+    st.progress(job.progress, text=job.message)
+    if job.done or len(job.ready) != ready:
+        st.rerun()
+
+
+# Poll the loader every second without rerunning the page (Streamlit versions
+# without fragments only refresh the progress on the next interaction)
+if hasattr(st, "fragment"):
+    show_load_progress = st.fragment(run_every=1)(show_load_progress)
+
+
+def current_session():
+    """The user's loaded session, from the shared pool (or None)."""
+    handle = st.session_state.session_obj
+    return handle.session if handle is not None else None
+
+
+def get_color(driver, session):
     try:
-        for driver in drivers:
-            driver_laps = laps_df[laps_df['Driver'] == driver].copy()
-            
-            # Get clean laps (no pit, no incidents)
-            clean_laps = driver_laps[
-                (driver_laps['IsAccurate'] == True) &
-                (driver_laps['PitOutTime'].isna())
-            ].copy()
-            
-            if len(clean_laps) > 0 and all(col in clean_laps.columns for col in ['Sector1Time', 'Sector2Time', 'Sector3Time']):
-                s1_times = clean_laps['Sector1Time'].dropna().dt.total_seconds()
-                s2_times = clean_laps['Sector2Time'].dropna().dt.total_seconds()
-                s3_times = clean_laps['Sector3Time'].dropna().dt.total_seconds()
-                
-                if len(s1_times) > 0 and len(s2_times) > 0 and len(s3_times) > 0:
-                    sector_data[driver] = {
-                        'S1': s1_times.min(),
-                        'S2': s2_times.min(),
-                        'S3': s3_times.min(),
-                        'S1_avg': s1_times.mean(),
-                        'S2_avg': s2_times.mean(),
-                        'S3_avg': s3_times.mean(),
-                    }
+        results = session.results
+        team_color = results.loc[results['Abbreviation'] == driver, 'TeamColor'].iloc[0]
+        if pd.notna(team_color) and team_color:
+            return f"#{str(team_color).lstrip('#')}"
     except:
         pass
-    
-    return sector_data
+    return "#ffffff"
 
 
-def get_stint_analysis(laps_df, driver):
-    """Analyze pit stop strategy and stint performance"""
-    driver_laps = laps_df[laps_df['Driver'] == driver].copy()
-    
-    stints = []
-    current_stint = []
-    
-    for idx, lap in driver_laps.iterrows():
-        current_stint.append(lap)
-        
-        # Check if next lap has pit stop
-        if not pd.isna(lap['PitInTime']):
-            if current_stint:
-                stint_df = pd.DataFrame(current_stint)
-                # Convert LapTime to seconds properly
-                lap_times = pd.to_timedelta(stint_df['LapTime']).dt.total_seconds()
-                stints.append({
-                    'compound': stint_df['Compound'].mode()[0] if len(stint_df['Compound'].mode()) > 0 else 'UNKNOWN',
-                    'laps': len(stint_df),
-                    'start_lap': stint_df['LapNumber'].min(),
-                    'end_lap': stint_df['LapNumber'].max(),
-                    'avg_time': lap_times.mean()
-                })
-                current_stint = []
-    
-    # Add final stint
-    if current_stint:
-        stint_df = pd.DataFrame(current_stint)
-        lap_times = pd.to_timedelta(stint_df['LapTime']).dt.total_seconds()
-        stints.append({
-            'compound': stint_df['Compound'].mode()[0] if len(stint_df['Compound'].mode()) > 0 else 'UNKNOWN',
-            'laps': len(stint_df),
-            'start_lap': stint_df['LapNumber'].min(),
-            'end_lap': stint_df['LapNumber'].max(),
-            'avg_time': lap_times.mean()
-        })
-    
-    return stints
+def telemetry_loading(session):
+    """Whether a background load is still fetching this session's telemetry."""
+    job = session_pool().job(session.key)
+    return job is not None and job.stage == 'telemetry'
 
 
-def calculate_race_consistency(laps_df, driver):
-    """Calculate driver consistency metrics"""
-    driver_laps = laps_df[laps_df['Driver'] == driver].copy()
-    
-    # Remove outliers (pit laps, slow laps)
-    clean_laps = driver_laps[
-        (driver_laps['PitOutTime'].isna()) &
-        (driver_laps['PitInTime'].isna())
-    ].copy()
-    
-    if len(clean_laps) > 5:
-        times = clean_laps['LapTime'].dt.total_seconds()
-        median_time = times.median()
-        
-        # Remove laps that are >10% slower than median
-        consistent_laps = times[times < median_time * 1.1]
-        
-        return {
-            'std_dev': consistent_laps.std(),
-            'mean': consistent_laps.mean(),
-            'consistency_score': 100 * (1 - consistent_laps.std() / consistent_laps.mean())
-        }
-    
-    return None
+def telemetry_ready(session, key):
+    """Offer a button to fetch the telemetry tier; True once telemetry is in the store."""
+    if session.has_telemetry:
+        return True
+    if telemetry_loading(session):
+        st.caption("Car telemetry is loading in the background...")
+        return False
+    if st.button("LOAD TELEMETRY", key=key):
+        with st.spinner("Loading car telemetry..."):
+            try:
+                fastf1_api()
+                return session.ensure_telemetry()
+            except:
+                st.error("Telemetry data not available for this session.")
+    return False
 
 
-def calculate_gap_analysis(laps_df, driver1, driver2):
+def trace_xy(x, y, method='lttb'):
+    """x/y kwargs for a Plotly trace, downsampled to the telemetry point budget."""
+    from charts import thin
+    x, y = thin(x, y, TELEMETRY_POINT_BUDGET, method)
+    return dict(x=x, y=y)
+
+
+def fmt_time(sec):
+    if pd.isna(sec): return ""
+    m, s = divmod(sec, 60)
+    return f"{int(m)}:{s:06.3f}"
+
+
+def calculate_gap_analysis(laps_df, lap_index, driver1, driver2):
     """Calculate gap between two drivers throughout the race"""
-    laps1 = laps_df[laps_df['Driver'] == driver1].copy()
-    laps2 = laps_df[laps_df['Driver'] == driver2].copy()
+    laps1 = lap_index.driver_laps(laps_df, driver1)
+    laps2 = lap_index.driver_laps(laps_df, driver2)
     
     # Merge on lap number to get gaps
     merged = pd.merge(
@@ -645,46 +648,13 @@ def calculate_gap_analysis(laps_df, driver1, driver2):
     return None
 
 
-def get_speed_trap_data(laps_df, drivers):
-    """Get maximum speed for each driver - optimized version"""
-    speed_data = {}
-    
-    # Limit to top 5 drivers to avoid long loading times
-    limited_drivers = drivers[:5]
-    
-    for driver in limited_drivers:
-        try:
-            driver_laps = laps_df[laps_df['Driver'] == driver]
-            # Only process first 10 laps for speed estimate
-            sample_laps = driver_laps.head(10)
-            max_speeds = []
-            
-            for idx, lap in sample_laps.iterrows():
-                try:
-                    tel = lap.get_telemetry()
-                    if 'Speed' in tel.columns:
-                        max_speeds.append(tel['Speed'].max())
-                except:
-                    continue
-            
-            if max_speeds:
-                speed_data[driver] = {
-                    'max': max(max_speeds),
-                    'avg_max': np.mean(max_speeds)
-                }
-        except:
-            continue
-    
-    return speed_data
-
-
 def analyze_quali_laps(session):
     """Analyze qualifying session laps"""
     try:
         laps = session.laps
         
         # Get best lap per driver
-        best_laps = laps.groupby('Driver').apply(
+        best_laps = laps.groupby('Driver', observed=True).apply(
             lambda x: x.loc[x['LapTime'].idxmin()]
         ).reset_index(drop=True)
         
@@ -715,6 +685,95 @@ def get_weather_summary(session):
     return None
 
 
+def lazy_tabs(labels, key):
+    """
+    Tabs whose bodies only need to run while selected (see tab_open).
+    Streamlit versions without lazy tabs fall back to regular tabs.
+    """
+    try:
+        return st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+
+
+def tab_open(tab):
+    """Whether a tab's body should run (always, without lazy tabs)."""
+    return getattr(tab, 'open', None) is not False
+
+
+def keep_widget_state(keys):
+    """
+    Re-assign widget values so Streamlit keeps them while their widgets are
+    not rendered (only for closed tabs: re-assigning a rendered widget warns).
+    """
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def next_race(schedule, now):
+    """First event of a schedule after `now` (tz-aware), or None."""
+    if schedule.empty or 'EventDate' not in schedule.columns:
+        return None
+    dates = pd.to_datetime(schedule['EventDate'], errors='coerce')
+    if dates.dt.tz is None:
+        dates = dates.dt.tz_localize('UTC')
+    upcoming = dates > now
+    if not upcoming.any():
+        return None
+    row = schedule[upcoming].assign(date=dates[upcoming]).sort_values('date').iloc[0]
+    return {
+        'name': row['EventName'],
+        'location': row.get('Location', 'TBA'),
+        'date': row['date'],
+        'round': row.get('RoundNumber', '?')
+    }
+
+
+def render_next_race(slot):
+    """Next-race countdown banner into a placeholder."""
+    try:
+        now = pd.Timestamp.now(tz='UTC')
+        race = next_race(get_schedule(2025), now)
+        if race is None:
+            return
+        
+        # Calculate countdown
+        time_diff = race['date'] - now
+        days = time_diff.days
+        hours = time_diff.seconds // 3600
+        
+        # Display countdown banner
+        col_cd1, col_cd2, col_cd3 = slot.container().columns([1, 2, 1])
+        with col_cd2:
+            st.markdown(f"""
+            <div style='
+                background: linear-gradient(135deg, rgba(225,6,0,0.2) 0%, rgba(255,8,0,0.1) 100%);
+                border: 2px solid #e10600;
+                border-radius: 12px;
+                padding: 1rem;
+                text-align: center;
+                margin-bottom: 1.5rem;
+                box-shadow: 0 4px 20px rgba(225, 6, 0, 0.3);
+            '>
+                <div style='color: #8b9bb4; font-size: 11px; text-transform: uppercase; letter-spacing: 2px; margin-bottom: 0.3rem;'>
+                    Next Race
+                </div>
+                <div style='color: #ffffff; font-size: 22px; font-weight: 800; margin-bottom: 0.3rem;'>
+                    {race['name']}
+                </div>
+                <div style='color: #e10600; font-size: 28px; font-weight: 900; margin-bottom: 0.3rem;'>
+                    {days} DAYS {hours} HOURS
+                </div>
+                <div style='color: #8b9bb4; font-size: 12px;'>
+                    {race['location']} • Round {race['round']} • {race['date'].strftime('%B %d, %Y')}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+    except:
+        pass
+
+
 # ==============================================================================
 # 3. MAIN APPLICATION LOGIC
 # ==============================================================================
@@ -723,1599 +782,1452 @@ def get_weather_summary(session):
 st.markdown("<h1 style='text-align: center; color: #e10600; font-size: 38px; font-weight: 900; letter-spacing: 4px; margin-bottom: 0.5rem;'>FORMULA 1 ANALYSIS SYSTEM</h1>", unsafe_allow_html=True)
 st.markdown("<p style='text-align: center; color: #8b9bb4; font-size: 13px; letter-spacing: 2px; margin-bottom: 1rem;'>Advanced Telemetry & Historical Data System | Powered by FastF1</p>", unsafe_allow_html=True)
 
-# --- NEXT RACE COUNTDOWN ---
-try:
-    from datetime import datetime, timedelta
-    import pytz
-    
-    # Get 2025 schedule
-    schedule_2025 = get_schedule(2025)
-    if not schedule_2025.empty and 'EventDate' in schedule_2025.columns:
-        now = datetime.now(pytz.UTC)
-        
-        # Find next race
-        upcoming_races = []
-        for idx, race in schedule_2025.iterrows():
-            try:
-                if pd.notna(race.get('EventDate')):
-                    race_date = pd.to_datetime(race['EventDate'])
-                    if not race_date.tzinfo:
-                        race_date = pytz.UTC.localize(race_date)
-                    
-                    if race_date > now:
-                        upcoming_races.append({
-                            'name': race['EventName'],
-                            'location': race.get('Location', 'TBA'),
-                            'date': race_date,
-                            'round': race.get('RoundNumber', '?')
-                        })
-            except:
-                continue
-        
-        if upcoming_races:
-            # Sort by date and get next race
-            upcoming_races.sort(key=lambda x: x['date'])
-            next_race = upcoming_races[0]
-            
-            # Calculate countdown
-            time_diff = next_race['date'] - now
-            days = time_diff.days
-            hours = time_diff.seconds // 3600
-            
-            # Display countdown banner
-            col_cd1, col_cd2, col_cd3 = st.columns([1, 2, 1])
-            with col_cd2:
-                st.markdown(f"""
-                <div style='
-                    background: linear-gradient(135deg, rgba(225,6,0,0.2) 0%, rgba(255,8,0,0.1) 100%);
-                    border: 2px solid #e10600;
-                    border-radius: 12px;
-                    padding: 1rem;
-                    text-align: center;
-                    margin-bottom: 1.5rem;
-                    box-shadow: 0 4px 20px rgba(225, 6, 0, 0.3);
-                '>
-                    <div style='color: #8b9bb4; font-size: 11px; text-transform: uppercase; letter-spacing: 2px; margin-bottom: 0.3rem;'>
-                        Next Race
-                    </div>
-                    <div style='color: #ffffff; font-size: 22px; font-weight: 800; margin-bottom: 0.3rem;'>
-                        {next_race['name']}
-                    </div>
-                    <div style='color: #e10600; font-size: 28px; font-weight: 900; margin-bottom: 0.3rem;'>
-                        {days} DAYS {hours} HOURS
-                    </div>
-                    <div style='color: #8b9bb4; font-size: 12px;'>
-                        {next_race['location']} • Round {next_race['round']} • {next_race['date'].strftime('%B %d, %Y')}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-except:
-    pass
+# --- NEXT RACE COUNTDOWN (filled in after the active tab has rendered) ---
+countdown_slot = st.empty()
+
+if "session_obj" not in st.session_state:
+    st.session_state.session_obj = None
+    first_visit = True
+else:
+    first_visit = False
+sync_load_job()
 
 # --- MAIN TABS ---
-tab_dashboard, tab_telemetry, tab_championship, tab_comparison = st.tabs([
-    "Race Analysis", 
-    "Telemetry Deep Dive", 
-    "Championship", 
-    "Driver Comparison"
-])
+tab_dashboard, tab_telemetry, tab_championship, tab_comparison = main_tabs = lazy_tabs(list(TAB_WIDGETS), key="main_tab")
+for tab, keys in zip(main_tabs, TAB_WIDGETS.values()):
+    if not tab_open(tab):
+        keep_widget_state(keys)
 
 # ==============================================================================
 # TAB 1: RACE ANALYSIS DASHBOARD
 # ==============================================================================
 with tab_dashboard:
-    # --- CONTROL PANEL ---
-    with st.container():
-        c_ctrl1, c_ctrl2, c_ctrl3, c_ctrl4 = st.columns([1, 2, 1, 1])
-
-        with c_ctrl1:
-            # Full Range Year Selector
-            sel_year = st.selectbox("Season", range(2025, 2017, -1), index=0, key="dash_year")
-
-        with c_ctrl2:
-            # Dynamic Race Selector
-            schedule = get_schedule(sel_year)
-            if not schedule.empty:
-                schedule['Display'] = schedule.apply(lambda x: f"R{x['RoundNumber']} - {x['EventName']}", axis=1)
-                def_idx = 18 if sel_year == 2025 and len(schedule) > 18 else 0
-                sel_event_disp = st.selectbox("Grand Prix", schedule['Display'], index=def_idx)
-                sel_event = schedule.loc[schedule['Display'] == sel_event_disp, 'EventName'].values[0]
-            else:
-                sel_event = st.text_input("Grand Prix", "United States Grand Prix")
-
-        with c_ctrl3:
-            sel_session = st.selectbox("Session", ["Race", "Qualifying", "Sprint", "FP1", "FP2", "FP3"], index=0)
-            sess_map = {"Race": "R", "Qualifying": "Q", "Sprint": "S", "FP1": "FP1", "FP2": "FP2", "FP3": "FP3"}
-
-        with c_ctrl4:
-            st.write("")  # Layout spacer
-            load_btn = st.button("LOAD DATA", use_container_width=True)
-
-    # --- SESSION STATE MANAGEMENT ---
-    if "session_obj" not in st.session_state: 
-        st.session_state.session_obj = None
-        # Show helpful tip on first load
-        st.info("Performance Tip: First load takes 10-30 seconds. Subsequent loads are instant thanks to caching!")
-
-    if load_btn:
-        with st.spinner("Loading session data... (10-30 seconds, much faster on reload)"):
-            st.session_state.session_obj = load_session_data(sel_year, sel_event, sess_map[sel_session])
-            if st.session_state.session_obj:
-                st.success("Loaded successfully!")
-            else:
+    if tab_open(tab_dashboard):
+        # --- CONTROL PANEL ---
+        with st.container():
+            c_ctrl1, c_ctrl2, c_ctrl3, c_ctrl4 = st.columns([1, 2, 1, 1])
+
+            with c_ctrl1:
+                # Full Range Year Selector
+                sel_year = st.selectbox("Season", range(2025, 2017, -1), index=0, key="dash_year")
+
+            with c_ctrl2:
+                # Dynamic Race Selector
+                schedule = get_schedule(sel_year)
+                if not schedule.empty:
+                    schedule['Display'] = schedule.apply(lambda x: f"R{x['RoundNumber']} - {x['EventName']}", axis=1)
+                    def_idx = 18 if sel_year == 2025 and len(schedule) > 18 else 0
+                    sel_event_disp = st.selectbox("Grand Prix", schedule['Display'], index=def_idx, key="dash_event")
+                    sel_event = schedule.loc[schedule['Display'] == sel_event_disp, 'EventName'].values[0]
+                else:
+                    sel_event = st.text_input("Grand Prix", "United States Grand Prix")
+
+            with c_ctrl3:
+                sel_session = st.selectbox("Session", ["Race", "Qualifying", "Sprint", "FP1", "FP2", "FP3"], index=0,
+                                           key="dash_session")
+                sess_map = {"Race": "R", "Qualifying": "Q", "Sprint": "S", "FP1": "FP1", "FP2": "FP2", "FP3": "FP3"}
+
+            with c_ctrl4:
+                st.write("")  # Layout spacer
+                load_btn = st.button("LOAD DATA", use_container_width=True)
+
+        # --- SESSION STATE MANAGEMENT ---
+        if first_visit:
+            # Show helpful tip on first load
+            st.info("Performance Tip: LOAD DATA runs in the background - results show up first, then lap timing, then car telemetry. Subsequent loads are instant thanks to the session store!")
+
+        if load_btn:
+            st.session_state.session_obj = None
+            st.session_state.load_job = start_session_load(sel_year, sel_event, sess_map[sel_session])
+            # Stored sessions are ready within milliseconds: render them without a progress round trip
+            st.session_state.load_job.wait('laps', timeout=0.5)
+
+        load_job = sync_load_job()
+        if load_job is not None:
+            if not load_job.done:
+                show_load_progress(load_job, len(load_job.ready))
+            elif load_job.handle is None:
+                del st.session_state.load_job
                 st.error("Failed to load. Try another race.")
-
-    # --- DASHBOARD VISUALS ---
-    if st.session_state.session_obj:
-        session = st.session_state.session_obj
-        laps = session.laps
-        laps['LapTimeSec'] = laps['LapTime'].dt.total_seconds()
-
-        # 1. DRIVER SELECTION (FULL GRID)
-        try:
-            all_drivers = session.results.sort_values(by="Position")['Abbreviation'].tolist()
-        except:
-            all_drivers = pd.unique(laps['Driver']).tolist()
-
-        st.markdown("###  Race Overview & Results")
-        
-        # Race statistics banner
-        col_stat1, col_stat2, col_stat3, col_stat4, col_stat5 = st.columns(5)
-        
-        try:
-            total_laps = int(laps['LapNumber'].max())
-            unique_drivers = len(laps['Driver'].unique())
-            fastest_lap = laps.pick_fastest()
-            
-            col_stat1.metric(" Total Laps", total_laps)
-            col_stat2.metric(" Drivers", unique_drivers)
-            col_stat3.metric(" Fastest", f"{fastest_lap['Driver']}")
-            col_stat4.metric(" Best Time", fmt_time(fastest_lap['LapTime'].total_seconds()))
-            
-            # Weather info if available
-            weather = get_weather_summary(session)
-            if weather:
-                col_stat5.metric(" Track Temp", f"{weather['avg_track_temp']:.1f}°C")
             else:
-                col_stat5.metric(" Session", sel_session)
-        except:
-            pass
-        
-        st.markdown("")
-        
-        # Results table
-        try:
-            results_df = session.results[['Position', 'Abbreviation', 'TeamName', 'GridPosition', 'Status', 'Points']].copy()
-            results_df.columns = ['Pos', 'Driver', 'Team', 'Grid', 'Status', 'Points']
-            results_df['Positions Gained'] = results_df['Grid'] - results_df['Pos']
-            
-            col_results, col_fastest = st.columns([3, 2])
-            
-            with col_results:
-                st.markdown("####  Final Classification")
-                st.dataframe(
-                    results_df.head(10),
-                    use_container_width=True,
-                    hide_index=True,
-                    height=400,
-                    column_config={
-                        "Positions Gained": st.column_config.NumberColumn(
-                            "Pos ±",
-                            help="Positions gained/lost from grid",
-                            format="%+d"
-                        )
-                    }
-                )
-            
-            with col_fastest:
-                st.markdown("####  Fastest Laps")
-                fastest_per_driver = laps.groupby('Driver').apply(
-                    lambda x: x.nsmallest(1, 'LapTimeSec')[['LapNumber', 'LapTimeSec', 'Compound']]
-                ).reset_index(drop=False)
-                fastest_per_driver = fastest_per_driver.sort_values('LapTimeSec').head(10)
-                fastest_per_driver['LapTime'] = fastest_per_driver['LapTimeSec'].apply(fmt_time)
-                
-                st.dataframe(
-                    fastest_per_driver[['Driver', 'LapNumber', 'LapTime', 'Compound']],
-                    use_container_width=True,
-                    hide_index=True,
-                    height=400
-                )
-        except Exception as e:
-            st.warning(f"Results data not available")
+                del st.session_state.load_job
+                st.success(f"Loaded successfully! ({load_job.elapsed:.1f} s)")
+
+        # --- DASHBOARD VISUALS ---
+        # Each tier renders as soon as the loader has it: results, then everything built on laps
+        session = current_session()
+        if session is not None:
+            results = session.results
+            laps = session.get_laps(DASHBOARD_LAP_COLUMNS)
+            lap_index = session.lap_index
+            metrics = session_metrics(session)
+        else:
+            results = load_job.results if load_job is not None else None
 
-        st.markdown("---")
-        st.markdown("###  Driver Selection & Pace Analysis")
-        
-        selected_drivers = st.multiselect(
-            "Select Drivers to Analyze",
-            all_drivers,
-            default=all_drivers[:5] if len(all_drivers) >= 5 else all_drivers,
-            key="drivers_multi"
-        )
+        if results is not None:
+            st.markdown("###  Race Overview & Results")
 
-        if not selected_drivers: 
-            selected_drivers = all_drivers[:5]
+            # Race statistics banner
+            if session is not None:
+                col_stat1, col_stat2, col_stat3, col_stat4, col_stat5 = st.columns(5)
 
-        # Filter Data
-        drv_laps = laps[laps['Driver'].isin(selected_drivers)]
+                try:
+                    total_laps = int(laps['LapNumber'].max())
+                    unique_drivers = len(laps['Driver'].unique())
+                    fastest_lap = pick_fastest(laps)
+
+                    col_stat1.metric(" Total Laps", total_laps)
+                    col_stat2.metric(" Drivers", unique_drivers)
+                    col_stat3.metric(" Fastest", f"{fastest_lap['Driver']}")
+                    col_stat4.metric(" Best Time", fmt_time(fastest_lap['LapTime'].total_seconds()))
+
+                    # Weather info if available
+                    weather = get_weather_summary(session)
+                    if weather:
+                        col_stat5.metric(" Track Temp", f"{weather['avg_track_temp']:.1f}°C")
+                    else:
+                        col_stat5.metric(" Session", sel_session)
+                except:
+                    pass
 
-        # 2. PACE COMPARISON & TRACK MAP
-        col_viz_left, col_viz_right = st.columns([2, 1])
+            st.markdown("")
 
-        with col_viz_left:
-            st.markdown("#### Lap Time Distribution")
-            clean_laps = drv_laps.dropna(subset=['LapTimeSec'])
-            clean_laps = clean_laps[clean_laps['LapTimeSec'] < clean_laps['LapTimeSec'].median() * 1.15]
+            # Results table
+            try:
+                results_df = results[['Position', 'Abbreviation', 'TeamName', 'GridPosition', 'Status', 'Points']].copy()
+                results_df.columns = ['Pos', 'Driver', 'Team', 'Grid', 'Status', 'Points']
+                results_df['Positions Gained'] = results_df['Grid'] - results_df['Pos']
 
-            fig_pace = go.Figure()
-            for d in selected_drivers:
-                d_data = clean_laps[clean_laps['Driver'] == d]
-                color = get_color(d, session)
+                col_results, col_fastest = st.columns([3, 2])
 
-                fig_pace.add_trace(go.Box(
-                    y=d_data['LapTimeSec'],
-                    name=d,
-                    marker_color=color,
-                    boxmean=True,
-                    boxpoints='outliers',
-                    line=dict(width=2),
-                    fillcolor=color,
-                    width=0.6
-                ))
+                with col_results:
+                    st.markdown("####  Final Classification")
+                    st.dataframe(
+                        results_df.head(10),
+                        use_container_width=True,
+                        hide_index=True,
+                        height=400,
+                        column_config={
+                            "Positions Gained": st.column_config.NumberColumn(
+                                "Pos ±",
+                                help="Positions gained/lost from grid",
+                                format="%+d"
+                            )
+                        }
+                    )
 
-            fig_pace.update_layout(
-                template="plotly_dark",
-                height=400,
-                showlegend=False,
-                yaxis_title="Lap Time (seconds)",
-                xaxis_title="Driver",
-                margin=dict(t=20, b=40, l=60, r=20),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(255,255,255,0.03)',
-                xaxis=dict(tickfont=dict(size=12, family="Segoe UI")),
-                yaxis=dict(gridcolor='#2d3340', zerolinecolor='#2d3340')
-            )
-            st.plotly_chart(fig_pace, use_container_width=True)
+                with col_fastest:
+                    st.markdown("####  Fastest Laps")
+                    if session is not None:
+                        fastest_per_driver = metrics['fastest_laps'].head(10).copy()
+                        fastest_per_driver['LapTime'] = fastest_per_driver['LapTimeSec'].apply(fmt_time)
+
+                        st.dataframe(
+                            fastest_per_driver[['Driver', 'LapNumber', 'LapTime', 'Compound']],
+                            use_container_width=True,
+                            hide_index=True,
+                            height=400
+                        )
+                    else:
+                        st.caption("Lap timing is loading...")
+            except Exception as e:
+                st.warning(f"Results data not available")
 
-        with col_viz_right:
-            st.markdown(f"####  {session.event.EventName}")
+        if session is not None:
+            # Plotting modules load with the first figure, not with the page
+            import plotly.graph_objects as go
+            from charts import build_strategy_figure, build_track_map_figure
 
-            # KEY METRICS
+            # 1. DRIVER SELECTION (FULL GRID)
             try:
-                fl = laps.pick_fastest()
-                winner = session.results.iloc[0]['Abbreviation'] if hasattr(session, 'results') else "N/A"
-
-                st.metric(" Winner", winner)
-                st.metric(" Fastest Lap", f"{fl['Driver']}", fmt_time(fl['LapTimeSec']))
-                st.metric(" Total Laps", int(laps['LapNumber'].max()))
+                all_drivers = results.sort_values(by="Position")['Abbreviation'].tolist()
             except:
-                pass
+                all_drivers = pd.unique(laps['Driver']).tolist()
 
-            # TRACK MAP - Enhanced with DRS, Speed Trap, Turn Numbers
-            try:
-                fl_lap = laps.pick_fastest()
-                tel = fl_lap.get_telemetry().add_distance()
-                
-                if tel is None or len(tel) == 0:
-                    raise ValueError("No telemetry data")
-                
-                # Detect sectors
-                total_dist = tel['Distance'].max()
-                tel['Sector'] = 1
-                tel.loc[tel['Distance'] <= total_dist / 3, 'Sector'] = 1
-                tel.loc[(tel['Distance'] > total_dist / 3) & (tel['Distance'] <= 2 * total_dist / 3), 'Sector'] = 2
-                tel.loc[tel['Distance'] > 2 * total_dist / 3, 'Sector'] = 3
-                
-                fig_map = go.Figure()
-                
-                # Sector colors (như hình: Cyan, Yellow, Red)
-                sector_colors = {
-                    1: '#ffd700',  # Yellow for Sector 1
-                    2: '#00d9ff',  # Cyan for Sector 2  
-                    3: '#ff1e1e'   # Red for Sector 3
-                }
-                
-                # Draw sectors
-                for sector in [1, 2, 3]:
-                    sector_data = tel[tel['Sector'] == sector].copy()
-                    if len(sector_data) > 0:
-                        fig_map.add_trace(go.Scatter(
-                            x=sector_data['X'], 
-                            y=sector_data['Y'],
-                    mode='lines',
-                            line=dict(width=8, color=sector_colors[sector]),
-                            name=f'SECTOR {sector}',
-                            showlegend=False,
-                            hovertemplate=f'Sector {sector}<br>Speed: %{{customdata:.0f}} km/h<extra></extra>',
-                            customdata=sector_data['Speed'] if 'Speed' in sector_data.columns else None
-                        ))
-                
-                # Initialize corners counter
-                num_corners = 0
-                
-                # Detect & label ALL turns
-                if len(tel) > 50:
-                    try:
-                        tel['dx'] = tel['X'].diff()
-                        tel['dy'] = tel['Y'].diff()
-                        tel['angle'] = np.arctan2(tel['dy'], tel['dx'])
-                        tel['angle_change'] = tel['angle'].diff().abs()
-                        
-                        # Find turns with lower threshold for more detection
-                        corners = tel[tel['angle_change'] > 0.25].copy()
-                        
-                        # Limit to ~18 major turns
-                        if len(corners) > 18:
-                            step = max(1, len(corners) // 18)
-                            corners = corners.iloc[::step][:18]
-                        
-                        # Add turn numbers
-                        for i, (idx, corner) in enumerate(corners.iterrows(), 1):
-                            fig_map.add_annotation(
-                                x=corner['X'],
-                                y=corner['Y'],
-                                text=f'<b>{i:02d}</b>',
-                                showarrow=False,
-                                font=dict(size=11, color='white', family='Arial Black'),
-                                bgcolor='rgba(0,0,0,0.8)',
-                                borderpad=3
-                            )
-                        
-                        # Sector labels (lớn hơn)
-                        sector_names = {1: 'SECTOR 1', 2: 'SECTOR 2', 3: 'SECTOR 3'}
-                        for sector_num in [1, 2, 3]:
-                            sector_data = tel[tel['Sector'] == sector_num]
-                            if len(sector_data) > 10:
-                                mid_point = sector_data.iloc[len(sector_data) // 2]
-                                fig_map.add_annotation(
-                                    x=mid_point['X'], 
-                                    y=mid_point['Y'],
-                                    text=f'<b>{sector_names[sector_num]}</b>',
-                                    showarrow=False,
-                                    font=dict(size=10, color=sector_colors[sector_num], family='Arial Black'),
-                                    bgcolor='rgba(0,0,0,0.6)',
-                                    bordercolor=sector_colors[sector_num],
-                                    borderwidth=2,
-                                    borderpad=4
-                                )
-                        
-                        # DRS Detection Zone (green box)
-                        if len(tel) > 0:
-                            drs_zone = tel.iloc[int(len(tel) * 0.15)]
-                            fig_map.add_annotation(
-                                x=drs_zone['X'],
-                                y=drs_zone['Y'],
-                                text='<b>DRS<br>DETECTION<br>ZONE 1</b>',
-                                showarrow=True,
-                                arrowhead=2,
-                                arrowcolor='#00ff41',
-                                ax=50, ay=-50,
-                                font=dict(size=8, color='white', family='Arial Black'),
-                                bgcolor='#00aa00',
-                                bordercolor='#00ff41',
-                                borderwidth=2,
-                                borderpad=4
-                            )
-                        
-                        # Speed Trap (pink box)
-                        if len(tel) > 0:
-                            speed_trap = tel.iloc[int(len(tel) * 0.25)]
-                            fig_map.add_annotation(
-                                x=speed_trap['X'],
-                                y=speed_trap['Y'],
-                                text='<b>SPEED<br>TRAP</b>',
-                                showarrow=True,
-                                arrowhead=2,
-                                arrowcolor='#ff00ff',
-                                ax=60, ay=30,
-                                font=dict(size=9, color='white', family='Arial Black'),
-                                bgcolor='#ff00ff',
-                                bordercolor='#ff00ff',
-                                borderwidth=2,
-                                borderpad=4
-                            )
-                        
-                        # Finish Line marker
-                        if len(tel) > 0:
-                            finish = tel.iloc[0]
-                            fig_map.add_trace(go.Scatter(
-                                x=[finish['X']], 
-                                y=[finish['Y']],
-                                mode='markers',
-                                marker=dict(size=12, color='white', symbol='square', 
-                                          line=dict(color='#e10600', width=3)),
-                                showlegend=False,
-                                hovertext='Finish Line'
-                            ))
-                    except:
-                        pass
-                
-                # Caption
-                caption_text = f"{session.event.EventName}"
-                if num_corners > 0:
-                    caption_text += f" - {num_corners} turns"
-                st.caption(caption_text)
-                
-                fig_map.update_layout(
+            st.markdown("---")
+            st.markdown("###  Driver Selection & Pace Analysis")
+        
+            selected_drivers = st.multiselect(
+                "Select Drivers to Analyze",
+                all_drivers,
+                default=all_drivers[:5] if len(all_drivers) >= 5 else all_drivers,
+                key="drivers_multi"
+            )
+
+            if not selected_drivers: 
+                selected_drivers = all_drivers[:5]
+
+            # 2. PACE COMPARISON & TRACK MAP
+            col_viz_left, col_viz_right = st.columns([2, 1])
+
+            with col_viz_left:
+                st.markdown("#### Lap Time Distribution")
+                fig_pace = go.Figure()
+                for d in selected_drivers:
+                    d_data = lap_index.driver_laps(laps, d)
+                    d_data = d_data[d_data['IsClean']]
+                    color = get_color(d, session)
+
+                    fig_pace.add_trace(go.Box(
+                        y=d_data['LapTimeSec'],
+                        name=d,
+                        marker_color=color,
+                        boxmean=True,
+                        boxpoints='outliers',
+                        line=dict(width=2),
+                        fillcolor=color,
+                        width=0.6
+                    ))
+
+                fig_pace.update_layout(
                     template="plotly_dark",
-                    height=280,
-                    margin=dict(t=10, b=10, l=10, r=10),
-                    xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
-                    yaxis=dict(visible=False),
-                    paper_bgcolor='#0e1117',
-                    plot_bgcolor='#0e1117',
-                    showlegend=False
+                    height=400,
+                    showlegend=False,
+                    yaxis_title="Lap Time (seconds)",
+                    xaxis_title="Driver",
+                    margin=dict(t=20, b=40, l=60, r=20),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(255,255,255,0.03)',
+                    xaxis=dict(tickfont=dict(size=12, family="Segoe UI")),
+                    yaxis=dict(gridcolor='#2d3340', zerolinecolor='#2d3340')
                 )
-                st.plotly_chart(fig_map, use_container_width=True)
-                
-            except Exception as e:
-                # Fallback: Simple track map without labels
+                st.plotly_chart(fig_pace, use_container_width=True)
+
+            with col_viz_right:
+                st.markdown(f"####  {session.event.EventName}")
+
+                # KEY METRICS
                 try:
-                    fl_lap = laps.pick_fastest()
-                    tel = fl_lap.get_telemetry().add_distance()
-                    if tel is not None and len(tel) > 0:
-                        fig_simple = go.Figure()
-                        fig_simple.add_trace(go.Scatter(
-                            x=tel['X'], 
-                            y=tel['Y'],
-                            mode='lines',
-                            line=dict(width=6, color='#e10600'),
-                            showlegend=False
-                        ))
-                        fig_simple.update_layout(
-                            template="plotly_dark",
-                            height=280,
-                            margin=dict(t=10, b=10, l=10, r=10),
-                            xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
-                            yaxis=dict(visible=False),
-                            paper_bgcolor='#0e1117',
-                            plot_bgcolor='#0e1117',
-                            showlegend=False
-                        )
-                        st.plotly_chart(fig_simple, use_container_width=True)
-                        st.caption(f"{session.event.EventName} - Basic Track Outline")
-                    else:
+                    fl = pick_fastest(laps)
+                    winner = session.results.iloc[0]['Abbreviation'] if hasattr(session, 'results') else "N/A"
+
+                    st.metric(" Winner", winner)
+                    st.metric(" Fastest Lap", f"{fl['Driver']}", fmt_time(fl['LapTimeSec']))
+                    st.metric(" Total Laps", int(laps['LapNumber'].max()))
+                except:
+                    pass
+
+                # TRACK MAP - from the cached circuit geometry (sectors, corners, DRS, speed trap)
+                try:
+                    geometry = circuit_geometry(session)
+                    if geometry is None:
+                        if telemetry_ready(session, "map_telemetry"):
+                            geometry = circuit_geometry(session)
+                        elif not telemetry_loading(session):
+                            st.caption("The track map is built once per circuit from car telemetry, which is loaded on demand.")
+                    if geometry is not None:
+                        st.caption(f"{session.event.EventName} - {len(geometry['corners'])} turns")
+                        st.plotly_chart(build_track_map_figure(geometry), use_container_width=True)
+                    elif session.has_telemetry:
                         st.info("Track map unavailable (no telemetry data)")
                 except:
                     st.info("Track map unavailable for this session")
 
-        # 3. LAP TIME PROGRESSION - Improved with outlier filtering
-        st.markdown("###  Lap Time Progression & Race Strategy")
+            # 3. LAP TIME PROGRESSION - clean laps only
+            st.markdown("###  Lap Time Progression & Race Strategy")
 
-        # Prepare data with better outlier filtering
-        plot_data = []
-        for d in selected_drivers:
-            d_data = drv_laps[drv_laps['Driver'] == d].copy()
-            
-            # Remove obvious outliers (pit laps, slow laps)
-            if len(d_data) > 0:
-                # Calculate median for this driver
-                median_time = d_data['LapTimeSec'].median()
-                
-                # Keep only laps within reasonable range (median ± 20%)
-                d_filtered = d_data[
-                    (d_data['LapTimeSec'] >= median_time * 0.8) &
-                    (d_data['LapTimeSec'] <= median_time * 1.2)
-                ].copy()
-                
-                plot_data.append({
-                    'driver': d,
-                    'data': d_filtered,
-                    'color': get_color(d, session)
-                })
+            plot_data = []
+            for d in selected_drivers:
+                d_data = lap_index.driver_laps(laps, d)
+
+                if len(d_data) > 0:
+                    # Pit laps, lap 1, neutralised laps and outliers are flagged at load (IsClean)
+                    d_filtered = d_data[d_data['IsClean']]
 
-        fig_prog = go.Figure()
+                    plot_data.append({
+                        'driver': d,
+                        'data': d_filtered,
+                        'color': get_color(d, session)
+                    })
+
+            fig_prog = go.Figure()
         
-        # Calculate smart Y-axis range from filtered data
-        all_times = []
-        for driver_data in plot_data:
-            if len(driver_data['data']) > 0:
-                all_times.extend(driver_data['data']['LapTimeSec'].tolist())
+            # Calculate smart Y-axis range from filtered data
+            all_times = []
+            for driver_data in plot_data:
+                if len(driver_data['data']) > 0:
+                    all_times.extend(driver_data['data']['LapTimeSec'].tolist())
         
-        if len(all_times) > 0:
-            y_min = min(all_times) - 1
-            y_max = max(all_times) + 2
-        else:
-            y_min, y_max = None, None
+            if len(all_times) > 0:
+                y_min = min(all_times) - 1
+                y_max = max(all_times) + 2
+            else:
+                y_min, y_max = None, None
         
-        # Plot filtered data
-        for driver_data in plot_data:
-            d = driver_data['driver']
-            d_filtered = driver_data['data']
-            color = driver_data['color']
-
-            fig_prog.add_trace(go.Scattergl(
-                x=d_filtered['LapNumber'],
-                y=d_filtered['LapTimeSec'],
-                mode='lines+markers',
-                name=d,
-                line=dict(color=color, width=2.5),
-                marker=dict(size=4),
-                opacity=0.85,
-                hovertemplate='<b>%{fullData.name}</b><br>Lap: %{x}<br>Time: %{y:.3f}s<extra></extra>'
-            ))
-
-        fig_prog.update_layout(
-            template="plotly_dark",
-            height=450,
-            yaxis=dict(
-                range=[y_min, y_max], 
-                gridcolor='#2d3340', 
-                title="Lap Time (seconds)",
-                tickformat='.1f'
-            ),
-            xaxis=dict(
-                gridcolor='#2d3340', 
-                title="Lap Number",
-                tickmode='linear',
-                dtick=5
-            ),
-            margin=dict(t=20, b=40, l=60, r=20),
-            legend=dict(
-                orientation="h", 
-                y=1.02, 
-                x=0, 
-                bgcolor='rgba(0,0,0,0.5)',
-                font=dict(size=11)
-            ),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(255,255,255,0.03)',
-            hovermode='x unified'
-        )
+            # Plot filtered data
+            for driver_data in plot_data:
+                d = driver_data['driver']
+                d_filtered = driver_data['data']
+                color = driver_data['color']
+
+                fig_prog.add_trace(go.Scattergl(
+                    x=d_filtered['LapNumber'],
+                    y=d_filtered['LapTimeSec'],
+                    mode='lines+markers',
+                    name=d,
+                    line=dict(color=color, width=2.5),
+                    marker=dict(size=4),
+                    opacity=0.85,
+                    hovertemplate='<b>%{fullData.name}</b><br>Lap: %{x}<br>Time: %{y:.3f}s<extra></extra>'
+                ))
+
+            fig_prog.update_layout(
+                template="plotly_dark",
+                height=450,
+                yaxis=dict(
+                    range=[y_min, y_max], 
+                    gridcolor='#2d3340', 
+                    title="Lap Time (seconds)",
+                    tickformat='.1f'
+                ),
+                xaxis=dict(
+                    gridcolor='#2d3340', 
+                    title="Lap Number",
+                    tickmode='linear',
+                    dtick=5
+                ),
+                margin=dict(t=20, b=40, l=60, r=20),
+                legend=dict(
+                    orientation="h", 
+                    y=1.02, 
+                    x=0, 
+                    bgcolor='rgba(0,0,0,0.5)',
+                    font=dict(size=11)
+                ),
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(255,255,255,0.03)',
+                hovermode='x unified'
+            )
         
-        st.plotly_chart(fig_prog, use_container_width=True)
-        st.caption("Note: Outlier laps (pit stops, incidents) filtered for better visualization. Showing laps within 80-120% of median lap time.")
+            st.plotly_chart(fig_prog, use_container_width=True)
+            st.caption("Note: Showing clean laps only - in/out laps, lap 1, safety car / VSC / red flag laps, inaccurate laps and statistical outliers are left out.")
 
-        # 4. TIRE STRATEGY VISUALIZATION
-        st.markdown("###  Tire Strategy & Stint Analysis")
+            # 4. TIRE STRATEGY VISUALIZATION
+            st.markdown("###  Tire Strategy & Stint Analysis")
+            stints_df = metrics['stints']
         
-        col_strat1, col_strat2 = st.columns([2, 1])
+            col_strat1, col_strat2 = st.columns([2, 1])
         
-        with col_strat1:
-            # Tire strategy chart
-            fig_strat = go.Figure()
-            
-            tire_colors = {
-                'SOFT': '#FF3333',
-                'MEDIUM': '#FFF200', 
-                'HARD': '#EBEBEB',
-                'INTERMEDIATE': '#43B02A',
-                'WET': '#0067AD'
-            }
-            
-            for idx, d in enumerate(selected_drivers):
-                d_laps = drv_laps[drv_laps['Driver'] == d].copy()
-                
-                for _, lap in d_laps.iterrows():
-                    compound = lap['Compound']
-                    if pd.notna(compound):
-                        color = tire_colors.get(compound, '#808080')
-                        
-                        fig_strat.add_trace(go.Scatter(
-                            x=[lap['LapNumber'], lap['LapNumber']],
-                            y=[idx, idx],
-                            mode='markers',
-                            marker=dict(
-                                size=12,
-                                color=color,
-                                symbol='square',
-                                line=dict(width=1, color='#333')
-                            ),
-                            showlegend=False,
-                            hovertemplate=f'<b>{d}</b><br>Lap: {lap["LapNumber"]}<br>Compound: {compound}<extra></extra>'
-                        ))
-            
-            fig_strat.update_layout(
-            template="plotly_dark",
-                height=300,
-                yaxis=dict(
-                    tickmode='array',
-                    tickvals=list(range(len(selected_drivers))),
-                    ticktext=selected_drivers,
-                    title="Driver"
-                ),
-                xaxis=dict(title="Lap Number", gridcolor='#2d3340'),
-                margin=dict(t=20, b=40, l=100, r=20),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(255,255,255,0.03)'
-        )
-            st.plotly_chart(fig_strat, use_container_width=True)
+            with col_strat1:
+                # Tire strategy chart (one bar per stint, one trace per compound)
+                fig_strat = build_strategy_figure(stints_df, selected_drivers)
+                st.plotly_chart(fig_strat, use_container_width=True)
         
-        with col_strat2:
-            st.markdown("####  Pit Stop Summary")
-            for d in selected_drivers[:3]:  # Show top 3 selected
-                stints = get_stint_analysis(laps, d)
-                if stints:
-                    st.markdown(f"**{d}** - {len(stints)} stint(s)")
-                    for i, stint in enumerate(stints, 1):
-                        st.caption(f"Stint {i}: {stint['compound']} ({stint['laps']} laps)")
+            with col_strat2:
+                st.markdown("####  Pit Stop Summary")
+                for d in selected_drivers[:3]:  # Show top 3 selected
+                    d_stints = stints_df[stints_df['Driver'] == d]
+                    if len(d_stints) > 0:
+                        st.markdown(f"**{d}** - {len(d_stints)} stint(s)")
+                        for i, stint in enumerate(d_stints.itertuples(), 1):
+                            st.caption(f"Stint {i}: {stint.Compound} ({stint.Laps} laps)")
         
-        # 5. SPEED TRAP & PERFORMANCE ANALYSIS (Optional)
-        st.markdown("---")
+            # 5. SPEED TRAP & PERFORMANCE ANALYSIS (Optional)
+            st.markdown("---")
         
-        with st.expander("Speed Trap Analysis (Click to expand - may take a few seconds)", expanded=False):
-            col_speed1, col_speed2 = st.columns([2, 1])
+            with st.expander("Speed Trap Analysis (Click to expand)", expanded=False):
+                col_speed1, col_speed2 = st.columns([2, 1])
             
-            with col_speed1:
-                # Speed comparison chart
-                with st.spinner("Analyzing speed data..."):
-                    speed_data = get_speed_trap_data(laps, selected_drivers)
-                
-                if speed_data:
-                    drivers_list = list(speed_data.keys())
-                    max_speeds = [speed_data[d]['max'] for d in drivers_list]
-                    avg_max_speeds = [speed_data[d]['avg_max'] for d in drivers_list]
+                with col_speed1:
+                    # Speed comparison chart - every lap of every driver
+                    speed_data = None
+                    if telemetry_ready(session, "speed_telemetry"):
+                        with st.spinner("Analyzing speed data..."):
+                            speed_data = speed_trap_summary(lap_speeds(session))
+                
+                    if speed_data is not None and len(speed_data) > 0:
+                        drivers_list = speed_data.index.tolist()
+                        max_speeds = speed_data['max'].tolist()
+                        avg_max_speeds = speed_data['avg_max'].tolist()
                     
-                    fig_speed_comp = go.Figure()
+                        fig_speed_comp = go.Figure()
                     
-                    fig_speed_comp.add_trace(go.Bar(
-                        x=drivers_list,
-                        y=max_speeds,
-                        name='Maximum Speed',
-                        marker_color='#e10600',
-                        text=[f"{s:.1f}" for s in max_speeds],
-                        textposition='outside'
-                    ))
+                        fig_speed_comp.add_trace(go.Bar(
+                            x=drivers_list,
+                            y=max_speeds,
+                            name='Maximum Speed',
+                            marker_color='#e10600',
+                            text=[f"{s:.1f}" for s in max_speeds],
+                            textposition='outside'
+                        ))
                     
-                    fig_speed_comp.add_trace(go.Bar(
-                        x=drivers_list,
-                        y=avg_max_speeds,
-                        name='Avg Max Speed',
-                        marker_color='#ff6b6b',
-                        text=[f"{s:.1f}" for s in avg_max_speeds],
-                        textposition='outside'
-                    ))
+                        fig_speed_comp.add_trace(go.Bar(
+                            x=drivers_list,
+                            y=avg_max_speeds,
+                            name='Avg Max Speed',
+                            marker_color='#ff6b6b',
+                            text=[f"{s:.1f}" for s in avg_max_speeds],
+                            textposition='outside'
+                        ))
                     
-                    fig_speed_comp.update_layout(
-                        template="plotly_dark",
-                        height=400,
-                        yaxis_title="Speed (km/h)",
-                        xaxis_title="Driver",
-                        barmode='group',
-                        margin=dict(t=40, b=40, l=60, r=20),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(255,255,255,0.03)',
-                        legend=dict(orientation="h", y=1.1, x=0)
-                    )
+                        fig_speed_comp.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            yaxis_title="Speed (km/h)",
+                            xaxis_title="Driver",
+                            barmode='group',
+                            margin=dict(t=40, b=40, l=60, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(255,255,255,0.03)',
+                            legend=dict(orientation="h", y=1.1, x=0)
+                        )
                     
-                    st.plotly_chart(fig_speed_comp, use_container_width=True)
-                else:
-                    st.info("Speed data not available for this session")
+                        st.plotly_chart(fig_speed_comp, use_container_width=True)
+                    elif not telemetry_loading(session):
+                        st.info("Speed data not available for this session")
             
-            with col_speed2:
-                st.markdown("#### Performance Stats")
+                with col_speed2:
+                    st.markdown("#### Performance Stats")
                 
-                # Calculate additional statistics
-                for d in selected_drivers[:5]:
-                    d_laps = laps[laps['Driver'] == d]
-                    clean = d_laps[(d_laps['PitOutTime'].isna()) & (d_laps['PitInTime'].isna())]
+                    # Calculate additional statistics
+                    for d in selected_drivers[:5]:
+                        d_laps = lap_index.driver_laps(laps, d)
+                        clean = d_laps[d_laps['IsClean']]
                     
-                    if len(clean) > 0:
-                        avg_time = clean['LapTime'].dt.total_seconds().mean()
-                        st.markdown(f"**{d}**")
-                        st.caption(f"Avg Pace: {fmt_time(avg_time)}")
-                        st.caption(f"Laps: {len(d_laps)}")
-                        st.markdown("---")
+                        if len(clean) > 0:
+                            avg_time = clean['LapTimeSec'].mean()
+                            st.markdown(f"**{d}**")
+                            st.caption(f"Avg Pace: {fmt_time(avg_time)}")
+                            st.caption(f"Laps: {len(d_laps)}")
+                            st.markdown("---")
                 
-                st.caption("Tip: Speed data is sampled from first 10 laps for faster loading")
+                    st.caption("Speed data covers every lap of the full grid")
 
-    else:
-        st.info("Ready to analyze! Select race parameters above and click **LOAD DATA**.")
+        elif load_job is None:
+            st.info("Ready to analyze! Select race parameters above and click **LOAD DATA**.")
 
 # ==============================================================================
 # TAB 2: TELEMETRY DEEP DIVE
 # ==============================================================================
 with tab_telemetry:
-    st.markdown("## Advanced Telemetry Analysis")
+    if tab_open(tab_telemetry):
+        import plotly.graph_objects as go
+        from charts import build_dominance_figure, downsample
+
+        st.markdown("## Advanced Telemetry Analysis")
     
-    if st.session_state.session_obj:
-        session = st.session_state.session_obj
-        laps = session.laps
+        if st.session_state.session_obj:
+            session = current_session()
+            laps = session.get_laps(['Driver', 'LapNumber', 'LapTime', 'Position'])
+            lap_index = session.lap_index
         
-        # Driver selection for telemetry
-        try:
-            all_drivers = session.results.sort_values(by="Position")['Abbreviation'].tolist()
-        except:
-            all_drivers = pd.unique(laps['Driver']).tolist()
+            # Driver selection for telemetry
+            try:
+                all_drivers = session.results.sort_values(by="Position")['Abbreviation'].tolist()
+            except:
+                all_drivers = pd.unique(laps['Driver']).tolist()
         
-        col_tel1, col_tel2 = st.columns([1, 1])
+            col_tel1, col_tel2 = st.columns([1, 1])
         
-        with col_tel1:
-            driver_1 = st.selectbox("Driver 1", all_drivers, index=0, key="tel_driver1")
+            with col_tel1:
+                driver_1 = st.selectbox("Driver 1", all_drivers, index=0, key="tel_driver1")
         
-        with col_tel2:
-            driver_2 = st.selectbox("Driver 2", all_drivers, index=min(1, len(all_drivers)-1), key="tel_driver2")
+            with col_tel2:
+                driver_2 = st.selectbox("Driver 2", all_drivers, index=min(1, len(all_drivers)-1), key="tel_driver2")
         
-        # Lap selection
-        col_lap1, col_lap2 = st.columns([1, 1])
+            # Lap selection
+            col_lap1, col_lap2 = st.columns([1, 1])
         
-        with col_lap1:
-            laps_d1 = laps[laps['Driver'] == driver_1]
-            lap_options_1 = laps_d1['LapNumber'].tolist()
+            with col_lap1:
+                laps_d1 = lap_index.driver_laps(laps, driver_1)
+                lap_options_1 = laps_d1['LapNumber'].tolist()
             
-            if lap_options_1:
-                # Default to fastest lap
-                fastest_lap_1 = laps_d1.loc[laps_d1['LapTime'].idxmin(), 'LapNumber']
-                default_idx_1 = lap_options_1.index(fastest_lap_1) if fastest_lap_1 in lap_options_1 else 0
-                lap_num_1 = st.selectbox(f"{driver_1} Lap", lap_options_1, index=default_idx_1, key="tel_lap1")
-            else:
-                st.warning(f"No laps found for {driver_1}")
-                lap_num_1 = None
+                if lap_options_1:
+                    # Default to fastest lap
+                    fastest_lap_1 = laps_d1.loc[laps_d1['LapTime'].idxmin(), 'LapNumber']
+                    default_idx_1 = lap_options_1.index(fastest_lap_1) if fastest_lap_1 in lap_options_1 else 0
+                    lap_num_1 = st.selectbox(f"{driver_1} Lap", lap_options_1, index=default_idx_1, key="tel_lap1")
+                else:
+                    st.warning(f"No laps found for {driver_1}")
+                    lap_num_1 = None
         
-        with col_lap2:
-            laps_d2 = laps[laps['Driver'] == driver_2]
-            lap_options_2 = laps_d2['LapNumber'].tolist()
+            with col_lap2:
+                laps_d2 = lap_index.driver_laps(laps, driver_2)
+                lap_options_2 = laps_d2['LapNumber'].tolist()
             
-            if lap_options_2:
-                fastest_lap_2 = laps_d2.loc[laps_d2['LapTime'].idxmin(), 'LapNumber']
-                default_idx_2 = lap_options_2.index(fastest_lap_2) if fastest_lap_2 in lap_options_2 else 0
-                lap_num_2 = st.selectbox(f"{driver_2} Lap", lap_options_2, index=default_idx_2, key="tel_lap2")
-            else:
-                st.warning(f"No laps found for {driver_2}")
-                lap_num_2 = None
+                if lap_options_2:
+                    fastest_lap_2 = laps_d2.loc[laps_d2['LapTime'].idxmin(), 'LapNumber']
+                    default_idx_2 = lap_options_2.index(fastest_lap_2) if fastest_lap_2 in lap_options_2 else 0
+                    lap_num_2 = st.selectbox(f"{driver_2} Lap", lap_options_2, index=default_idx_2, key="tel_lap2")
+                else:
+                    st.warning(f"No laps found for {driver_2}")
+                    lap_num_2 = None
         
-        if lap_num_1 and lap_num_2:
-            try:
-                # Get telemetry data
-                lap1 = laps[(laps['Driver'] == driver_1) & (laps['LapNumber'] == lap_num_1)].iloc[0]
-                lap2 = laps[(laps['Driver'] == driver_2) & (laps['LapNumber'] == lap_num_2)].iloc[0]
-                
-                tel1 = lap1.get_telemetry().add_distance()
-                tel2 = lap2.get_telemetry().add_distance()
-                
-                color1 = get_color(driver_1, session)
-                color2 = get_color(driver_2, session)
-                
-                # Lap time comparison
-                st.markdown("###  Lap Time Comparison")
-                col_time1, col_time2, col_delta = st.columns(3)
-                
-                lap_time_1 = lap1['LapTime'].total_seconds()
-                lap_time_2 = lap2['LapTime'].total_seconds()
-                delta = lap_time_2 - lap_time_1
-                
-                col_time1.metric(f"{driver_1}", fmt_time(lap_time_1))
-                col_time2.metric(f"{driver_2}", fmt_time(lap_time_2))
-                col_delta.metric("Δ Delta", f"{delta:+.3f}s", delta_color="inverse")
-                
-                st.markdown("---")
-                
-                # Speed trace
-                st.markdown("###  Speed Trace")
-                fig_speed = go.Figure()
-                
-                fig_speed.add_trace(go.Scatter(
-                    x=tel1['Distance'],
-                    y=tel1['Speed'],
-                    mode='lines',
-                    name=driver_1,
-                    line=dict(color=color1, width=3),
-                    hovertemplate='Distance: %{x:.0f}m<br>Speed: %{y:.0f} km/h<extra></extra>'
-                ))
-                
-                fig_speed.add_trace(go.Scatter(
-                    x=tel2['Distance'],
-                    y=tel2['Speed'],
-                    mode='lines',
-                    name=driver_2,
-                    line=dict(color=color2, width=3),
-                    hovertemplate='Distance: %{x:.0f}m<br>Speed: %{y:.0f} km/h<extra></extra>'
-                ))
-                
-                fig_speed.update_layout(
-                    template="plotly_dark",
-                    height=400,
-                    xaxis_title="Distance (m)",
-                    yaxis_title="Speed (km/h)",
-                    legend=dict(orientation="h", y=1.05, x=0),
-                    margin=dict(t=40, b=40, l=60, r=20),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig_speed, use_container_width=True)
-                
-                # Multi-parameter telemetry
-                st.markdown("###  Throttle, Brake & Gear Analysis")
-                
-                fig_multi = make_subplots(
-                    rows=3, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.05,
-                    subplot_titles=('Throttle Position (%)', 'Brake Pressure', 'Gear')
-                )
-                
-                # Throttle
-                fig_multi.add_trace(
-                    go.Scatter(x=tel1['Distance'], y=tel1['Throttle'], name=driver_1, 
-                              line=dict(color=color1, width=2)),
-                    row=1, col=1
-                )
-                fig_multi.add_trace(
-                    go.Scatter(x=tel2['Distance'], y=tel2['Throttle'], name=driver_2, 
-                              line=dict(color=color2, width=2)),
-                    row=1, col=1
-                )
-                
-                # Brake
-                fig_multi.add_trace(
-                    go.Scatter(x=tel1['Distance'], y=tel1['Brake'], name=driver_1, 
-                              line=dict(color=color1, width=2), showlegend=False),
-                    row=2, col=1
-                )
-                fig_multi.add_trace(
-                    go.Scatter(x=tel2['Distance'], y=tel2['Brake'], name=driver_2, 
-                              line=dict(color=color2, width=2), showlegend=False),
-                    row=2, col=1
-                )
-                
-                # Gear
-                fig_multi.add_trace(
-                    go.Scatter(x=tel1['Distance'], y=tel1['nGear'], name=driver_1, 
-                              line=dict(color=color1, width=2), showlegend=False, mode='lines'),
-                    row=3, col=1
-                )
-                fig_multi.add_trace(
-                    go.Scatter(x=tel2['Distance'], y=tel2['nGear'], name=driver_2, 
-                              line=dict(color=color2, width=2), showlegend=False, mode='lines'),
-                    row=3, col=1
-                )
-                
-                fig_multi.update_xaxes(title_text="Distance (m)", row=3, col=1, gridcolor='#2d3340')
-                fig_multi.update_yaxes(gridcolor='#2d3340')
-                
-                fig_multi.update_layout(
-                    template="plotly_dark",
-                    height=700,
-                    margin=dict(t=60, b=40, l=60, r=20),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    showlegend=True,
-                    legend=dict(orientation="h", y=1.08, x=0)
-                )
-                
-                st.plotly_chart(fig_multi, use_container_width=True)
-                
-                # Speed heatmap on track
-                st.markdown("###  Speed Heatmap")
-                
-                col_map1, col_map2 = st.columns(2)
+            if lap_num_1 and lap_num_2 and not telemetry_ready(session, "deep_dive_telemetry"):
+                if not telemetry_loading(session):
+                    st.info("Car telemetry is loaded on demand - click LOAD TELEMETRY to fetch it for this session.")
+            elif lap_num_1 and lap_num_2:
+                try:
+                    # Get telemetry data
+                    lap1 = lap_index.lap(laps, driver_1, lap_num_1)
+                    lap2 = lap_index.lap(laps, driver_2, lap_num_2)
+                
+                    # Both laps on one shared distance grid
+                    aligned = align_laps(session, [(driver_1, lap_num_1), (driver_2, lap_num_2)],
+                                         resolution=TELEMETRY_RESOLUTION_M)
+                    if aligned is None or len(aligned) < 2:
+                        raise ValueError("no telemetry for the selected laps")
+                    tel1 = aligned.frame(0)
+                    tel2 = aligned.frame(1)
+                
+                    color1 = get_color(driver_1, session)
+                    color2 = get_color(driver_2, session)
+                
+                    # Lap time comparison
+                    st.markdown("###  Lap Time Comparison")
+                    col_time1, col_time2, col_delta = st.columns(3)
+                
+                    lap_time_1 = lap1['LapTime'].total_seconds()
+                    lap_time_2 = lap2['LapTime'].total_seconds()
+                    delta = lap_time_2 - lap_time_1
+                
+                    col_time1.metric(f"{driver_1}", fmt_time(lap_time_1))
+                    col_time2.metric(f"{driver_2}", fmt_time(lap_time_2))
+                    col_delta.metric("Δ Delta", f"{delta:+.3f}s", delta_color="inverse")
+                
+                    st.markdown("---")
+                
+                    # Speed trace
+                    st.markdown("###  Speed Trace")
+                    fig_speed = go.Figure()
+                
+                    fig_speed.add_trace(go.Scatter(
+                        **trace_xy(tel1['Distance'], tel1['Speed']),
+                        mode='lines',
+                        name=driver_1,
+                        line=dict(color=color1, width=3),
+                        hovertemplate='Distance: %{x:.0f}m<br>Speed: %{y:.0f} km/h<extra></extra>'
+                    ))
                 
-                with col_map1:
-                    st.markdown(f"**{driver_1}**")
-                    fig_map1 = go.Figure()
-                    fig_map1.add_trace(go.Scatter(
-                        x=tel1['X'],
-                        y=tel1['Y'],
-                        mode='markers',
-                        marker=dict(
-                            size=3,
-                            color=tel1['Speed'],
-                            colorscale='RdYlGn',
-                            showscale=True,
-                            colorbar=dict(title="km/h", x=1.15)
-                        ),
-                        hovertemplate='Speed: %{marker.color:.0f} km/h<extra></extra>'
+                    fig_speed.add_trace(go.Scatter(
+                        **trace_xy(tel2['Distance'], tel2['Speed']),
+                        mode='lines',
+                        name=driver_2,
+                        line=dict(color=color2, width=3),
+                        hovertemplate='Distance: %{x:.0f}m<br>Speed: %{y:.0f} km/h<extra></extra>'
                     ))
-                    fig_map1.update_layout(
+                
+                    fig_speed.update_layout(
                         template="plotly_dark",
                         height=400,
-                        xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
-                        yaxis=dict(visible=False),
-                        margin=dict(t=20, b=20, l=20, r=20),
+                        xaxis_title="Distance (m)",
+                        yaxis_title="Speed (km/h)",
+                        legend=dict(orientation="h", y=1.05, x=0),
+                        margin=dict(t=40, b=40, l=60, r=20),
                         paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)'
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        hovermode='x unified'
                     )
-                    st.plotly_chart(fig_map1, use_container_width=True)
-                
-                with col_map2:
-                    st.markdown(f"**{driver_2}**")
-                    fig_map2 = go.Figure()
-                    fig_map2.add_trace(go.Scatter(
-                        x=tel2['X'],
-                        y=tel2['Y'],
-                        mode='markers',
-                        marker=dict(
-                            size=3,
-                            color=tel2['Speed'],
-                            colorscale='RdYlGn',
-                            showscale=True,
-                            colorbar=dict(title="km/h", x=1.15)
-                        ),
-                        hovertemplate='Speed: %{marker.color:.0f} km/h<extra></extra>'
+                    st.plotly_chart(fig_speed, use_container_width=True)
+                
+                    # Running delta over distance (driver 2 relative to driver 1)
+                    st.markdown("###  Delta Over Distance")
+                    lap_delta = delta_time(aligned, references=[0])[0, 1]
+                
+                    fig_delta = go.Figure()
+                    fig_delta.add_trace(go.Scatter(
+                        **trace_xy(aligned.distance, lap_delta),
+                        mode='lines',
+                        name=f'{driver_2} vs {driver_1}',
+                        line=dict(color=color2, width=2.5),
+                        fill='tozeroy',
+                        fillcolor='rgba(225, 6, 0, 0.1)',
+                        hovertemplate='Distance: %{x:.0f}m<br>Delta: %{y:+.3f}s<extra></extra>'
                     ))
-                    fig_map2.update_layout(
+                    fig_delta.add_hline(y=0, line_dash="dash", line_color=color1, opacity=0.6)
+                    fig_delta.update_layout(
                         template="plotly_dark",
-                        height=400,
-                        xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
-                        yaxis=dict(visible=False),
-                        margin=dict(t=20, b=20, l=20, r=20),
+                        height=300,
+                        xaxis_title="Distance (m)",
+                        yaxis_title=f"Delta (s) - Positive = {driver_1} ahead",
+                        margin=dict(t=20, b=40, l=60, r=20),
                         paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)'
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        hovermode='x unified'
+                    )
+                    st.plotly_chart(fig_delta, use_container_width=True)
+                
+                    # Every driver's fastest lap against the session's fastest lap
+                    with st.expander("Full Grid Delta to Fastest Lap", expanded=False):
+                        field = session_field_delta(session, resolution=TELEMETRY_RESOLUTION_M)
+                        field_drivers = list(dict.fromkeys(field['Driver']))
+                        if len(field_drivers) > 1:
+                            fig_field = go.Figure()
+                            for d, lap_rows in field.groupby('Driver', sort=False, observed=True):
+                                lap_no = lap_rows['LapNumber'].iloc[0]
+                                fig_field.add_trace(go.Scattergl(
+                                    **trace_xy(lap_rows['Distance'].to_numpy(), lap_rows['Delta'].to_numpy()),
+                                    mode='lines',
+                                    name=d,
+                                    line=dict(color=get_color(d, session), width=1.5),
+                                    hovertemplate=f'<b>{d}</b> L{int(lap_no)}<br>%{{x:.0f}}m: %{{y:+.3f}}s<extra></extra>'
+                                ))
+                            fig_field.update_layout(
+                                template="plotly_dark",
+                                height=450,
+                                xaxis_title="Distance (m)",
+                                yaxis_title=f"Delta to {field_drivers[0]} (s)",
+                                margin=dict(t=20, b=40, l=60, r=20),
+                                paper_bgcolor='rgba(0,0,0,0)',
+                                plot_bgcolor='rgba(255,255,255,0.03)'
+                            )
+                            st.plotly_chart(fig_field, use_container_width=True)
+                        else:
+                            st.info("Not enough telemetry for a full grid comparison")
+                
+                    # Every driver's fastest lap, corner by corner
+                    with st.expander("Corner Analysis - Full Grid", expanded=False):
+                        corner_table = session_corner_stats(session)
+                        if len(corner_table) > 0:
+                            corner_metrics = {
+                                'Minimum Speed (km/h)': ('MinSpeed', 'max'),
+                                'Entry Speed (km/h)': ('EntrySpeed', 'max'),
+                                'Braking Point (m)': ('BrakeStart', 'max'),
+                                'Throttle Pickup (m)': ('ThrottlePickup', 'min'),
+                            }
+                            metric_label = st.selectbox("Metric", list(corner_metrics), key="corner_metric")
+                            metric, best = corner_metrics[metric_label]
+                            matrix = corner_matrix(corner_table, metric)
+                            matrix.columns = [f"T{c}" for c in matrix.columns]
+                            styled = matrix.style.format("{:.0f}", na_rep="-")
+                            styled = styled.highlight_max(color='#1e5c2e') if best == 'max' else styled.highlight_min(color='#1e5c2e')
+                            st.dataframe(styled, use_container_width=True)
+                            st.caption("Fastest lap of every driver; best value per corner highlighted. "
+                                       "Braking point and throttle pickup are distances from the start line.")
+                        else:
+                            st.info("No corners detected for this session")
+                
+                    # Multi-parameter telemetry
+                    st.markdown("###  Throttle, Brake & Gear Analysis")
+                
+                    from plotly.subplots import make_subplots
+                    fig_multi = make_subplots(
+                        rows=3, cols=1,
+                        shared_xaxes=True,
+                        vertical_spacing=0.05,
+                        subplot_titles=('Throttle Position (%)', 'Brake Pressure', 'Gear')
                     )
-                    st.plotly_chart(fig_map2, use_container_width=True)
                 
-                # Gap analysis over distance
-                st.markdown("###  Cumulative Gap Analysis")
+                    # Throttle
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel1['Distance'], tel1['Throttle']), name=driver_1, 
+                                  line=dict(color=color1, width=2)),
+                        row=1, col=1
+                    )
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel2['Distance'], tel2['Throttle']), name=driver_2, 
+                                  line=dict(color=color2, width=2)),
+                        row=1, col=1
+                    )
                 
-                gap_data = calculate_gap_analysis(laps, driver_1, driver_2)
+                    # Brake
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel1['Distance'], tel1['Brake'], 'minmax'), name=driver_1, 
+                                  line=dict(color=color1, width=2), showlegend=False),
+                        row=2, col=1
+                    )
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel2['Distance'], tel2['Brake'], 'minmax'), name=driver_2, 
+                                  line=dict(color=color2, width=2), showlegend=False),
+                        row=2, col=1
+                    )
                 
-                if gap_data is not None and len(gap_data) > 0:
-                    fig_gap = go.Figure()
-                    
-                    fig_gap.add_trace(go.Scatter(
-                        x=gap_data['LapNumber'],
-                        y=gap_data['CumulativeGap'],
-                        mode='lines+markers',
-                        name=f'{driver_1} vs {driver_2}',
-                        line=dict(color='#e10600', width=3),
-                        marker=dict(size=6),
-                        fill='tozeroy',
-                        fillcolor='rgba(225, 6, 0, 0.1)'
-                    ))
-                    
-                    fig_gap.add_hline(y=0, line_dash="dash", line_color="white", opacity=0.3)
-                    
-                    fig_gap.update_layout(
+                    # Gear
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel1['Distance'], tel1['nGear'], 'minmax'), name=driver_1, 
+                                  line=dict(color=color1, width=2), showlegend=False, mode='lines'),
+                        row=3, col=1
+                    )
+                    fig_multi.add_trace(
+                        go.Scatter(**trace_xy(tel2['Distance'], tel2['nGear'], 'minmax'), name=driver_2, 
+                                  line=dict(color=color2, width=2), showlegend=False, mode='lines'),
+                        row=3, col=1
+                    )
+                
+                    fig_multi.update_xaxes(title_text="Distance (m)", row=3, col=1, gridcolor='#2d3340')
+                    fig_multi.update_yaxes(gridcolor='#2d3340')
+                
+                    fig_multi.update_layout(
                         template="plotly_dark",
-                        height=400,
-                        xaxis_title="Lap Number",
-                        yaxis_title=f"Gap (s) - Positive = {driver_2} ahead",
-                        margin=dict(t=40, b=40, l=60, r=20),
+                        height=700,
+                        margin=dict(t=60, b=40, l=60, r=20),
                         paper_bgcolor='rgba(0,0,0,0)',
                         plot_bgcolor='rgba(255,255,255,0.03)',
-                        hovermode='x unified'
+                        showlegend=True,
+                        legend=dict(orientation="h", y=1.08, x=0)
                     )
+                
+                    st.plotly_chart(fig_multi, use_container_width=True)
+                
+                    # Speed heatmap on track
+                    # Mini-sector dominance: who is fastest where
+                    st.markdown("###  Mini-Sector Dominance")
+                    col_dom1, col_dom2, col_dom3 = st.columns(3)
+                    dom_scope = col_dom1.radio("Compare", ["Selected drivers", "Full grid"], horizontal=True, key="dom_scope")
+                    dom_group = col_dom2.radio("Colour by", ["Driver", "Team"], horizontal=True, key="dom_group")
+                    n_segments = col_dom3.slider("Mini-sectors", 10, 50, DEFAULT_MINISECTORS, step=5, key="dom_segments")
+                
+                    geometry = circuit_geometry(session)
+                    minisectors = session_minisectors(session, n_segments)
+                    if geometry is not None and len(minisectors) > 0:
+                        results = session.results
+                        if dom_group == "Team":
+                            groups = dict(zip(results['Abbreviation'], results['TeamName']))
+                            dom_colors = {team: get_color(d, session) for d, team in groups.items()}
+                        else:
+                            groups = None
+                            dom_colors = {d: get_color(d, session) for d in minisectors['Driver'].unique()}
+                        dominance = minisector_dominance(
+                            minisectors, groups=groups,
+                            drivers=[driver_1, driver_2] if dom_scope == "Selected drivers" else None)
+                        # Teammates share a colour; keep the two selected drivers apart
+                        if dom_scope == "Selected drivers" and dom_group == "Driver" and color1 == color2:
+                            dom_colors[driver_2] = '#ffffff'
+                        st.plotly_chart(build_dominance_figure(geometry, dominance, dom_colors), use_container_width=True)
+                        st.caption(f"Fastest lap of each driver split into {n_segments} equal-distance mini-sectors; "
+                                   "the track is coloured by whoever was quickest through each one.")
+                    else:
+                        st.info("Mini-sector data not available for this session")
+                
+                    st.markdown("###  Speed Heatmap")
+                
+                    col_map1, col_map2 = st.columns(2)
+                    map1 = tel1.iloc[downsample(tel1['Distance'], tel1['Speed'], TELEMETRY_POINT_BUDGET)]
+                    map2 = tel2.iloc[downsample(tel2['Distance'], tel2['Speed'], TELEMETRY_POINT_BUDGET)]
+                
+                    with col_map1:
+                        st.markdown(f"**{driver_1}**")
+                        fig_map1 = go.Figure()
+                        fig_map1.add_trace(go.Scatter(
+                            x=map1['X'],
+                            y=map1['Y'],
+                            mode='markers',
+                            marker=dict(
+                                size=3,
+                                color=map1['Speed'],
+                                colorscale='RdYlGn',
+                                showscale=True,
+                                colorbar=dict(title="km/h", x=1.15)
+                            ),
+                            hovertemplate='Speed: %{marker.color:.0f} km/h<extra></extra>'
+                        ))
+                        fig_map1.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
+                            yaxis=dict(visible=False),
+                            margin=dict(t=20, b=20, l=20, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)'
+                        )
+                        st.plotly_chart(fig_map1, use_container_width=True)
+                
+                    with col_map2:
+                        st.markdown(f"**{driver_2}**")
+                        fig_map2 = go.Figure()
+                        fig_map2.add_trace(go.Scatter(
+                            x=map2['X'],
+                            y=map2['Y'],
+                            mode='markers',
+                            marker=dict(
+                                size=3,
+                                color=map2['Speed'],
+                                colorscale='RdYlGn',
+                                showscale=True,
+                                colorbar=dict(title="km/h", x=1.15)
+                            ),
+                            hovertemplate='Speed: %{marker.color:.0f} km/h<extra></extra>'
+                        ))
+                        fig_map2.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
+                            yaxis=dict(visible=False),
+                            margin=dict(t=20, b=20, l=20, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)'
+                        )
+                        st.plotly_chart(fig_map2, use_container_width=True)
+                
+                    # Gap analysis over distance
+                    st.markdown("###  Cumulative Gap Analysis")
+                
+                    gap_data = calculate_gap_analysis(laps, lap_index, driver_1, driver_2)
+                
+                    if gap_data is not None and len(gap_data) > 0:
+                        fig_gap = go.Figure()
                     
-                    st.plotly_chart(fig_gap, use_container_width=True)
+                        fig_gap.add_trace(go.Scatter(
+                            **trace_xy(gap_data['LapNumber'], gap_data['CumulativeGap']),
+                            mode='lines+markers',
+                            name=f'{driver_1} vs {driver_2}',
+                            line=dict(color='#e10600', width=3),
+                            marker=dict(size=6),
+                            fill='tozeroy',
+                            fillcolor='rgba(225, 6, 0, 0.1)'
+                        ))
                     
-                    # Gap statistics
-                    col_gap1, col_gap2, col_gap3 = st.columns(3)
-                    avg_gap = gap_data['CumulativeGap'].mean()
-                    max_gap = gap_data['CumulativeGap'].max()
-                    min_gap = gap_data['CumulativeGap'].min()
+                        fig_gap.add_hline(y=0, line_dash="dash", line_color="white", opacity=0.3)
                     
-                    col_gap1.metric("Average Gap", f"{avg_gap:+.3f}s")
-                    col_gap2.metric("Maximum Gap", f"{max_gap:+.3f}s")
-                    col_gap3.metric("Minimum Gap", f"{min_gap:+.3f}s")
-                else:
-                    st.info("Gap analysis not available - drivers may not have overlapping laps")
+                        fig_gap.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            xaxis_title="Lap Number",
+                            yaxis_title=f"Gap (s) - Positive = {driver_2} ahead",
+                            margin=dict(t=40, b=40, l=60, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(255,255,255,0.03)',
+                            hovermode='x unified'
+                        )
+                    
+                        st.plotly_chart(fig_gap, use_container_width=True)
+                    
+                        # Gap statistics
+                        col_gap1, col_gap2, col_gap3 = st.columns(3)
+                        avg_gap = gap_data['CumulativeGap'].mean()
+                        max_gap = gap_data['CumulativeGap'].max()
+                        min_gap = gap_data['CumulativeGap'].min()
+                    
+                        col_gap1.metric("Average Gap", f"{avg_gap:+.3f}s")
+                        col_gap2.metric("Maximum Gap", f"{max_gap:+.3f}s")
+                        col_gap3.metric("Minimum Gap", f"{min_gap:+.3f}s")
+                    else:
+                        st.info("Gap analysis not available - drivers may not have overlapping laps")
                 
-            except Exception as e:
-                st.error(f"Error loading telemetry: {e}")
-                st.info("Telemetry data might not be available for this session.")
-    else:
-        st.info("Load a session from the Race Analysis tab first!")
+                except Exception as e:
+                    st.error(f"Error loading telemetry: {e}")
+                    st.info("Telemetry data might not be available for this session.")
+        else:
+            st.info("Load a session from the Race Analysis tab first!")
 
 # ==============================================================================
 # TAB 3: CHAMPIONSHIP & HISTORY
 # ==============================================================================
 with tab_championship:
-    # 1. YEAR SELECTOR
-    c_hist1, c_hist2 = st.columns([1, 4])
-    with c_hist1:
-        hist_year = st.selectbox("Select Season Archive", range(2025, 2017, -1), index=0, key="hist_year")
-
-    # 2. FETCH DATA
-    with st.spinner(f"Fetching full championship database for {hist_year}..."):
-        stats = get_analyst_data(hist_year)
-
-    if stats and 'drivers' in stats:
-        # 3. HEADLINES
-        st.markdown(f"## {hist_year} Season Overview")
-
-        m1, m2, m3, m4 = st.columns(4)
-        m1.metric("Drivers' Champion", stats['champion_driver'])
-        m2.metric("Constructors' Champion", stats['champion_team'])
-        m3.metric("Status", "Official Data" if hist_year < 2025 else "Projected")
-
-        st.markdown("---")
-
-        # 4. FULL DATA TABLES
-        t_drivers, t_teams, t_calendar = st.tabs(
-            ["Drivers Standings (Full Grid)", "Constructors Standings", "Season Calendar"])
-
-        with t_drivers:
-            st.dataframe(
-                stats['drivers'],
-                use_container_width=True,
-                hide_index=True,
-                height=700,  # Tall enough for 20 rows
-                column_config={
-                    "Pos": st.column_config.NumberColumn("Pos", format="%d"),
-                    "Points": st.column_config.ProgressColumn("Points", format="%d", min_value=0, max_value=600),
-                }
-            )
+    if tab_open(tab_championship):
+        import plotly.graph_objects as go
+        from charts import build_progression_figure
+
+        # 1. YEAR SELECTOR
+        c_hist1, c_hist2 = st.columns([1, 4])
+        with c_hist1:
+            hist_year = st.selectbox("Select Season Archive", range(2025, 2017, -1), index=0, key="hist_year")
+
+        # 2. FETCH DATA
+        with st.spinner(f"Fetching full championship database for {hist_year}..."):
+            ergast_error = ""
+            try:
+                stats = get_analyst_data(hist_year)
+            except championship.ErgastUnavailable as e:
+                stats = None
+                ergast_error = str(e)
 
-        with t_teams:
-            st.dataframe(
-                stats['teams'],
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "Points": st.column_config.ProgressColumn("Points", format="%d", min_value=0, max_value=900),
-                }
-            )
+        if stats and 'drivers' in stats:
+            # 3. HEADLINES
+            st.markdown(f"## {hist_year} Season Overview")
 
-        with t_calendar:
-            cal = get_schedule(hist_year)
-            if not cal.empty:
-                # Add better column display
-                display_cols = []
-                for col in ['RoundNumber', 'EventName', 'Location', 'Country', 'EventDate']:
-                    if col in cal.columns:
-                        display_cols.append(col)
-                
-                if display_cols:
-                    st.dataframe(
-                        cal[display_cols],
-                        use_container_width=True, 
-                        hide_index=True,
-                        height=600,
-                        column_config={
-                            "RoundNumber": st.column_config.NumberColumn("Round", format="%d"),
-                            "EventDate": st.column_config.DateColumn("Date", format="DD/MM/YYYY")
-                        }
-                    )
-            else:
-                st.info("Calendar data unavailable for this season.")
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Drivers' Champion", stats['champion_driver'])
+            m2.metric("Constructors' Champion", stats['champion_team'])
+            m3.metric("Status", "Official Data" if hist_year < 2025 else "Projected")
+
+            st.markdown("---")
+
+            # 4. FULL DATA TABLES
+            t_drivers, t_teams, t_calendar = st.tabs(
+                ["Drivers Standings (Full Grid)", "Constructors Standings", "Season Calendar"])
+
+            with t_drivers:
+                st.dataframe(
+                    stats['drivers'],
+                    use_container_width=True,
+                    hide_index=True,
+                    height=700,  # Tall enough for 20 rows
+                    column_config={
+                        "Pos": st.column_config.NumberColumn("Pos", format="%d"),
+                        "Points": st.column_config.ProgressColumn("Points", format="%d", min_value=0, max_value=600),
+                    }
+                )
+
+            with t_teams:
+                st.dataframe(
+                    stats['teams'],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Points": st.column_config.ProgressColumn("Points", format="%d", min_value=0, max_value=900),
+                    }
+                )
+
+            with t_calendar:
+                cal = get_schedule(hist_year)
+                if not cal.empty:
+                    # Add better column display
+                    display_cols = []
+                    for col in ['RoundNumber', 'EventName', 'Location', 'Country', 'EventDate']:
+                        if col in cal.columns:
+                            display_cols.append(col)
+                
+                    if display_cols:
+                        st.dataframe(
+                            cal[display_cols],
+                            use_container_width=True, 
+                            hide_index=True,
+                            height=600,
+                            column_config={
+                                "RoundNumber": st.column_config.NumberColumn("Round", format="%d"),
+                                "EventDate": st.column_config.DateColumn("Date", format="DD/MM/YYYY")
+                            }
+                        )
+                else:
+                    st.info("Calendar data unavailable for this season.")
         
-        # Championship progression visualization
-        st.markdown("---")
+            # Championship progression visualization
+            st.markdown("---")
         
-        # Advanced Championship Prediction Engine
-        if hist_year == 2025:
-            st.markdown("### Championship Prediction & Mathematical Analysis")
+            # Championship Prediction: Monte Carlo simulation of the remaining season
+            if hist_year == 2025:
+                st.markdown("### Championship Prediction & Mathematical Analysis")
             
-            # Points system
-            POINTS_SYSTEM = {
-                1: 25, 2: 18, 3: 15, 4: 12, 5: 10, 
-                6: 8, 7: 6, 8: 4, 9: 2, 10: 1
-            }
-            FASTEST_LAP_POINT = 1
+                total_races = 24
+                completed_races = 19
+                remaining_races = total_races - completed_races
+                rounds_left = remaining_rounds(hist_year, completed_races, total_races)
+                remaining_sprints = sum(has_sprint for _, has_sprint in rounds_left)
+                fastest_lap = hist_year in FASTEST_LAP_SEASONS
             
-            top5 = stats['drivers'].head(5).copy()
-            total_races = 24
-            completed_races = 19
-            remaining_races = total_races - completed_races
+                sim_df = run_title_simulation(stats['drivers'][['Driver', 'Points']], remaining_races, remaining_sprints,
+                                              completed_races, fastest_lap, championship.load_results(hist_year))
+                sim_df['Gap'] = sim_df['Points'].max() - sim_df['Points']
+                exact_df = run_title_scenarios(stats['drivers'][['Driver', 'Points']], rounds_left, fastest_lap)
+                status = dict(zip(exact_df['Driver'], exact_df['Status']))
             
-            leader_points = top5.iloc[0]['Points']
-            leader_name = top5.iloc[0]['Driver']
+                st.markdown("#### Detailed Prediction Analysis")
             
-            st.markdown("#### Detailed Prediction Analysis")
+                # Display comprehensive table
+                col_table, col_chart = st.columns([3, 2])
             
-            # Calculate detailed predictions for each driver
-            predictions = []
-            for idx, driver in top5.iterrows():
-                current_points = driver['Points']
-                points_deficit = leader_points - current_points
-                wins = driver['Wins']
-                
-                # Calculate podium rates
-                podium_rate = wins / max(completed_races, 1)
-                
-                # Scenario calculations
-                best_case = current_points + (remaining_races * 26)  # All wins + FL
-                worst_case = current_points + (remaining_races * 1)  # All P10
+                with col_table:
+                    st.dataframe(
+                        sim_df[['Driver', 'Points', 'Gap', 'Title%', 'Expected', 'P5', 'P95', 'Max']],
+                        use_container_width=True,
+                        hide_index=True,
+                        height=400,
+                        column_config={
+                            'Points': st.column_config.NumberColumn('Current', format="%d"),
+                            'Gap': st.column_config.NumberColumn('To Leader', format="%d"),
+                            'Title%': st.column_config.NumberColumn('Title %', format="%.1f%%"),
+                            'Expected': st.column_config.NumberColumn('Expected', format="%.0f"),
+                            'P5': st.column_config.NumberColumn('Low (P5)', format="%.0f"),
+                            'P95': st.column_config.NumberColumn('High (P95)', format="%.0f"),
+                            'Max': st.column_config.NumberColumn('Max Possible', format="%d")
+                        }
+                    )
                 
-                # Realistic scenario (based on current form)
-                if wins >= 3:
-                    avg_finish_points = 20  # Strong form
-                elif wins >= 1:
-                    avg_finish_points = 14  # Moderate form
-                else:
-                    avg_finish_points = 8   # Weak form
+                    st.caption(f"Remaining: {remaining_races} races, {remaining_sprints} sprints | "
+                               f"{DEFAULT_SEASONS:,} simulated seasons")
+            
+                with col_chart:
+                    # Probability visualization
+                    contenders = sim_df.head(5)
+                    fig_prob = go.Figure()
                 
-                realistic = current_points + (remaining_races * avg_finish_points)
+                    colors_gradient = ['#e10600', '#ff3333', '#ff6b6b', '#ffaa00', '#8b9bb4']
                 
-                # Win probability calculation
-                if points_deficit == 0:
-                    base_prob = 55
-                    form_bonus = min(30, podium_rate * 100)
-                    probability = base_prob + form_bonus
-                elif points_deficit <= 15:
-                    probability = 40 - (points_deficit * 1.8)
-                    form_bonus = podium_rate * 20
-                    probability += form_bonus
-                elif points_deficit <= 40:
-                    probability = 20 - (points_deficit * 0.4)
-                else:
-                    probability = max(2, 10 - (points_deficit * 0.15))
+                    fig_prob.add_trace(go.Bar(
+                        y=contenders['Driver'],
+                        x=contenders['Title%'],
+                        orientation='h',
+                        marker=dict(
+                            color=colors_gradient[:len(contenders)],
+                            line=dict(color='white', width=1)
+                        ),
+                        text=[f"{p:.1f}%" for p in contenders['Title%']],
+                        textposition='outside'
+                    ))
                 
-                probability = min(98, max(1, probability))
+                    fig_prob.update_layout(
+                        template="plotly_dark",
+                        height=250,
+                        title="Title Probability",
+                        xaxis=dict(range=[0, 100], gridcolor='#2d3340', showticklabels=False),
+                        yaxis=dict(autorange='reversed'),
+                        margin=dict(t=40, b=20, l=100, r=40),
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        showlegend=False
+                    )
                 
-                predictions.append({
-                    'Driver': driver['Driver'],
-                    'Points': current_points,
-                    'Gap': -points_deficit if points_deficit < 0 else points_deficit,
-                    'Wins': wins,
-                    'Best': best_case,
-                    'Realistic': int(realistic),
-                    'Worst': worst_case,
-                    'Win%': probability,
-                    'AvgPts': avg_finish_points
-                })
+                    st.plotly_chart(fig_prob, use_container_width=True)
             
-            pred_df = pd.DataFrame(predictions)
+                st.markdown("---")
+                st.markdown("#### Detailed Scenarios Analysis")
+            
+                col_s1, col_s2, col_s3 = st.columns(3)
+            
+                # Top 3 contenders: points range from the simulation
+                for idx, col in enumerate([col_s1, col_s2, col_s3]):
+                    if idx < len(sim_df):
+                        driver_pred = sim_df.iloc[idx]
+                        driver_name = driver_pred['Driver']
+                        current = int(driver_pred['Points'])
+                        gap = int(driver_pred['Gap'])
+                    
+                        with col:
+                            st.markdown(f"**{driver_name}**")
+                            st.markdown(f"Current: **{current} pts** | Gap: **{gap if gap > 0 else 'LEADER'} pts**")
+                        
+                            scenarios = [
+                                ("MAXIMUM (WIN EVERYTHING)", driver_pred['Max'], '#e10600', 'rgba(225,6,0,0.1)'),
+                                ("HIGH (95TH PERCENTILE)", driver_pred['P95'], '#ffd700', 'rgba(255,255,255,0.05)'),
+                                ("EXPECTED (SIMULATED MEAN)", driver_pred['Expected'], '#00ff88', 'rgba(0,255,100,0.1)'),
+                                ("LOW (5TH PERCENTILE)", driver_pred['P5'], '#ff9500', 'rgba(255,255,255,0.05)'),
+                            ]
+                            for label, pts, color, bg in scenarios:
+                                st.markdown(f"""
+                                <div style='background: {bg}; padding: 0.6rem; border-radius: 6px; margin: 0.4rem 0;'>
+                                    <div style='font-size: 11px; color: #8b9bb4;'>{label}</div>
+                                    <div style='font-size: 16px; color: {color}; font-weight: 700;'>{pts:.0f} pts</div>
+                                    <div style='font-size: 10px; color: #6b7280;'>+{pts - current:.0f} from now</div>
+                                </div>
+                                """, unsafe_allow_html=True)
+                        
+                            # Championship verdict: exact status first, then the simulated odds
+                            if status.get(driver_name) == 'Champion':
+                                can_win = "CLINCHED"
+                            elif status.get(driver_name) == 'Eliminated':
+                                can_win = "ELIMINATED"
+                            else:
+                                can_win = "STRONG" if driver_pred['Title%'] > 40 else "POSSIBLE" if driver_pred['Title%'] > 15 else "UNLIKELY"
+                            verdict_color = "#e10600" if can_win in ("STRONG", "CLINCHED") else "#ffd700" if can_win == "POSSIBLE" else "#6b7280"
+                        
+                            st.markdown(f"""
+                            <div style='text-align: center; margin-top: 0.5rem; padding: 0.4rem; background: rgba(0,0,0,0.3); border-radius: 6px;'>
+                                <div style='font-size: 10px; color: #8b9bb4;'>CHAMPIONSHIP</div>
+                                <div style='font-size: 14px; color: {verdict_color}; font-weight: 800;'>{can_win}</div>
+                                <div style='font-size: 11px; color: #ffffff;'>{driver_pred['Title%']:.1f}%</div>
+                            </div>
+                            """, unsafe_allow_html=True)
             
-            # Display comprehensive table
-            col_table, col_chart = st.columns([3, 2])
+                st.markdown("---")
+                st.markdown("#### Clinch & Elimination")
             
-            with col_table:
+                in_contention = exact_df[exact_df['Status'] != 'Eliminated']
+                round_columns = [f"R{r}" for r, _ in rounds_left]
                 st.dataframe(
-                    pred_df[['Driver', 'Points', 'Gap', 'Wins', 'Best', 'Realistic', 'Worst']],
+                    in_contention[['Driver', 'Status', 'Points', 'Max'] + round_columns],
                     use_container_width=True,
                     hide_index=True,
                     column_config={
-                        'Points': 'Current',
-                        'Gap': 'To Leader',
-                        'Best': 'Best Case',
-                        'Realistic': 'Realistic',
-                        'Worst': 'Worst Case'
+                        'Points': st.column_config.NumberColumn('Current', format="%d"),
+                        'Max': st.column_config.NumberColumn('Max Possible', format="%d"),
+                        **{f"R{r}": st.column_config.TextColumn(f"R{r}" + (" (S)" if sprint else ""))
+                           for r, sprint in rounds_left}
                     }
                 )
-                
-                st.caption(f"Remaining races: {remaining_races} | Points per position: P1=25, P2=18, P3=15, P4=12, P5=10")
-            
-            with col_chart:
-                # Probability visualization
-                fig_prob = go.Figure()
-                
-                colors_gradient = ['#e10600', '#ff3333', '#ff6b6b', '#ffaa00', '#8b9bb4']
-                
-                fig_prob.add_trace(go.Bar(
-                    y=pred_df['Driver'],
-                    x=pred_df['Win%'],
-                    orientation='h',
-                    marker=dict(
-                        color=colors_gradient[:len(pred_df)],
-                        line=dict(color='white', width=1)
-                    ),
-                    text=[f"{p:.1f}%" for p in pred_df['Win%']],
-                    textposition='outside'
-                ))
-                
-                fig_prob.update_layout(
-                    template="plotly_dark",
-                    height=250,
-                    title="Win Probability",
-                    xaxis=dict(range=[0, 100], gridcolor='#2d3340', showticklabels=False),
-                    yaxis=dict(autorange='reversed'),
-                    margin=dict(t=40, b=20, l=100, r=40),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    showlegend=False
-                )
-                
-                st.plotly_chart(fig_prob, use_container_width=True)
-            
-            st.markdown("---")
-            st.markdown("#### Detailed Scenarios Analysis")
-            
-            col_s1, col_s2, col_s3 = st.columns(3)
-            
-            # Top 3 drivers scenarios
-            for idx, col in enumerate([col_s1, col_s2, col_s3]):
-                if idx < len(predictions):
-                    driver_pred = predictions[idx]
-                    driver_name = driver_pred['Driver']
-                    current = driver_pred['Points']
-                    gap = driver_pred['Gap']
-                    
-                    with col:
-                        st.markdown(f"**{driver_name}**")
-                        st.markdown(f"Current: **{current} pts** | Gap: **{gap if gap > 0 else 'LEADER'} pts**")
-                        
-                        # Scenario 1: All wins
-                        all_wins = current + (remaining_races * 26)
-                        st.markdown(f"""
-                        <div style='background: rgba(225,6,0,0.1); padding: 0.6rem; border-radius: 6px; margin: 0.4rem 0;'>
-                            <div style='font-size: 11px; color: #8b9bb4;'>ALL P1 + FL</div>
-                            <div style='font-size: 16px; color: #e10600; font-weight: 700;'>{all_wins} pts</div>
-                            <div style='font-size: 10px; color: #6b7280;'>+{all_wins - current} from now</div>
-</div>
-""", unsafe_allow_html=True)
-                        
-                        # Scenario 2: All podiums (P2)
-                        all_p2 = current + (remaining_races * 19)  # P2 + FL
-                        st.markdown(f"""
-                        <div style='background: rgba(255,255,255,0.05); padding: 0.6rem; border-radius: 6px; margin: 0.4rem 0;'>
-                            <div style='font-size: 11px; color: #8b9bb4;'>ALL P2 + FL</div>
-                            <div style='font-size: 16px; color: #ffd700; font-weight: 700;'>{all_p2} pts</div>
-                            <div style='font-size: 10px; color: #6b7280;'>+{all_p2 - current} from now</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Scenario 3: All P3
-                        all_p3 = current + (remaining_races * 16)  # P3 + FL
-                        st.markdown(f"""
-                        <div style='background: rgba(255,255,255,0.05); padding: 0.6rem; border-radius: 6px; margin: 0.4rem 0;'>
-                            <div style='font-size: 11px; color: #8b9bb4;'>ALL P3 + FL</div>
-                            <div style='font-size: 16px; color: #ff9500; font-weight: 700;'>{all_p3} pts</div>
-                            <div style='font-size: 10px; color: #6b7280;'>+{all_p3 - current} from now</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Realistic scenario
-                        realistic_pts = driver_pred['Realistic']
-                        st.markdown(f"""
-                        <div style='background: rgba(0,255,100,0.1); padding: 0.6rem; border-radius: 6px; margin: 0.4rem 0;'>
-                            <div style='font-size: 11px; color: #8b9bb4;'>REALISTIC (AVG P{3 if driver_pred['AvgPts'] > 15 else 4 if driver_pred['AvgPts'] > 10 else 6})</div>
-                            <div style='font-size: 16px; color: #00ff88; font-weight: 700;'>{realistic_pts} pts</div>
-                            <div style='font-size: 10px; color: #6b7280;'>+{realistic_pts - current} from now</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Championship verdict
-                        can_win = "STRONG" if driver_pred['Win%'] > 40 else "POSSIBLE" if driver_pred['Win%'] > 15 else "UNLIKELY"
-                        verdict_color = "#e10600" if can_win == "STRONG" else "#ffd700" if can_win == "POSSIBLE" else "#6b7280"
-                        
-                        st.markdown(f"""
-                        <div style='text-align: center; margin-top: 0.5rem; padding: 0.4rem; background: rgba(0,0,0,0.3); border-radius: 6px;'>
-                            <div style='font-size: 10px; color: #8b9bb4;'>CHAMPIONSHIP</div>
-                            <div style='font-size: 14px; color: {verdict_color}; font-weight: 800;'>{can_win}</div>
-                            <div style='font-size: 11px; color: #ffffff;'>{driver_pred['Win%']:.1f}%</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                st.caption(f"Exact over every possible finishing order: {len(exact_df) - len(in_contention)} drivers are "
+                           "mathematically eliminated. Round columns show the worst Grand Prix finish that keeps a driver's "
+                           "title hopes alive if they win every other race and sprint; level on points counts as alive.")
             
+                st.markdown("---")
+                st.caption("Note: Every remaining race and sprint is simulated for the full grid. Each driver's finishing position "
+                           "is drawn from their form this season (mean and spread of their results, or their points per race). "
+                           "Points: P1=25, P2=18, P3=15, P4=12, P5=10, P6=8, P7=6, P8=4, P9=2, P10=1; "
+                           "sprint P1-P8 = 8-1" + ("; FL=+1 for a top-10 finish." if fastest_lap else "."))
+        
             st.markdown("---")
-            st.caption("Note: Predictions based on mathematical scenarios. Best Case assumes all wins with fastest lap. Realistic scenario based on current average performance. Points: P1=25, P2=18, P3=15, P4=12, P5=10, P6=8, P7=6, P8=4, P9=2, P10=1, FL=+1")
+            st.markdown("### Championship Progression")
         
-        st.markdown("---")
-        st.markdown("### Championship Progression")
+            # Round-by-round points from the local results store (only new rounds are fetched)
+            progression = season_progression(hist_year)
+            if len(progression['drivers']) > 0:
+                col_line1, col_line2 = st.columns(2)
+                with col_line1:
+                    st.markdown("#### Drivers' Points by Round (Top 10)")
+                    st.plotly_chart(build_progression_figure(progression['drivers'], progression['rounds']),
+                                    use_container_width=True)
+                with col_line2:
+                    st.markdown("#### Constructors' Points by Round")
+                    st.plotly_chart(build_progression_figure(progression['teams'], progression['rounds'], top=12),
+                                    use_container_width=True)
+                st.caption(f"After round {progression['drivers'].index[-1]}, race and sprint results included.")
         
-        col_prog1, col_prog2 = st.columns(2)
+            col_prog1, col_prog2 = st.columns(2)
         
-        with col_prog1:
-            st.markdown("#### Drivers' Championship Top 10")
-            if 'drivers' in stats:
-                top10_drivers = stats['drivers'].head(10)
-                
-                fig_drivers = go.Figure()
-                fig_drivers.add_trace(go.Bar(
-                    y=top10_drivers['Driver'],
-                    x=top10_drivers['Points'],
-                    orientation='h',
-                    marker_color='#e10600',
-                    text=top10_drivers['Points'],
-                    textposition='outside'
-                ))
+            with col_prog1:
+                st.markdown("#### Drivers' Championship Top 10")
+                if 'drivers' in stats:
+                    top10_drivers = stats['drivers'].head(10)
+                
+                    fig_drivers = go.Figure()
+                    fig_drivers.add_trace(go.Bar(
+                        y=top10_drivers['Driver'],
+                        x=top10_drivers['Points'],
+                        orientation='h',
+                        marker_color='#e10600',
+                        text=top10_drivers['Points'],
+                        textposition='outside'
+                    ))
                 
-                fig_drivers.update_layout(
-                    template="plotly_dark",
-                    height=500,
-                    xaxis_title="Points",
-                    yaxis_title="",
-                    margin=dict(t=20, b=40, l=150, r=40),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    yaxis=dict(autorange='reversed')
-                )
+                    fig_drivers.update_layout(
+                        template="plotly_dark",
+                        height=500,
+                        xaxis_title="Points",
+                        yaxis_title="",
+                        margin=dict(t=20, b=40, l=150, r=40),
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        yaxis=dict(autorange='reversed')
+                    )
                 
-                st.plotly_chart(fig_drivers, use_container_width=True)
+                    st.plotly_chart(fig_drivers, use_container_width=True)
         
-        with col_prog2:
-            st.markdown("#### Constructors' Championship")
-            if 'teams' in stats:
-                teams_data = stats['teams']
-                
-                fig_teams = go.Figure()
-                fig_teams.add_trace(go.Bar(
-                    y=teams_data['Team'],
-                    x=teams_data['Points'],
-                    orientation='h',
-                    marker_color='#ff6b6b',
-                    text=teams_data['Points'],
-                    textposition='outside'
-                ))
+            with col_prog2:
+                st.markdown("#### Constructors' Championship")
+                if 'teams' in stats:
+                    teams_data = stats['teams']
+                
+                    fig_teams = go.Figure()
+                    fig_teams.add_trace(go.Bar(
+                        y=teams_data['Team'],
+                        x=teams_data['Points'],
+                        orientation='h',
+                        marker_color='#ff6b6b',
+                        text=teams_data['Points'],
+                        textposition='outside'
+                    ))
                 
-                fig_teams.update_layout(
-                    template="plotly_dark",
-                    height=500,
-                    xaxis_title="Points",
-                    yaxis_title="",
-                    margin=dict(t=20, b=40, l=150, r=40),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    yaxis=dict(autorange='reversed')
-                )
+                    fig_teams.update_layout(
+                        template="plotly_dark",
+                        height=500,
+                        xaxis_title="Points",
+                        yaxis_title="",
+                        margin=dict(t=20, b=40, l=150, r=40),
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        yaxis=dict(autorange='reversed')
+                    )
                 
-                st.plotly_chart(fig_teams, use_container_width=True)
+                    st.plotly_chart(fig_teams, use_container_width=True)
     
-    else:
-        st.error("Could not fetch data from Ergast API. Please try again later.")
+        else:
+            st.error(f"Could not fetch data from Ergast API. Please try again later. ({ergast_error})")
 
 # ==============================================================================
 # TAB 4: DRIVER COMPARISON
 # ==============================================================================
 with tab_comparison:
-    st.markdown("## Head-to-Head Driver Comparison")
+    if tab_open(tab_comparison):
+        import plotly.graph_objects as go
+
+        st.markdown("## Head-to-Head Driver Comparison")
     
-    if st.session_state.session_obj:
-        session = st.session_state.session_obj
-        laps = session.laps
+        if st.session_state.session_obj:
+            session = current_session()
+            laps = session.get_laps(['Driver', 'LapNumber', 'LapTime', 'LapTimeSec', 'Position', 'Compound', 'IsClean',
+                                     'Sector1Time', 'Sector2Time', 'Sector3Time'])
+            lap_index = session.lap_index
+            metrics = session_metrics(session)
         
-        try:
-            all_drivers = session.results.sort_values(by="Position")['Abbreviation'].tolist()
-        except:
-            all_drivers = pd.unique(laps['Driver']).tolist()
+            try:
+                all_drivers = session.results.sort_values(by="Position")['Abbreviation'].tolist()
+            except:
+                all_drivers = pd.unique(laps['Driver']).tolist()
         
-        # Driver selection
-        col_comp1, col_comp2 = st.columns(2)
+            # Driver selection
+            col_comp1, col_comp2 = st.columns(2)
         
-        with col_comp1:
-            comp_driver1 = st.selectbox("Select Driver 1", all_drivers, index=0, key="comp_d1")
+            with col_comp1:
+                comp_driver1 = st.selectbox("Select Driver 1", all_drivers, index=0, key="comp_d1")
         
-        with col_comp2:
-            comp_driver2 = st.selectbox("Select Driver 2", all_drivers, 
-                                       index=min(1, len(all_drivers)-1), key="comp_d2")
+            with col_comp2:
+                comp_driver2 = st.selectbox("Select Driver 2", all_drivers, 
+                                           index=min(1, len(all_drivers)-1), key="comp_d2")
         
-        if comp_driver1 and comp_driver2:
-            laps1 = laps[laps['Driver'] == comp_driver1].copy()
-            laps2 = laps[laps['Driver'] == comp_driver2].copy()
+            if comp_driver1 and comp_driver2:
+                laps1 = lap_index.driver_laps(laps, comp_driver1)
+                laps2 = lap_index.driver_laps(laps, comp_driver2)
             
-            color1 = get_color(comp_driver1, session)
-            color2 = get_color(comp_driver2, session)
+                color1 = get_color(comp_driver1, session)
+                color2 = get_color(comp_driver2, session)
             
-            # Performance metrics
-            st.markdown("###  Performance Metrics")
+                # Performance metrics
+                st.markdown("###  Performance Metrics")
             
-            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+                col_m1, col_m2, col_m3, col_m4 = st.columns(4)
             
-            # Fastest lap
-            fastest1 = laps1['LapTime'].min().total_seconds() if len(laps1) > 0 else 0
-            fastest2 = laps2['LapTime'].min().total_seconds() if len(laps2) > 0 else 0
+                # Fastest lap
+                fastest1 = laps1['LapTimeSec'].min() if len(laps1) > 0 else 0
+                fastest2 = laps2['LapTimeSec'].min() if len(laps2) > 0 else 0
             
-            col_m1.metric(f"{comp_driver1} Fastest", fmt_time(fastest1))
-            col_m2.metric(f"{comp_driver2} Fastest", fmt_time(fastest2))
+                col_m1.metric(f"{comp_driver1} Fastest", fmt_time(fastest1))
+                col_m2.metric(f"{comp_driver2} Fastest", fmt_time(fastest2))
             
-            # Average pace (clean laps only)
-            clean1 = laps1[(laps1['PitOutTime'].isna()) & (laps1['PitInTime'].isna())]
-            clean2 = laps2[(laps2['PitOutTime'].isna()) & (laps2['PitInTime'].isna())]
+                # Average pace (clean laps only)
+                clean1 = laps1[laps1['IsClean']]
+                clean2 = laps2[laps2['IsClean']]
             
-            avg1 = clean1['LapTime'].dt.total_seconds().mean() if len(clean1) > 0 else 0
-            avg2 = clean2['LapTime'].dt.total_seconds().mean() if len(clean2) > 0 else 0
+                avg1 = clean1['LapTimeSec'].mean() if len(clean1) > 0 else 0
+                avg2 = clean2['LapTimeSec'].mean() if len(clean2) > 0 else 0
             
-            col_m3.metric(f"{comp_driver1} Avg", fmt_time(avg1))
-            col_m4.metric(f"{comp_driver2} Avg", fmt_time(avg2))
+                col_m3.metric(f"{comp_driver1} Avg", fmt_time(avg1))
+                col_m4.metric(f"{comp_driver2} Avg", fmt_time(avg2))
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Consistency analysis
-            st.markdown("###  Consistency Analysis")
+                # Consistency analysis
+                st.markdown("###  Consistency Analysis")
             
-            cons1 = calculate_race_consistency(laps, comp_driver1)
-            cons2 = calculate_race_consistency(laps, comp_driver2)
+                cons1 = driver_metrics(metrics['consistency'], comp_driver1)
+                cons2 = driver_metrics(metrics['consistency'], comp_driver2)
             
-            if cons1 and cons2:
-                col_cons1, col_cons2 = st.columns(2)
-                
-                with col_cons1:
-                    st.markdown(f"**{comp_driver1}**")
-                    st.metric("Consistency Score", f"{cons1['consistency_score']:.1f}%")
-                    st.metric("Std Deviation", f"{cons1['std_dev']:.3f}s")
-                
-                with col_cons2:
-                    st.markdown(f"**{comp_driver2}**")
-                    st.metric("Consistency Score", f"{cons2['consistency_score']:.1f}%")
-                    st.metric("Std Deviation", f"{cons2['std_dev']:.3f}s")
+                if cons1 and cons2:
+                    col_cons1, col_cons2 = st.columns(2)
+                
+                    with col_cons1:
+                        st.markdown(f"**{comp_driver1}**")
+                        st.metric("Consistency Score", f"{cons1['consistency_score']:.1f}%")
+                        st.metric("Std Deviation", f"{cons1['std_dev']:.3f}s")
+                
+                    with col_cons2:
+                        st.markdown(f"**{comp_driver2}**")
+                        st.metric("Consistency Score", f"{cons2['consistency_score']:.1f}%")
+                        st.metric("Std Deviation", f"{cons2['std_dev']:.3f}s")
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Sector comparison
-            st.markdown("###  Sector Performance")
+                # Sector comparison
+                st.markdown("###  Sector Performance")
             
-            sector_data = analyze_sector_performance(laps, [comp_driver1, comp_driver2])
+                sector_data = {}
+                for d in [comp_driver1, comp_driver2]:
+                    row = driver_metrics(metrics['sectors'], d)
+                    if row:
+                        sector_data[d] = row
             
-            if sector_data:
-                # Create sector comparison chart
-                sectors = ['S1', 'S2', 'S3']
+                if sector_data:
+                    # Create sector comparison chart
+                    sectors = ['S1', 'S2', 'S3']
                 
-                if comp_driver1 in sector_data and comp_driver2 in sector_data:
-                    times1 = [sector_data[comp_driver1][s] for s in sectors]
-                    times2 = [sector_data[comp_driver2][s] for s in sectors]
+                    if comp_driver1 in sector_data and comp_driver2 in sector_data:
+                        times1 = [sector_data[comp_driver1][s] for s in sectors]
+                        times2 = [sector_data[comp_driver2][s] for s in sectors]
                     
-                    fig_sectors = go.Figure()
+                        fig_sectors = go.Figure()
                     
-                    fig_sectors.add_trace(go.Bar(
-                        x=sectors,
-                        y=times1,
-                        name=comp_driver1,
-                        marker_color=color1,
-                        text=[f"{t:.3f}s" for t in times1],
-                        textposition='outside'
-                    ))
+                        fig_sectors.add_trace(go.Bar(
+                            x=sectors,
+                            y=times1,
+                            name=comp_driver1,
+                            marker_color=color1,
+                            text=[f"{t:.3f}s" for t in times1],
+                            textposition='outside'
+                        ))
                     
-                    fig_sectors.add_trace(go.Bar(
-                        x=sectors,
-                        y=times2,
-                        name=comp_driver2,
-                        marker_color=color2,
-                        text=[f"{t:.3f}s" for t in times2],
-                        textposition='outside'
-                    ))
+                        fig_sectors.add_trace(go.Bar(
+                            x=sectors,
+                            y=times2,
+                            name=comp_driver2,
+                            marker_color=color2,
+                            text=[f"{t:.3f}s" for t in times2],
+                            textposition='outside'
+                        ))
                     
-                    fig_sectors.update_layout(
-                        template="plotly_dark",
-                        height=400,
-                        barmode='group',
-                        yaxis_title="Time (seconds)",
-                        xaxis_title="Sector",
-                        margin=dict(t=40, b=40, l=60, r=20),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(255,255,255,0.03)',
-                        legend=dict(orientation="h", y=1.1, x=0)
-                    )
+                        fig_sectors.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            barmode='group',
+                            yaxis_title="Time (seconds)",
+                            xaxis_title="Sector",
+                            margin=dict(t=40, b=40, l=60, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(255,255,255,0.03)',
+                            legend=dict(orientation="h", y=1.1, x=0)
+                        )
                     
-                    st.plotly_chart(fig_sectors, use_container_width=True)
+                        st.plotly_chart(fig_sectors, use_container_width=True)
                     
-                    # Sector delta table
-                    st.markdown("#### Sector Deltas")
-                    delta_data = []
-                    for s in sectors:
-                        delta = times2[sectors.index(s)] - times1[sectors.index(s)]
-                        delta_data.append({
-                            'Sector': s,
-                            comp_driver1: f"{times1[sectors.index(s)]:.3f}s",
-                            comp_driver2: f"{times2[sectors.index(s)]:.3f}s",
-                            'Delta': f"{delta:+.3f}s"
-                        })
+                        # Sector delta table
+                        st.markdown("#### Sector Deltas")
+                        delta_data = []
+                        for s in sectors:
+                            delta = times2[sectors.index(s)] - times1[sectors.index(s)]
+                            delta_data.append({
+                                'Sector': s,
+                                comp_driver1: f"{times1[sectors.index(s)]:.3f}s",
+                                comp_driver2: f"{times2[sectors.index(s)]:.3f}s",
+                                'Delta': f"{delta:+.3f}s"
+                            })
                     
-                    st.dataframe(pd.DataFrame(delta_data), use_container_width=True, hide_index=True)
+                        st.dataframe(pd.DataFrame(delta_data), use_container_width=True, hide_index=True)
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Tire degradation comparison
-            st.markdown("###  Tire Degradation Analysis")
+                # Tire degradation comparison
+                st.markdown("###  Tire Degradation Analysis")
             
-            deg1 = calculate_tire_degradation(laps, comp_driver1)
-            deg2 = calculate_tire_degradation(laps, comp_driver2)
+                deg1 = driver_degradation(metrics['degradation'], comp_driver1)
+                deg2 = driver_degradation(metrics['degradation'], comp_driver2)
             
-            if deg1 or deg2:
-                col_tire1, col_tire2 = st.columns(2)
-                
-                with col_tire1:
-                    st.markdown(f"**{comp_driver1}**")
-                    if deg1:
-                        for compound, data in deg1.items():
-                            st.metric(
-                                f"{compound}", 
-                                f"{data['rate']:+.3f}s/lap",
-                                f"{data['laps']} laps"
-                            )
-                    else:
-                        st.info("No degradation data")
-                
-                with col_tire2:
-                    st.markdown(f"**{comp_driver2}**")
-                    if deg2:
-                        for compound, data in deg2.items():
-                            st.metric(
-                                f"{compound}", 
-                                f"{data['rate']:+.3f}s/lap",
-                                f"{data['laps']} laps"
-                            )
-                    else:
-                        st.info("No degradation data")
+                if deg1 or deg2:
+                    col_tire1, col_tire2 = st.columns(2)
+                
+                    with col_tire1:
+                        st.markdown(f"**{comp_driver1}**")
+                        if deg1:
+                            for compound, data in deg1.items():
+                                st.metric(
+                                    f"{compound}", 
+                                    f"{data['rate']:+.3f}s/lap",
+                                    f"{data['laps']} laps"
+                                )
+                        else:
+                            st.info("No degradation data")
+                
+                    with col_tire2:
+                        st.markdown(f"**{comp_driver2}**")
+                        if deg2:
+                            for compound, data in deg2.items():
+                                st.metric(
+                                    f"{compound}", 
+                                    f"{data['rate']:+.3f}s/lap",
+                                    f"{data['laps']} laps"
+                                )
+                        else:
+                            st.info("No degradation data")
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Position changes over race
-            st.markdown("###  Race Position Progression")
+                # Position changes over race
+                st.markdown("###  Race Position Progression")
             
-            try:
-                # Get position data for both drivers
-                pos1 = laps1[['LapNumber', 'Position']].copy()
-                pos2 = laps2[['LapNumber', 'Position']].copy()
+                try:
+                    # Get position data for both drivers
+                    pos1 = laps1[['LapNumber', 'Position']].copy()
+                    pos2 = laps2[['LapNumber', 'Position']].copy()
                 
-                fig_pos = go.Figure()
+                    fig_pos = go.Figure()
                 
-                fig_pos.add_trace(go.Scatter(
-                    x=pos1['LapNumber'],
-                    y=pos1['Position'],
-                    mode='lines+markers',
-                    name=comp_driver1,
-                    line=dict(color=color1, width=3),
-                    marker=dict(size=6)
-                ))
+                    fig_pos.add_trace(go.Scatter(
+                        x=pos1['LapNumber'],
+                        y=pos1['Position'],
+                        mode='lines+markers',
+                        name=comp_driver1,
+                        line=dict(color=color1, width=3),
+                        marker=dict(size=6)
+                    ))
                 
-                fig_pos.add_trace(go.Scatter(
-                    x=pos2['LapNumber'],
-                    y=pos2['Position'],
-                    mode='lines+markers',
-                    name=comp_driver2,
-                    line=dict(color=color2, width=3),
-                    marker=dict(size=6)
-                ))
+                    fig_pos.add_trace(go.Scatter(
+                        x=pos2['LapNumber'],
+                        y=pos2['Position'],
+                        mode='lines+markers',
+                        name=comp_driver2,
+                        line=dict(color=color2, width=3),
+                        marker=dict(size=6)
+                    ))
                 
-                fig_pos.update_layout(
-                    template="plotly_dark",
-                    height=400,
-                    yaxis=dict(
-                        title="Position",
-                        autorange='reversed',  # 1st place at top
-                        gridcolor='#2d3340'
-                    ),
-                    xaxis=dict(title="Lap Number", gridcolor='#2d3340'),
-                    margin=dict(t=40, b=40, l=60, r=20),
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(255,255,255,0.03)',
-                    legend=dict(orientation="h", y=1.1, x=0),
-                    hovermode='x unified'
-                )
+                    fig_pos.update_layout(
+                        template="plotly_dark",
+                        height=400,
+                        yaxis=dict(
+                            title="Position",
+                            autorange='reversed',  # 1st place at top
+                            gridcolor='#2d3340'
+                        ),
+                        xaxis=dict(title="Lap Number", gridcolor='#2d3340'),
+                        margin=dict(t=40, b=40, l=60, r=20),
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(255,255,255,0.03)',
+                        legend=dict(orientation="h", y=1.1, x=0),
+                        hovermode='x unified'
+                    )
                 
-                st.plotly_chart(fig_pos, use_container_width=True)
+                    st.plotly_chart(fig_pos, use_container_width=True)
             
-            except Exception as e:
-                st.info("Position progression data not available")
+                except Exception as e:
+                    st.info("Position progression data not available")
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Head-to-head lap time comparison
-            st.markdown("### Lap-by-Lap Comparison")
+                # Head-to-head lap time comparison
+                st.markdown("### Lap-by-Lap Comparison")
             
-            try:
-                # Get clean laps for both drivers
-                clean1 = laps1[(laps1['PitOutTime'].isna()) & (laps1['PitInTime'].isna())].copy()
-                clean2 = laps2[(laps2['PitOutTime'].isna()) & (laps2['PitInTime'].isna())].copy()
-                
-                if len(clean1) > 0 and len(clean2) > 0:
-                    # Merge data
-                    comparison = pd.merge(
-                        clean1[['LapNumber', 'LapTimeSec']],
-                        clean2[['LapNumber', 'LapTimeSec']],
-                        on='LapNumber',
-                        suffixes=('_1', '_2')
-                    )
+                try:
+                    # Get clean laps for both drivers
+                    clean1 = laps1[laps1['IsClean']]
+                    clean2 = laps2[laps2['IsClean']]
+                
+                    if len(clean1) > 0 and len(clean2) > 0:
+                        # Merge data
+                        comparison = pd.merge(
+                            clean1[['LapNumber', 'LapTimeSec']],
+                            clean2[['LapNumber', 'LapTimeSec']],
+                            on='LapNumber',
+                            suffixes=('_1', '_2')
+                        )
                     
-                    comparison['Delta'] = comparison['LapTimeSec_2'] - comparison['LapTimeSec_1']
+                        comparison['Delta'] = comparison['LapTimeSec_2'] - comparison['LapTimeSec_1']
                     
-                    fig_h2h = go.Figure()
+                        fig_h2h = go.Figure()
                     
-                    # Color based on who was faster
-                    colors = [color1 if d < 0 else color2 for d in comparison['Delta']]
+                        # Color based on who was faster
+                        colors = [color1 if d < 0 else color2 for d in comparison['Delta']]
                     
-                    fig_h2h.add_trace(go.Bar(
-                        x=comparison['LapNumber'],
-                        y=comparison['Delta'].abs(),
-                        marker_color=colors,
-                        text=[f"{d:+.3f}s" for d in comparison['Delta']],
-                        textposition='outside',
-                        hovertemplate='Lap: %{x}<br>Delta: %{text}<extra></extra>'
-                    ))
+                        fig_h2h.add_trace(go.Bar(
+                            x=comparison['LapNumber'],
+                            y=comparison['Delta'].abs(),
+                            marker_color=colors,
+                            text=[f"{d:+.3f}s" for d in comparison['Delta']],
+                            textposition='outside',
+                            hovertemplate='Lap: %{x}<br>Delta: %{text}<extra></extra>'
+                        ))
                     
-                    fig_h2h.update_layout(
-                        template="plotly_dark",
-                        height=400,
-                        xaxis_title="Lap Number",
-                        yaxis_title="Time Delta (seconds)",
-                        margin=dict(t=40, b=40, l=60, r=20),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(255,255,255,0.03)',
-                        showlegend=False
-                    )
+                        fig_h2h.update_layout(
+                            template="plotly_dark",
+                            height=400,
+                            xaxis_title="Lap Number",
+                            yaxis_title="Time Delta (seconds)",
+                            margin=dict(t=40, b=40, l=60, r=20),
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(255,255,255,0.03)',
+                            showlegend=False
+                        )
                     
-                    st.plotly_chart(fig_h2h, use_container_width=True)
+                        st.plotly_chart(fig_h2h, use_container_width=True)
                     
-                    # Summary statistics
-                    st.markdown("#### Head-to-Head Summary")
-                    col_sum1, col_sum2, col_sum3, col_sum4 = st.columns(4)
+                        # Summary statistics
+                        st.markdown("#### Head-to-Head Summary")
+                        col_sum1, col_sum2, col_sum3, col_sum4 = st.columns(4)
                     
-                    faster_laps_1 = (comparison['Delta'] < 0).sum()
-                    faster_laps_2 = (comparison['Delta'] > 0).sum()
-                    avg_delta = comparison['Delta'].mean()
+                        faster_laps_1 = (comparison['Delta'] < 0).sum()
+                        faster_laps_2 = (comparison['Delta'] > 0).sum()
+                        avg_delta = comparison['Delta'].mean()
                     
-                    col_sum1.metric(f"{comp_driver1} Faster", f"{faster_laps_1} laps")
-                    col_sum2.metric(f"{comp_driver2} Faster", f"{faster_laps_2} laps")
-                    col_sum3.metric("Average Delta", f"{avg_delta:+.3f}s")
-                    col_sum4.metric("Biggest Gap", f"{comparison['Delta'].abs().max():.3f}s")
+                        col_sum1.metric(f"{comp_driver1} Faster", f"{faster_laps_1} laps")
+                        col_sum2.metric(f"{comp_driver2} Faster", f"{faster_laps_2} laps")
+                        col_sum3.metric("Average Delta", f"{avg_delta:+.3f}s")
+                        col_sum4.metric("Biggest Gap", f"{comparison['Delta'].abs().max():.3f}s")
                     
-            except Exception as e:
-                st.info("Lap-by-lap comparison not available")
+                except Exception as e:
+                    st.info("Lap-by-lap comparison not available")
     
-    else:
-        st.info("Load a session from the Race Analysis tab first!")
+        else:
+            st.info("Load a session from the Race Analysis tab first!")
+
+render_next_race(countdown_slot)
+
+# --- SESSION POOL (sidebar) ---
+with st.sidebar:
+    pool_stats = session_pool().stats()
+    st.markdown("#### Session Pool")
+    st.metric("Resident Sessions", pool_stats['resident'])
+    st.metric("Memory", f"{pool_stats['bytes'] / 2**20:.0f} / {pool_stats['budget'] / 2**20:.0f} MB")
+    st.caption(f"Compact dtypes save {pool_stats['saved'] / 2**20:.1f} MB")
+    st.caption(f"Hits {pool_stats['hits']} • Misses {pool_stats['misses']} • Evictions {pool_stats['evictions']}")
+
+# Background prefetch starts once the first page is out
+start_cache_warmer()
+st.session_state.page_rendered = True
 
 # --- FOOTER ---
 st.markdown("---")
@@ -0,0 +1,587 @@
+"""
+Micro-benchmarks for the dashboard's hot paths, run on synthetic data
+(no network, no FastF1 cache needed).
+
+    python benchmarks.py              # run everything
+    python benchmarks.py strategy     # run one benchmark
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import charts
+from race_analytics import classify_laps, compute_stints
+
+COMPOUNDS = ['SOFT', 'MEDIUM', 'HARD']
+
+
+def synthetic_laps(n_drivers=20, n_laps=60, seed=0):
+    """Race-like laps table: 1-3 pit stops per driver, ~92s laps."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for d in range(n_drivers):
+        driver = f"D{d:02d}"
+        pits = set(rng.choice(np.arange(10, n_laps - 5), size=1 + d % 3, replace=False).tolist())
+        stint = 1
+        for lap in range(1, n_laps + 1):
+            lap_time = 92 + d * 0.05 + rng.normal(0, 0.3) + (20 if lap in pits else 0)
+            rows.append({
+                'Driver': driver,
+                'LapNumber': float(lap),
+                'LapTime': pd.Timedelta(seconds=lap_time),
+                'Stint': float(stint),
+                'Compound': COMPOUNDS[(stint + d) % 3],
+                'PitInTime': pd.Timedelta(seconds=lap * 92) if lap in pits else pd.NaT,
+                'PitOutTime': pd.Timedelta(seconds=lap * 92) if lap - 1 in pits else pd.NaT,
+            })
+            if lap in pits:
+                stint += 1
+    return pd.DataFrame(rows)
+
+
+def timed(fn, repeat=5):
+    """Best wall time of `repeat` runs, plus the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, rows):
+    print(f"\n{name}")
+    for label, value in rows:
+        print(f"  {label:<44} {value}")
+
+
+# ==============================================================================
+# BENCHMARKS
+# ==============================================================================
+
+def _legacy_strategy_figure(laps, drivers):
+    """The former per-lap strategy chart: one Scatter trace per lap."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for idx, d in enumerate(drivers):
+        for _, lap in laps[laps['Driver'] == d].iterrows():
+            compound = lap['Compound']
+            if pd.notna(compound):
+                fig.add_trace(go.Scatter(
+                    x=[lap['LapNumber'], lap['LapNumber']], y=[idx, idx], mode='markers',
+                    marker=dict(size=12, color=charts.TIRE_COLORS.get(compound, '#808080'), symbol='square',
+                                line=dict(width=1, color='#333')),
+                    showlegend=False,
+                    hovertemplate=f'<b>{d}</b><br>Lap: {lap["LapNumber"]}<br>Compound: {compound}<extra></extra>'
+                ))
+    return fig
+
+
+def bench_strategy():
+    laps = synthetic_laps()
+    drivers = sorted(laps['Driver'].unique())
+
+    legacy_s, legacy_fig = timed(lambda: _legacy_strategy_figure(laps, drivers), repeat=1)
+    stints_s, stints = timed(lambda: compute_stints(laps))
+    new_s, new_fig = timed(lambda: charts.build_strategy_figure(stints, drivers))
+
+    report("Tire strategy chart (20 drivers x 60 laps)", [
+        ("legacy: traces", len(legacy_fig.data)),
+        ("legacy: build time", f"{legacy_s * 1000:.0f} ms"),
+        ("legacy: JSON payload", f"{len(legacy_fig.to_json()) / 1024:.0f} KiB"),
+        ("stint table: build time", f"{stints_s * 1000:.1f} ms"),
+        ("batched: traces", len(new_fig.data)),
+        ("batched: build time", f"{new_s * 1000:.1f} ms"),
+        ("batched: JSON payload", f"{len(new_fig.to_json()) / 1024:.0f} KiB"),
+    ])
+
+
+def _legacy_lap_filters(laps, drivers):
+    """The per-view clean-lap filters the dashboard used to run on every rerun."""
+    cutoff = laps['LapTimeSec'].median() * 1.15
+    views = {'pace box': [], 'progression': [], 'pit-free': []}
+    for d in drivers:
+        d_laps = laps[laps['Driver'] == d]
+        median = d_laps['LapTimeSec'].median()
+        views['pace box'].append(d_laps[d_laps['LapTimeSec'] < cutoff].index)
+        views['progression'].append(d_laps[(d_laps['LapTimeSec'] >= median * 0.8) &
+                                           (d_laps['LapTimeSec'] <= median * 1.2)].index)
+        views['pit-free'].append(d_laps[d_laps['PitOutTime'].isna() & d_laps['PitInTime'].isna()].index)
+    return {view: set(np.concatenate(rows)) for view, rows in views.items()}
+
+
+def bench_classify():
+    laps = synthetic_laps()
+    laps['LapTimeSec'] = laps['LapTime'].dt.total_seconds()
+    # A three-lap safety car period for the whole field
+    laps['TrackStatus'] = np.where(laps['LapNumber'].between(30, 32), '4', '1')
+    laps.loc[laps['LapNumber'].between(30, 32), 'LapTimeSec'] *= 1.3
+    laps['LapTime'] = pd.to_timedelta(laps['LapTimeSec'], unit='s')
+    drivers = sorted(laps['Driver'].unique())
+
+    classify_s, flags = timed(lambda: classify_laps(laps))
+    laps = pd.concat([laps, flags], axis=1)
+    legacy_s, legacy = timed(lambda: _legacy_lap_filters(laps, drivers))
+    mask_s, clean = timed(lambda: [laps[(laps['Driver'] == d) & laps['IsClean']].index for d in drivers])
+
+    rows = [("classify_laps (once, at load)", f"{classify_s * 1000:.1f} ms")]
+    rows += [(f"legacy: laps kept by {view}", len(kept)) for view, kept in legacy.items()]
+    rows += [("legacy: filters per rerun", f"{legacy_s * 1000:.1f} ms"),
+             ("IsClean: laps kept by every view", sum(len(i) for i in clean)),
+             ("IsClean: selects per rerun", f"{mask_s * 1000:.1f} ms")]
+    report("Clean-lap selection (20 drivers x 60 laps, 3 safety car laps)", rows)
+
+
+def synthetic_telemetry(n_samples=20000, seed=0):
+    """High-rate lap telemetry on a ~5.3 km lap: Distance plus the charted channels."""
+    rng = np.random.default_rng(seed)
+    distance = np.linspace(0, 5300, n_samples)
+    phase = distance / 5300 * 2 * np.pi
+    speed = 220 + 80 * np.sin(phase * 9) + rng.normal(0, 2, n_samples)
+    return {
+        'Distance': distance,
+        'Speed': speed,
+        'Throttle': np.clip((speed - 150) * 1.5, 0, 100),
+        'Brake': (np.sin(phase * 9) < -0.8).astype(float),
+        'nGear': np.clip(np.round(speed / 40), 1, 8),
+    }
+
+
+def _telemetry_figure(tels, max_points=None):
+    """Speed/throttle/brake/gear overlay of two laps (8 traces)."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for tel in tels:
+        for channel, method in (('Speed', 'lttb'), ('Throttle', 'lttb'), ('Brake', 'minmax'), ('nGear', 'minmax')):
+            x, y = tel['Distance'], tel[channel]
+            if max_points:
+                x, y = charts.thin(x, y, max_points, method)
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines'))
+    return fig
+
+
+def bench_downsampling():
+    tels = [synthetic_telemetry(seed=0), synthetic_telemetry(seed=1)]
+    budget = charts.DEFAULT_POINT_BUDGET
+
+    rows = []
+    for label, max_points in (("raw", None), (f"downsampled ({budget} pts)", budget)):
+        build_s, fig = timed(lambda: _telemetry_figure(tels, max_points), repeat=3)
+        json_s, payload = timed(fig.to_json, repeat=3)
+        rows += [
+            (f"{label}: build", f"{build_s * 1000:.0f} ms"),
+            (f"{label}: serialize", f"{json_s * 1000:.0f} ms"),
+            (f"{label}: JSON payload", f"{len(payload) / 1024:.0f} KiB"),
+        ]
+    lttb_s, _ = timed(lambda: charts.lttb_indices(tels[0]['Distance'], tels[0]['Speed'], budget))
+    minmax_s, _ = timed(lambda: charts.minmax_indices(tels[0]['Brake'], budget))
+
+    report(f"Telemetry traces (2 laps x 4 channels x {len(tels[0]['Speed'])} samples)", rows + [
+        ("lttb: one trace", f"{lttb_s * 1000:.1f} ms"),
+        ("minmax: one trace", f"{minmax_s * 1000:.2f} ms"),
+    ])
+
+
+def synthetic_circuit(n_corners=16, n_samples=4000, seed=0):
+    """Closed lap around a random polygon with rounded vertices (one corner per vertex)."""
+    rng = np.random.default_rng(seed)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n_corners))
+    radius = rng.uniform(600, 1200, n_corners)
+    vx, vy = np.append(radius * np.cos(angles), radius[0] * np.cos(angles[0])), \
+        np.append(radius * np.sin(angles), radius[0] * np.sin(angles[0]))
+    seg = np.hypot(np.diff(vx), np.diff(vy))
+    along = np.concatenate([[0], np.cumsum(seg)])
+    dense = np.arange(0, along[-1], 1.0)
+    x = np.interp(dense, along, vx)
+    y = np.interp(dense, along, vy)
+    # Round the vertices off with a 60 m moving average (wrapping around the lap)
+    kernel = np.ones(60) / 60
+    x = np.convolve(np.concatenate([x[-30:], x, x[:29]]), kernel, mode='valid')
+    y = np.convolve(np.concatenate([y[-30:], y, y[:29]]), kernel, mode='valid')
+    # Start the lap mid-straight, then sample it like car telemetry
+    shift = int(along[1] / 2)
+    x, y = np.roll(x, -shift), np.roll(y, -shift)
+    step = np.hypot(np.diff(x), np.diff(y))
+    distance = np.concatenate([[0], np.cumsum(step)])
+    apexes = distance[(along[:-1].astype(int) - shift) % len(x)]
+    idx = np.linspace(0, len(x) - 1, n_samples).astype(int)
+    distance, x, y = distance[idx], x[idx], y[idx]
+    # Slow down towards every vertex
+    speed = 330 - 200 * np.exp(-np.min(np.abs(distance[:, None] - apexes[None, :]), axis=1) / 80)
+    return {'Distance': distance, 'X': x, 'Y': y, 'Speed': speed, 'nGear': np.clip(np.round(speed / 40), 1, 8)}
+
+
+def _legacy_corners(lap):
+    """The former track-map turn labelling: thresholded angle diffs, every Nth hit."""
+    tel = pd.DataFrame(lap)
+    tel['dx'] = tel['X'].diff()
+    tel['dy'] = tel['Y'].diff()
+    tel['angle'] = np.arctan2(tel['dy'], tel['dx'])
+    tel['angle_change'] = tel['angle'].diff().abs()
+    corners = tel[tel['angle_change'] > 0.25].copy()
+    if len(corners) > 18:
+        step = max(1, len(corners) // 18)
+        corners = corners.iloc[::step][:18]
+    return corners
+
+
+def bench_corners():
+    from telemetry import detect_corners
+
+    rows = []
+    for n_samples in (2000, 4000, 8000):
+        lap = synthetic_circuit(n_samples=n_samples)
+        legacy_s, legacy = timed(lambda: _legacy_corners(lap))
+        new_s, corners = timed(lambda: detect_corners(lap['Distance'], lap['X'], lap['Y'],
+                                                      lap['Speed'], lap['nGear']))
+        rows += [
+            (f"{n_samples} samples: legacy", f"{legacy_s * 1000:.2f} ms, {len(legacy)} turns"),
+            (f"{n_samples} samples: curvature peaks", f"{new_s * 1000:.2f} ms, {len(corners)} turns"),
+        ]
+    report("Corner detection (synthetic 16-corner lap)", rows)
+
+
+def bench_simulation():
+    import os
+    from simulation import simulate_championship
+
+    standings = pd.DataFrame({'Driver': [f"D{d:02d}" for d in range(20)],
+                              'Points': np.linspace(410, 4, 20).round()})
+    rows = []
+    for n_seasons, processes in ((100_000, 1), (100_000, os.cpu_count() or 1), (1_000_000, os.cpu_count() or 1)):
+        sim_s, table = timed(lambda: simulate_championship(standings, races=5, sprints=2, completed_races=19,
+                                                           n_seasons=n_seasons, seed=0, processes=processes),
+                             repeat=1)
+        rows.append((f"{n_seasons:,} seasons, {processes} process(es)", f"{sim_s:.2f} s"))
+    rows.append(("leader title odds", f"{table['Title%'].iloc[0]:.1f}%"))
+    report("Monte Carlo championship (20 drivers, 5 races + 2 sprints left)", rows)
+
+
+def bench_clinch():
+    from simulation import title_scenarios
+
+    standings = pd.DataFrame({'Driver': [f"D{d:02d}" for d in range(20)],
+                              'Points': np.linspace(410, 4, 20).round()})
+    rows = []
+    for left in (1, 5, 12, 24):
+        rounds = [(r, r % 4 == 0) for r in range(25 - left, 25)]
+        solve_s, table = timed(lambda: title_scenarios(standings, rounds), repeat=3)
+        alive = int((table['Status'] != 'Eliminated').sum())
+        rows.append((f"{left} round(s) left", f"{solve_s * 1000:.1f} ms ({alive} alive)"))
+
+    # Tightly packed grid: most drivers are alive only just, which is the hard case for the search
+    packed = pd.DataFrame({'Driver': [f"D{d:02d}" for d in range(20)],
+                           'Points': [285, 284, 284, 275, 275, 275, 259, 253, 243, 237,
+                                      229, 228, 212, 197, 189, 173, 156, 154, 141, 127]})
+    rounds = [(r, r in (2, 4, 6)) for r in range(1, 7)]
+    for fastest_lap in (False, True):
+        solve_s, table = timed(lambda: title_scenarios(packed, rounds, fastest_lap), repeat=3)
+        alive = int((table['Status'] != 'Eliminated').sum())
+        rows.append((f"packed grid, 6 left{' + FL' if fastest_lap else ''}",
+                     f"{solve_s * 1000:.1f} ms ({alive} alive)"))
+    report("Exact clinch / elimination (20 drivers)", rows)
+
+
+def synthetic_store_session(root, year=2024, event="Synthetic GP", n_drivers=20, n_samples=25000, seed=0):
+    """Telemetry-loaded store entry: race-length car/pos data for every driver plus the laps table."""
+    from session_store import STORE_VERSION, _write_meta, session_dir, write_table
+
+    rng = np.random.default_rng(seed)
+    path = session_dir(year, event, 'R', root)
+    laps = synthetic_laps(n_drivers)
+    laps['LapTime'] = pd.to_timedelta(laps['LapTime'], unit='s')
+    write_table(pd.concat([laps, classify_laps(laps)], axis=1), os.path.join(path, "laps"))
+    drivers = sorted(laps['Driver'].unique())
+    write_table(pd.DataFrame({'Abbreviation': drivers, 'Position': np.arange(1.0, n_drivers + 1)}),
+                os.path.join(path, "results"))
+    session_time = pd.to_timedelta(np.arange(n_samples) * 0.24, unit='s')
+    for driver in drivers:
+        speed = 200 + 80 * rng.standard_normal(n_samples)
+        write_table(pd.DataFrame({'SessionTime': session_time, 'Speed': speed, 'RPM': speed * 50,
+                                  'nGear': np.clip(speed // 40, 1, 8), 'Throttle': np.clip(speed - 150, 0, 100),
+                                  'Brake': speed < 150, 'DRS': np.zeros(n_samples)}),
+                    os.path.join(path, "telemetry", "car", driver))
+        write_table(pd.DataFrame({'SessionTime': session_time, 'X': rng.standard_normal(n_samples),
+                                  'Y': rng.standard_normal(n_samples), 'Z': rng.standard_normal(n_samples)}),
+                    os.path.join(path, "telemetry", "pos", driver))
+    _write_meta(path, {'version': STORE_VERSION, 'year': year, 'event': event, 'session_code': 'R',
+                       'session_name': 'Race', 'event_info': {'EventName': event}, 'telemetry_loaded': True,
+                       'telemetry_drivers': drivers})
+    return (year, event, 'R')
+
+
+def _touch_session(session):
+    """What a user's reruns decode: laps, results and every car's telemetry."""
+    session.get_laps()
+    session.results
+    for driver in session.telemetry_drivers:
+        session.car_data(driver)
+        session.pos_data(driver)
+
+
+def bench_pool(users=10):
+    import tracemalloc
+    from session_pool import SessionPool
+    from session_store import open_session
+
+    with tempfile.TemporaryDirectory() as root:
+        keys = [synthetic_store_session(root, year=2024 + i) for i in range(3)]
+
+        # Before: every user opens (and keeps) their own StoredSession
+        tracemalloc.start()
+        own = [open_session(*keys[0], root=root) for _ in range(users)]
+        for session in own:
+            _touch_session(session)
+        per_user_mb = tracemalloc.get_traced_memory()[0] / 2**20
+        del own
+        tracemalloc.stop()
+
+        # After: every user holds a handle to one pooled session
+        tracemalloc.start()
+        pool = SessionPool(root=root)
+        handles = [pool.acquire(*keys[0]) for _ in range(users)]
+        for handle in handles:
+            _touch_session(handle.session)
+        pooled_mb = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+        session_mb = pool.stats()['bytes'] / 2**20
+
+        # Budget of ~1.5 sessions, three sessions browsed round robin
+        small = SessionPool(budget_mb=1.5 * session_mb, root=root)
+        touch_s, _ = timed(lambda: [_touch_session(small.acquire(*key).session) for key in keys * 3], repeat=1)
+        stats = small.stats()
+
+    report(f"Session pool ({users} users on one race, 20 cars of telemetry)", [
+        ("one StoredSession per user", f"{per_user_mb:.0f} MB"),
+        ("shared pool", f"{pooled_mb:.0f} MB"),
+        ("pool accounting of the session", f"{session_mb:.0f} MB"),
+        (f"3 sessions x3 rounds in {1.5 * session_mb:.0f} MB budget", f"{touch_s:.2f} s"),
+        ("  resident / hits / misses / evictions",
+         f"{stats['resident']} / {stats['hits']} / {stats['misses']} / {stats['evictions']}"),
+    ])
+
+
+def _raw_car_data(n_samples=25000, seed=0):
+    """One car's race telemetry with the dtypes FastF1 hands out."""
+    rng = np.random.default_rng(seed)
+    speed = np.round(200 + 80 * rng.standard_normal(n_samples))
+    return pd.DataFrame({
+        'SessionTime': pd.to_timedelta(np.arange(n_samples) * 0.24, unit='s'),
+        'Speed': speed, 'RPM': speed * 50, 'nGear': np.clip(speed // 40, 1, 8).astype(np.int64),
+        'Throttle': np.clip(speed - 150, 0, 100), 'Brake': speed < 150, 'DRS': np.zeros(n_samples, dtype=np.int64),
+    })
+
+
+def bench_compact(n_drivers=20):
+    from session_store import compact_telemetry
+
+    def mb(frames):
+        return sum(df.memory_usage(index=True, deep=True).sum() for df in frames) / 2**20
+
+    raw = [_raw_car_data(seed=d) for d in range(n_drivers)]
+    compact_s, compact = timed(lambda: [compact_telemetry(df) for df in raw], repeat=3)
+
+    laps = pd.concat([synthetic_laps(n_drivers, seed=r) for r in range(24)], ignore_index=True)
+    cat_laps = laps.astype({'Driver': 'category', 'Compound': 'category'})
+    obj_s, _ = timed(lambda: laps.groupby('Driver')['LapTime'].median(), repeat=20)
+    cat_s, _ = timed(lambda: cat_laps.groupby('Driver', observed=True)['LapTime'].median(), repeat=20)
+
+    report(f"Compact dtypes ({n_drivers} cars of race telemetry, {len(laps):,} laps)", [
+        ("car telemetry, FastF1 dtypes", f"{mb(raw):.1f} MB"),
+        ("car telemetry, compact", f"{mb(compact):.1f} MB ({compact_s * 1000:.0f} ms)"),
+        ("laps Driver/Compound object -> category", f"{mb([laps]):.1f} -> {mb([cat_laps]):.1f} MB"),
+        ("groupby Driver median, object", f"{obj_s * 1000:.2f} ms"),
+        ("groupby Driver median, category", f"{cat_s * 1000:.2f} ms"),
+    ])
+
+
+class StubSession:
+    """Just enough of a FastF1 Session for save_session / save_telemetry."""
+
+    def __init__(self, n_drivers=20):
+        self.laps = synthetic_laps(n_drivers)
+        self.laps['LapTime'] = pd.to_timedelta(self.laps['LapTime'], unit='s')
+        drivers = sorted(self.laps['Driver'].unique())
+        self.results = pd.DataFrame({'Abbreviation': drivers, 'DriverNumber': [str(i) for i in range(len(drivers))]})
+        self.event = pd.Series({'EventName': 'Stub GP'})
+        self.name = 'Race'
+        self.car_data = {str(i): _raw_car_data(2500, seed=i) for i in range(len(drivers))}
+        self.pos_data = {str(i): pd.DataFrame({'SessionTime': self.car_data[str(i)]['SessionTime'], 'X': 0.0,
+                                               'Y': 0.0, 'Z': 0.0}) for i in range(len(drivers))}
+
+
+def stub_fetch(year, event, session_code, telemetry, laps=True, delay=0.5, log=None):
+    """Stands in for a FastF1 download: sleeps, appends one line to `log`, returns a StubSession."""
+    time.sleep(delay)
+    if log:
+        with open(log, "a") as f:
+            f.write(f"{os.getpid()} {session_code} {'telemetry' if telemetry else 'laps' if laps else 'results'}\n")
+    return StubSession()
+
+
+def _load_in_process(root, log):
+    from functools import partial
+    from session_store import load_results, load_session
+
+    # The tiers in LoadJob order: results, laps, telemetry
+    load_results(2024, "Stub GP", "R", root=root, fetch=partial(stub_fetch, log=log))
+    session = load_session(2024, "Stub GP", "R", root=root, fetch=partial(stub_fetch, log=log))
+    session.ensure_telemetry(fetch=partial(stub_fetch, log=log))
+    return session.has_telemetry
+
+
+def _threads(n, root, log):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(n) as pool:
+        return list(pool.map(lambda _: _load_in_process(root, log), range(n)))
+
+
+def _processes(n, root, log):
+    import multiprocessing
+
+    with multiprocessing.get_context('spawn').Pool(n) as pool:
+        return pool.starmap(_load_in_process, [(root, log)] * n)
+
+
+def bench_singleflight(threads=16, processes=4):
+    """Concurrent LOAD DATA on one session: fetches performed and wall time."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, run, n in (("threads", _threads, threads), ("processes", _processes, processes)):
+            root = os.path.join(tmp, label)
+            log = root + ".log"
+            start = time.perf_counter()
+            loaded = run(n, root, log)
+            elapsed = time.perf_counter() - start
+            with open(log) as f:
+                tiers = [line.split()[-1] for line in f]
+            fetches = " + ".join(f"{tiers.count(tier)} {tier}" for tier in ("results", "laps", "telemetry"))
+            rows.append((f"{n} {label}", f"{fetches} fetch(es), {sum(loaded)}/{len(loaded)} loaded, {elapsed:.2f} s"))
+    report("Single-flight session loading (stub fetch, 0.5 s per download)", rows)
+
+
+def staged_fetch(year, event, session_code, telemetry, laps=True):
+    """Stub download priced per tier: results 0.2 s, lap timing 1 s, telemetry 2 s."""
+    delay = 2.0 if telemetry else 1.0 if laps else 0.2
+    return stub_fetch(year, event, session_code, telemetry, laps, delay=delay)
+
+
+def bench_staged():
+    """LOAD DATA on a cold session: blocking load vs background tiers."""
+    from session_pool import SessionPool
+
+    key = (2024, "Stub GP", "R")
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SessionPool(root=os.path.join(tmp, "blocking"), fetch=staged_fetch)
+        start = time.perf_counter()
+        session = pool.acquire(*key).session
+        blocking = time.perf_counter() - start
+        session.ensure_telemetry(fetch=staged_fetch)
+        blocking_tel = time.perf_counter() - start
+
+        pool = SessionPool(root=os.path.join(tmp, "staged"), fetch=staged_fetch)
+        start = time.perf_counter()
+        job = pool.load_async(*key)
+        returned = time.perf_counter() - start
+        job.wait()
+
+    rows = [("blocking: script blocked", f"{blocking:.2f} s (+ {blocking_tel - blocking:.2f} s on LOAD TELEMETRY)"),
+            ("staged: script blocked", f"{returned * 1000:.1f} ms")]
+    rows += [(f"staged: {stage} ready", f"{job.timings[stage]:.2f} s") for stage in job.ready]
+    report("Cold LOAD DATA (stub fetch: results 0.2 s, laps 1 s, telemetry 2 s)", rows)
+
+
+# Modules the app should only import on first use
+LAZY_MODULES = ['fastf1', 'scipy.signal', 'plotly', 'plotly.subplots']
+
+STARTUP_SCRIPT = """
+import sys, time
+t = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter() - t
+preloaded = [m for m in sys.argv[2:] if m in sys.modules]
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+def loaded():
+    return ','.join(m for m in sys.argv[2:] if m in sys.modules and m not in preloaded) or 'none'
+t = time.perf_counter(); at.run(); first = time.perf_counter() - t
+first_lazy = loaded()
+t = time.perf_counter(); at.run(); rerun = time.perf_counter() - t
+print(imported, first, rerun, first_lazy, loaded(), ','.join(preloaded) or 'none')
+"""
+
+
+def _app_imports(path):
+    """Top-level modules imported by a script."""
+    import ast
+
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def bench_startup():
+    """Cold-process startup of the Streamlit app: imports, first script run (first paint) and a rerun."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    app = os.path.join(root, 'app.py')
+    env = dict(os.environ, F1_OFFLINE='1', PYTHONPATH=root)
+
+    imports = _app_imports(app)
+    # Streamlit itself may import some of LAZY_MODULES (its Plotly theme imports plotly): those are
+    # reported apart, only modules the app adds count as loaded
+    code = ("import sys, time; t = time.perf_counter(); import streamlit; "
+            "pre = [m for m in sys.argv[1:] if m in sys.modules]; import " + ", ".join(imports) +
+            "; print(time.perf_counter() - t, ','.join(m for m in sys.argv[1:] if m in sys.modules and m not in pre)"
+            " or 'none')")
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, '-c', code] + LAZY_MODULES, cwd=cwd, env=env,
+                             capture_output=True, text=True, check=True).stdout.split()
+        import_s, import_lazy = float(out[0]), out[1]
+        out = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, app] + LAZY_MODULES, cwd=cwd, env=env,
+                             capture_output=True, text=True, check=True).stdout.split()
+    runner_s, first_s, rerun_s = map(float, out[:3])
+    first_lazy, rerun_lazy, preloaded = out[3:6]
+
+    report("App startup (cold process, empty cache, offline)", [
+        (f"import app modules ({len(imports)})", f"{import_s * 1000:.0f} ms"),
+        ("  heavy modules loaded", import_lazy),
+        ("Streamlit test runner import", f"{runner_s * 1000:.0f} ms"),
+        ("  already loaded by Streamlit", preloaded),
+        ("first run (Race Analysis tab)", f"{first_s * 1000:.0f} ms"),
+        ("  heavy modules loaded", first_lazy),
+        ("rerun", f"{rerun_s * 1000:.0f} ms"),
+        ("  heavy modules loaded", rerun_lazy),
+    ])
+
+
+BENCHMARKS = {
+    'strategy': bench_strategy,
+    'classify': bench_classify,
+    'downsampling': bench_downsampling,
+    'corners': bench_corners,
+    'simulation': bench_simulation,
+    'clinch': bench_clinch,
+    'startup': bench_startup,
+    'pool': bench_pool,
+    'compact': bench_compact,
+    'singleflight': bench_singleflight,
+    'staged': bench_staged,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
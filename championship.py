@@ -0,0 +1,418 @@
+"""
+Local Ergast store and championship progression.
+
+Standings, schedules and per-round race/sprint results are fetched from
+Ergast once and kept per season in the columnar table format of
+session_store:
+
+    cache/championship/<year>/meta.json
+    cache/championship/<year>/results/...               (one row per classified car)
+    cache/championship/<year>/driver_standings/...
+    cache/championship/<year>/constructor_standings/...
+    cache/championship/<year>/schedule/...
+
+Tables of a finished season are immutable and never fetched again. A
+running season refreshes at most every REFRESH_SECONDS, and results only
+fetch the rounds that are not stored yet. With OFFLINE set everything is
+served from disk and no request is made.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from session_store import read_table, write_table
+
+CHAMPIONSHIP_DIR = os.path.join("cache", "championship")
+STORE_VERSION = 2
+RESULT_COLUMNS = ['Round', 'Kind', 'RaceName', 'DriverId', 'Driver', 'Code', 'Team', 'Position', 'Points']
+# Results per Ergast request (the API maximum)
+ERGAST_PAGE = 100
+# How often a running season is checked for new rounds / standings
+REFRESH_SECONDS = 3600
+# Days after the final race before a season's tables are treated as final
+FINAL_AFTER_DAYS = 7
+
+# Max Ergast requests per second, shared by all threads (jolpica's burst limit is 4/s)
+ERGAST_RATE = 4.0
+# Concurrent seasons fetched by the cache warmer
+WARM_WORKERS = 4
+FIRST_SEASON = 2018
+
+# Serve Ergast data from the local store only, e.g. F1_OFFLINE=1
+OFFLINE = os.environ.get("F1_OFFLINE", "") not in ("", "0")
+# Ergast-compatible API root (defaults to FastF1's); point it at a stub server for testing
+ERGAST_BASE_URL = os.environ.get("ERGAST_BASE_URL")
+
+
+class ErgastUnavailable(Exception):
+    """Data is neither in the local store nor fetchable (offline or API error)."""
+
+_client = None
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+_limiter = RateLimiter(ERGAST_RATE)
+
+
+def ergast_client():
+    """Process-wide Ergast client (FastF1's requests cache sits underneath)."""
+    global _client
+    if _client is None:
+        from fastf1.ergast import Ergast, interface
+        if ERGAST_BASE_URL:
+            interface.BASE_URL = ERGAST_BASE_URL.rstrip("/")
+        _client = Ergast(limit=ERGAST_PAGE)
+    return _client
+
+
+def _pages(response):
+    """Every result page of an Ergast multi response."""
+    yield response
+    while not response.is_complete:
+        _limiter.wait()
+        response = response.get_next_result_page()
+        yield response
+
+
+def _results_frame(response, kind):
+    """Ergast race/sprint results response -> RESULT_COLUMNS rows."""
+    frames = []
+    for page in _pages(response):
+        for (_, race), content in zip(page.description.iterrows(), page.content):
+            frames.append(pd.DataFrame({
+                'Round': int(race['round']),
+                'Kind': kind,
+                'RaceName': race['raceName'],
+                'DriverId': content['driverId'],
+                'Driver': content['givenName'] + " " + content['familyName'],
+                'Code': content['driverCode'] if 'driverCode' in content.columns else content['driverId'],
+                'Team': content['constructorName'],
+                'Position': content['position'],
+                'Points': content['points'].astype(float),
+            }))
+    return _concat(frames)
+
+
+def _concat(frames):
+    """Concatenate result tables, keeping RESULT_COLUMNS and their dtypes."""
+    frames = [f for f in frames if len(f) > 0]
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype=float if c == 'Points' else int if c in ('Round', 'Position')
+                                          else object) for c in RESULT_COLUMNS})
+    results = pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
+    return results.astype({'Round': int, 'Position': int, 'Points': float})
+
+
+def fetch_results(year, round_number=None, kinds=('race', 'sprint')):
+    """
+    Race and/or sprint results of a season (or of one round) from Ergast.
+    A round without a sprint comes back as an empty response; request
+    errors are raised, never mistaken for "no sprint".
+    """
+    ergast = ergast_client()
+    requests = {'race': ergast.get_race_results, 'sprint': ergast.get_sprint_results}
+    frames = []
+    for kind in kinds:
+        _limiter.wait()
+        frames.append(_results_frame(requests[kind](season=year, round=round_number), kind))
+    return _concat(frames)
+
+
+def fetch_schedule(year):
+    """Round, race name, place, date and sprint weekend flag of every round of a season."""
+    _limiter.wait()
+    schedule = ergast_client().get_race_schedule(season=year)
+    return pd.DataFrame({
+        'Round': schedule['round'].astype(int),
+        'RaceName': schedule['raceName'],
+        'Locality': schedule['locality'] if 'locality' in schedule.columns else '',
+        'Country': schedule['country'] if 'country' in schedule.columns else '',
+        'Date': pd.to_datetime(schedule['raceDate']),
+        'Sprint': schedule['sprintDate'].notna() if 'sprintDate' in schedule.columns else False,
+    })
+
+
+def fetch_driver_standings(year):
+    """Final (or current) drivers' standings: Pos, Driver, Team, Points, Wins."""
+    _limiter.wait()
+    d_df = ergast_client().get_driver_standings(season=year).content[0]
+    return pd.DataFrame({
+        'Pos': d_df['position'].astype(int),
+        'Driver': d_df['givenName'] + " " + d_df['familyName'],
+        'Team': d_df['constructorNames'].apply(lambda x: x[-1] if len(x) > 0 else "N/A"),
+        'Points': d_df['points'].astype(float),
+        'Wins': d_df['wins'].astype(int),
+    })
+
+
+def fetch_constructor_standings(year):
+    """Final (or current) constructors' standings: Pos, Team, Points, Wins."""
+    _limiter.wait()
+    t_df = ergast_client().get_constructor_standings(season=year).content[0]
+    return pd.DataFrame({
+        'Pos': t_df['position'].astype(int),
+        'Team': t_df['constructorName'],
+        'Points': t_df['points'].astype(float),
+        'Wins': t_df['wins'].astype(int),
+    })
+
+
+# ==============================================================================
+# RESULTS STORE
+# ==============================================================================
+
+def season_dir(year, root=None):
+    return os.path.join(root or CHAMPIONSHIP_DIR, str(year))
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _season_lock(path):
+    """Re-entrant lock per season directory, so the warmer and the app never write the same season at once."""
+    with _locks_guard:
+        return _locks.setdefault(path, threading.RLock())
+
+
+def _read_meta(path):
+    """Season meta.json ({} if missing or written by another STORE_VERSION)."""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get('version') == STORE_VERSION else {}
+
+
+def _update_meta(path, **fields):
+    os.makedirs(path, exist_ok=True)
+    meta = _read_meta(path)
+    meta.update(fields, version=STORE_VERSION)
+    tmp_path = os.path.join(path, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+
+def _season_finished(schedule, now):
+    return len(schedule) > 0 and schedule['Date'].max() + pd.Timedelta(days=FINAL_AFTER_DAYS) < pd.Timestamp(now, unit='s')
+
+
+def stored_table(year, name, fetch, root=None, now=None):
+    """
+    Season table `name` from the store, fetched with `fetch(year)` when it
+    is missing or (for a running season) older than REFRESH_SECONDS. Final
+    tables are never refetched; offline, only the store is read. A failed
+    refresh falls back to the stored copy.
+    """
+    path = season_dir(year, root)
+    with _season_lock(path):
+        table_path = os.path.join(path, name)
+        entry = _read_meta(path).get('tables', {}).get(name)
+        stored = entry is not None and os.path.exists(os.path.join(table_path, "_schema.json"))
+        now = time.time() if now is None else now
+        if stored and (OFFLINE or entry['final'] or now - entry['fetched_at'] < REFRESH_SECONDS):
+            return read_table(table_path)
+        if OFFLINE:
+            raise ErgastUnavailable(f"No stored {name.replace('_', ' ')} for {year} (offline mode)")
+
+        try:
+            table = fetch(year)
+            final = _season_finished(table if name == 'schedule' else season_schedule(year, root, now), now)
+        except Exception as e:
+            if stored:
+                return read_table(table_path)
+            raise ErgastUnavailable(f"Could not fetch {name.replace('_', ' ')} for {year}: {e}") from e
+        write_table(table.reset_index(drop=True), table_path)
+        tables = _read_meta(path).get('tables', {})
+        tables[name] = {'fetched_at': now, 'final': bool(final)}
+        _update_meta(path, year=year, tables=tables)
+        return table
+
+
+def season_schedule(year, root=None, now=None):
+    return stored_table(year, 'schedule', fetch_schedule, root, now)
+
+
+def stored_schedule(year, root=None):
+    """Stored schedule of a season however old, or None; never fetches (and never imports FastF1)."""
+    path = season_dir(year, root)
+    if 'schedule' not in _read_meta(path).get('tables', {}):
+        return None
+    try:
+        return read_table(os.path.join(path, 'schedule'))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def driver_standings(year, root=None, now=None):
+    return stored_table(year, 'driver_standings', fetch_driver_standings, root, now)
+
+
+def constructor_standings(year, root=None, now=None):
+    return stored_table(year, 'constructor_standings', fetch_constructor_standings, root, now)
+
+
+def load_results(year, root=None):
+    """Stored results of a season (empty table if nothing is stored)."""
+    path = os.path.join(season_dir(year, root), "results")
+    if not os.path.exists(os.path.join(path, "_schema.json")):
+        return _concat([])
+    return read_table(path)
+
+
+def update_results(year, root=None, now=None):
+    """
+    Stored results of a season, after appending any round that has been
+    raced since the last check. Races and sprints (rounds flagged Sprint in
+    the schedule) are tracked separately, and only missing ones are fetched
+    (the whole season in one paged request when nothing is stored yet);
+    complete seasons, seasons checked within REFRESH_SECONDS and offline
+    mode are served from the store as is.
+    """
+    path = season_dir(year, root)
+    with _season_lock(path):
+        meta = _read_meta(path)
+        results = load_results(year, root) if meta else _concat([])
+        now = time.time() if now is None else now
+        if OFFLINE or meta.get('complete') or now - meta.get('checked_at', 0) < REFRESH_SECONDS:
+            return results
+
+        try:
+            schedule = season_schedule(year, root, now)
+            raced = schedule[schedule['Date'] <= pd.Timestamp(now, unit='s')]
+            missing = sorted(_expected_results(raced) - _stored_results(results))
+            if missing:
+                if len(results) == 0:
+                    new = fetch_results(year)
+                else:
+                    new = _concat([fetch_results(year, r, kinds=(kind,)) for r, kind in missing])
+                new = new[pd.MultiIndex.from_frame(new[['Round', 'Kind']]).isin(missing)]
+                if len(new) > 0:
+                    results = _concat([results, new]).sort_values(['Round', 'Kind'], kind='stable').reset_index(drop=True)
+                    write_table(results, os.path.join(path, "results"))
+        except Exception:
+            # Offline or Ergast unavailable: serve what is stored, retry after REFRESH_SECONDS
+            _update_meta(path, year=year, checked_at=now)
+            return results
+
+        stored = _stored_results(results)
+        _update_meta(path, year=year, rounds=sorted({int(r) for r, _ in stored}), checked_at=now,
+                     complete=bool(len(schedule) > 0 and stored >= _expected_results(schedule)))
+        return results
+
+
+def _expected_results(schedule):
+    """(round, kind) of every race and sprint a schedule promises."""
+    sprints = schedule['Sprint'] if 'Sprint' in schedule.columns else pd.Series(False, index=schedule.index)
+    return ({(int(r), 'race') for r in schedule['Round']} |
+            {(int(r), 'sprint') for r in schedule.loc[sprints.astype(bool), 'Round']})
+
+
+def _stored_results(results):
+    """(round, kind) pairs that have result rows."""
+    return {(int(r), k) for r, k in zip(results['Round'], results['Kind'])}
+
+
+# ==============================================================================
+# PROGRESSION
+# ==============================================================================
+
+def points_progression(results, by='Driver'):
+    """
+    Cumulative points after every round (rounds x drivers, or x teams with
+    by='Team'); columns ordered by points at the last round.
+    """
+    if len(results) == 0:
+        return pd.DataFrame()
+    per_round = results.pivot_table(index='Round', columns=by, values='Points', aggfunc='sum', fill_value=0)
+    cumulative = per_round.cumsum()
+    return cumulative[cumulative.iloc[-1].sort_values(ascending=False).index]
+
+
+def round_names(results):
+    """Round number -> Grand Prix name."""
+    return results.drop_duplicates('Round').set_index('Round')['RaceName']
+
+
+def season_progression(year, root=None):
+    """Drivers' and constructors' cumulative points for a season, from the local store."""
+    results = update_results(year, root)
+    return {
+        'drivers': points_progression(results, 'Driver'),
+        'teams': points_progression(results, 'Team'),
+        'rounds': round_names(results) if len(results) else pd.Series(dtype=object),
+    }
+
+
+# ==============================================================================
+# CACHE WARMER
+# ==============================================================================
+
+def warm_season(year, root=None):
+    """Fetch everything the Championship tab needs for one season into the store."""
+    season_schedule(year, root)
+    driver_standings(year, root)
+    constructor_standings(year, root)
+    update_results(year, root)
+
+
+def warm_cache(years=None, root=None, workers=WARM_WORKERS):
+    """
+    Populate the store for several seasons concurrently (bounded thread
+    pool; requests stay under ERGAST_RATE). Returns {year: error or None}.
+    """
+    years = list(years or range(FIRST_SEASON, time.gmtime().tm_year + 1))
+    if OFFLINE:
+        return {year: "offline" for year in years}
+
+    def warm(year):
+        try:
+            warm_season(year, root)
+            return None
+        except Exception as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ergast-warm") as pool:
+        return dict(zip(years, pool.map(warm, years)))
+
+
+def warm_in_background(years=None, root=None, workers=WARM_WORKERS):
+    """Run warm_cache() on a daemon thread and return the thread."""
+    thread = threading.Thread(target=warm_cache, args=(years, root, workers), name="ergast-warmer", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # python championship.py [year ...]   -- warm the local Ergast store (default: 2018-current)
+    import fastf1
+
+    os.makedirs("cache", exist_ok=True)
+    fastf1.Cache.enable_cache("cache")
+    selected = [int(y) for y in sys.argv[1:]] or None
+    start = time.perf_counter()
+    for year, error in warm_cache(selected).items():
+        print(f"  {year}  {'ok' if error is None else error}")
+    print(f"warmed in {time.perf_counter() - start:.1f}s")
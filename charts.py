@@ -0,0 +1,328 @@
+"""
+Plotly figure builders shared by the dashboard tabs.
+
+Builders take precomputed tables and emit a small, fixed number of traces,
+so figure construction and the JSON sent to the browser stay cheap no
+matter how many drivers or laps are shown.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+TIRE_COLORS = {
+    'SOFT': '#FF3333',
+    'MEDIUM': '#FFF200',
+    'HARD': '#EBEBEB',
+    'INTERMEDIATE': '#43B02A',
+    'WET': '#0067AD'
+}
+
+
+def build_strategy_figure(stints_df, drivers):
+    """
+    Tire strategy chart: every stint is one horizontal bar segment and all
+    stints of a compound share a single Bar trace (<= one trace per compound).
+    """
+    fig = go.Figure()
+    rows = {d: i for i, d in enumerate(drivers)}
+    stints = stints_df[stints_df['Driver'].isin(rows)]
+
+    for compound, group in stints.groupby('Compound', sort=False, observed=True):
+        fig.add_trace(go.Bar(
+            y=group['Driver'].map(rows),
+            x=group['Laps'],
+            base=group['StartLap'] - 0.5,
+            orientation='h',
+            name=compound,
+            marker=dict(color=TIRE_COLORS.get(compound, '#808080'), line=dict(width=1, color='#333')),
+            customdata=group[['Driver', 'Stint', 'StartLap', 'EndLap']].to_numpy(),
+            hovertemplate=('<b>%{customdata[0]}</b> - Stint %{customdata[1]}<br>'
+                           f'Compound: {compound}<br>'
+                           'Laps: %{customdata[2]}-%{customdata[3]}<extra></extra>'),
+            showlegend=False
+        ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=max(300, 28 * len(drivers) + 60),
+        barmode='overlay',
+        bargap=0.35,
+        yaxis=dict(
+            tickmode='array',
+            tickvals=list(range(len(drivers))),
+            ticktext=list(drivers),
+            title="Driver"
+        ),
+        xaxis=dict(title="Lap Number", gridcolor='#2d3340'),
+        margin=dict(t=20, b=40, l=100, r=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(255,255,255,0.03)'
+    )
+    return fig
+
+
+# ==============================================================================
+# DOWNSAMPLING
+# ==============================================================================
+
+DEFAULT_POINT_BUDGET = 600
+
+
+def _bucket_columns(edges, n):
+    """
+    Sample indices of the buckets [edges[i], edges[i+1]) padded to one width,
+    with a mask of the real (unpadded) entries, so per-bucket reductions run
+    on 2-D arrays instead of a Python loop.
+    """
+    width = int(np.diff(edges).max())
+    cols = edges[:-1, None] + np.arange(width)[None, :]
+    valid = cols < edges[1:, None]
+    return np.minimum(cols, n - 1), valid
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: keep the lowest and highest sample of each of
+    n_out/2 equal-count buckets (preserves spikes, fully vectorized).
+    """
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    n_buckets = (n_out - 2) // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    cols, valid = _bucket_columns(edges, n)
+    values = np.asarray(y, dtype=float)[cols]
+    lo = np.where(valid, values, np.inf).argmin(axis=1)
+    hi = np.where(valid, values, -np.inf).argmax(axis=1)
+    rows = np.arange(n_buckets)
+    picked = np.concatenate([cols[rows, lo], cols[rows, hi], [0, n - 1]])
+    return np.unique(picked)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: per bucket keep the point forming the
+    largest triangle with its neighbouring buckets. The left corner is the
+    previous bucket's mean rather than its pick, so every bucket is scored
+    at once on the padded bucket arrays (no per-bucket Python loop).
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # Triangle corners either side of each bucket; the end points anchor the ends
+    left_x, left_y = np.append(x[0], mean_x[:-1]), np.append(y[0], mean_y[:-1])
+    right_x, right_y = np.append(mean_x[1:], x[-1]), np.append(mean_y[1:], y[-1])
+
+    cols, valid = _bucket_columns(edges, n)
+    rows = np.arange(len(counts))
+    xs, ys = x[cols], y[cols]
+    for _ in range(2):
+        area = np.abs((left_x - right_x)[:, None] * (ys - left_y[:, None])
+                      - (left_x[:, None] - xs) * (right_y - left_y)[:, None])
+        picked = cols[rows, np.where(valid, area, -1.0).argmax(axis=1)]
+        # Second pass: anchor on the previous bucket's pick, as sequential LTTB does
+        left_x, left_y = np.append(x[0], x[picked[:-1]]), np.append(y[0], y[picked[:-1]])
+    return np.concatenate([[0], picked, [n - 1]])
+
+
+def downsample(x, y, max_points=DEFAULT_POINT_BUDGET, method='lttb'):
+    """
+    Shape-preserving reduction of one trace to at most `max_points` points.
+    Returns the kept sample indices so companion arrays can be sliced too.
+    """
+    if method == 'minmax':
+        return minmax_indices(y, max_points)
+    return lttb_indices(x, y, max_points)
+
+
+def thin(x, y, max_points=DEFAULT_POINT_BUDGET, method='lttb'):
+    """(x, y) arrays reduced with downsample()."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    idx = downsample(x, y, max_points, method)
+    return x[idx], y[idx]
+
+
+# ==============================================================================
+# TRACK MAP
+# ==============================================================================
+
+SECTOR_COLORS = {1: '#ffd700', 2: '#00d9ff', 3: '#ff1e1e'}
+
+
+def build_track_map_figure(geometry, height=280):
+    """
+    Track map from a stored circuit geometry (see circuit.py): one line per
+    sector, DRS zones as a single overlay trace, corners/labels as annotations.
+    """
+    outline = geometry['outline']
+    dist = np.asarray(outline['Distance'])
+    x = np.asarray(outline['X'])
+    y = np.asarray(outline['Y'])
+    speed = np.asarray(outline['Speed'])
+    # Close the loop back to the start/finish line
+    dist, x, y, speed = (np.append(a, a[0]) for a in (dist, x, y, speed))
+    dist[-1] = geometry['length']
+
+    fig = go.Figure()
+    bounds = [0.0] + list(geometry['sectors']) + [geometry['length']]
+    sector_of = np.searchsorted(bounds[1:-1], dist, side='right') + 1
+    for sector in (1, 2, 3):
+        idx = np.flatnonzero(sector_of == sector)
+        if len(idx) == 0:
+            continue
+        # Overlap by one point so consecutive sectors join up
+        idx = np.append(idx, min(idx[-1] + 1, len(dist) - 1))
+        fig.add_trace(go.Scatter(
+            x=x[idx], y=y[idx], mode='lines',
+            line=dict(width=8, color=SECTOR_COLORS[sector]),
+            customdata=speed[idx],
+            hovertemplate=f'Sector {sector}<br>Speed: %{{customdata:.0f}} km/h<extra></extra>',
+            showlegend=False
+        ))
+        mid = idx[len(idx) // 2]
+        fig.add_annotation(
+            x=x[mid], y=y[mid], text=f'<b>SECTOR {sector}</b>', showarrow=False,
+            font=dict(size=10, color=SECTOR_COLORS[sector], family='Arial Black'),
+            bgcolor='rgba(0,0,0,0.6)', bordercolor=SECTOR_COLORS[sector], borderwidth=2, borderpad=4
+        )
+
+    if geometry['drs_zones']:
+        zx, zy = [], []
+        for start, end in geometry['drs_zones']:
+            in_zone = (dist >= start) & (dist <= end)
+            zx += x[in_zone].tolist() + [None]
+            zy += y[in_zone].tolist() + [None]
+        fig.add_trace(go.Scatter(
+            x=zx, y=zy, mode='lines', line=dict(width=3, color='#00ff41'),
+            name='DRS', hoverinfo='name', showlegend=False
+        ))
+        start = geometry['drs_zones'][0][0]
+        k = int(np.argmin(np.abs(dist - start)))
+        fig.add_annotation(
+            x=x[k], y=y[k], text='<b>DRS<br>ZONE 1</b>', showarrow=True, arrowhead=2,
+            arrowcolor='#00ff41', ax=50, ay=-50,
+            font=dict(size=8, color='white', family='Arial Black'),
+            bgcolor='#00aa00', bordercolor='#00ff41', borderwidth=2, borderpad=4
+        )
+
+    for corner in geometry['corners']:
+        fig.add_annotation(
+            x=corner['X'], y=corner['Y'], text=f"<b>{corner['Number']:02d}{corner['Letter']}</b>",
+            showarrow=False, font=dict(size=11, color='white', family='Arial Black'),
+            bgcolor='rgba(0,0,0,0.8)', borderpad=3
+        )
+
+    trap = geometry['speed_trap']
+    fig.add_annotation(
+        x=trap['X'], y=trap['Y'], text='<b>SPEED<br>TRAP</b>', showarrow=True, arrowhead=2,
+        arrowcolor='#ff00ff', ax=60, ay=30,
+        font=dict(size=9, color='white', family='Arial Black'),
+        bgcolor='#ff00ff', bordercolor='#ff00ff', borderwidth=2, borderpad=4
+    )
+    fig.add_trace(go.Scatter(
+        x=[x[0]], y=[y[0]], mode='markers',
+        marker=dict(size=12, color='white', symbol='square', line=dict(color='#e10600', width=3)),
+        showlegend=False, hovertext='Finish Line'
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=height,
+        margin=dict(t=10, b=10, l=10, r=10),
+        xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
+        yaxis=dict(visible=False),
+        paper_bgcolor='#0e1117',
+        plot_bgcolor='#0e1117',
+        showlegend=False
+    )
+    return fig
+
+
+def build_dominance_figure(geometry, dominance, colors, height=450):
+    """
+    Track outline coloured by the mini-sector leader (see
+    telemetry.minisector_dominance): one trace per leader, its segments
+    joined with None gaps.
+    """
+    outline = geometry['outline']
+    dist = np.append(outline['Distance'], geometry['length'])
+    x = np.append(outline['X'], outline['X'][0])
+    y = np.append(outline['Y'], outline['Y'][0])
+    seg = np.clip(np.searchsorted(dominance['End'].to_numpy(), dist, side='left'), 0, len(dominance) - 1)
+    leader = dominance['Leader'].to_numpy()[seg]
+
+    fig = go.Figure()
+    for name in dominance['Leader'].unique():
+        mask = leader == name
+        # Extend every run by one point so it meets the next segment
+        mask[1:] |= mask[:-1]
+        edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+        xs, ys = [], []
+        for start, stop in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            xs += x[start:stop].tolist() + [None]
+            ys += y[start:stop].tolist() + [None]
+        won = int((dominance['Leader'] == name).sum())
+        fig.add_trace(go.Scatter(
+            x=xs, y=ys, mode='lines',
+            line=dict(width=8, color=colors.get(name, '#808080')),
+            name=f"{name} ({won})",
+            hoverinfo='name'
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=[x[0]], y=[y[0]], mode='markers',
+        marker=dict(size=12, color='white', symbol='square', line=dict(color='#e10600', width=3)),
+        showlegend=False, hovertext='Finish Line'
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        height=height,
+        margin=dict(t=10, b=10, l=10, r=10),
+        xaxis=dict(visible=False, scaleanchor="y", scaleratio=1),
+        yaxis=dict(visible=False),
+        legend=dict(orientation="h", y=-0.02, x=0),
+        paper_bgcolor='#0e1117',
+        plot_bgcolor='#0e1117'
+    )
+    return fig
+
+
+# ==============================================================================
+# CHAMPIONSHIP
+# ==============================================================================
+
+def build_progression_figure(cumulative, round_names=None, top=10, colors=None, height=500):
+    """Cumulative points after every round, one line per driver/team (top `top` at the end)."""
+    fig = go.Figure()
+    rounds = cumulative.index.to_numpy()
+    labels = [round_names.get(r, f"Round {r}") for r in rounds] if round_names is not None else None
+    for name in cumulative.columns[:top]:
+        fig.add_trace(go.Scatter(
+            x=rounds,
+            y=cumulative[name].to_numpy(),
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2.5, color=(colors or {}).get(name)),
+            marker=dict(size=5),
+            customdata=labels,
+            hovertemplate=f'<b>{name}</b><br>%{{customdata}}<br>%{{y:.0f}} pts<extra></extra>'
+            if labels is not None else f'<b>{name}</b><br>Round %{{x}}<br>%{{y:.0f}} pts<extra></extra>'
+        ))
+    fig.update_layout(
+        template="plotly_dark",
+        height=height,
+        xaxis=dict(title="Round", gridcolor='#2d3340', dtick=1),
+        yaxis=dict(title="Points", gridcolor='#2d3340'),
+        legend=dict(orientation="h", y=-0.15, x=0),
+        margin=dict(t=20, b=40, l=60, r=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(255,255,255,0.03)',
+        hovermode='closest'
+    )
+    return fig
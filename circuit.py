@@ -0,0 +1,145 @@
+"""
+Circuit geometry: track outline, corners, sector boundaries, DRS zones and
+the speed trap, derived once per event from a reference lap and kept as
+a small JSON file.
+
+    cache/circuits/<year>/<round>_<location>.json
+
+The round is part of the name because one venue can host two events with
+different layouts in a season (Bahrain and Sakhir 2020).
+
+Track maps render from this file alone, so once a circuit has been seen
+(in any session of that weekend) no telemetry has to be loaded to draw it.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from session_store import _slug, pick_fastest
+from telemetry import session_corners
+
+CIRCUIT_DIR = os.path.join("cache", "circuits")
+GEOMETRY_VERSION = 2
+
+# Spacing (metres) of the stored track outline
+OUTLINE_STEP_M = 20.0
+# FastF1 DRS channel values >= this mean the flap is open
+DRS_OPEN = 10
+
+
+def geometry_name(event, fallback):
+    """File name stem for an event: <round>_<location> (`fallback` names events without a location)."""
+    location = _slug(event.get('Location') or fallback)
+    round_number = event.get('RoundNumber')
+    return location if pd.isna(round_number) else f"{int(round_number):02d}_{location}"
+
+
+def geometry_path(year, name, root=None):
+    return os.path.join(root or CIRCUIT_DIR, str(year), f"{name}.json")
+
+
+def _runs(mask):
+    """[start, stop) index pairs of the True runs in a boolean array."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)])
+
+
+def _official_corners(corners, x, y, distance):
+    """FastF1 corners, with Distance re-measured along the reference lap."""
+    cx = corners['X'].to_numpy(dtype=float)
+    cy = corners['Y'].to_numpy(dtype=float)
+    nearest = np.argmin((cx[:, None] - x[None, :]) ** 2 + (cy[:, None] - y[None, :]) ** 2, axis=1)
+    letters = corners['Letter'].fillna('') if 'Letter' in corners.columns else [''] * len(corners)
+    return [{'Number': int(n), 'Letter': str(letter), 'X': float(a), 'Y': float(b), 'Distance': float(distance[j])}
+            for n, letter, a, b, j in zip(corners['Number'], letters, cx, cy, nearest)]
+
+
+def build_geometry(session):
+    """Derive the circuit geometry from the session's fastest lap (needs telemetry)."""
+    laps = session.get_laps(['Driver', 'LapNumber', 'LapTime', 'IsPersonalBest', 'Sector1Time', 'Sector2Time'])
+    ref = pick_fastest(laps)
+    if ref is None:
+        return None
+    tel = session.lap_telemetry(ref['Driver'], ref['LapNumber'])
+    if tel is None or len(tel) < 10:
+        return None
+
+    distance = tel['Distance'].to_numpy(dtype=float)
+    x = tel['X'].to_numpy(dtype=float)
+    y = tel['Y'].to_numpy(dtype=float)
+    speed = tel['Speed'].to_numpy(dtype=float)
+    lap_time = tel['Time'].dt.total_seconds().to_numpy()
+    length = float(distance[-1])
+
+    # Sector boundaries: where the reference lap crossed its sector 1/2 split times
+    splits = [ref['Sector1Time'], ref['Sector1Time'] + ref['Sector2Time']]
+    if any(pd.isna(s) for s in splits):
+        sectors = [length / 3, 2 * length / 3]
+    else:
+        sectors = [float(np.interp(s.total_seconds(), lap_time, distance)) for s in splits]
+
+    drs = tel['DRS'].to_numpy(dtype=float) if 'DRS' in tel.columns else np.zeros(len(tel))
+    drs_zones = [[float(distance[a]), float(distance[b - 1])] for a, b in _runs(drs >= DRS_OPEN) if b - a > 1]
+
+    official = session.circuit_corners()
+    if official is not None and len(official) > 0:
+        corners = _official_corners(official, x, y, distance)
+    else:
+        detected = session_corners(session)
+        corners = [{'Number': int(c['Corner']), 'Letter': '', 'X': float(c['X']), 'Y': float(c['Y']),
+                    'Distance': float(c['Distance'])} for c in detected.to_dict('records')]
+
+    grid = np.arange(0.0, length, OUTLINE_STEP_M)
+    trap = int(np.argmax(speed))
+    return {
+        'version': GEOMETRY_VERSION,
+        'reference': {'driver': str(ref['Driver']), 'lap': float(ref['LapNumber'])},
+        'length': length,
+        'outline': {
+            'Distance': grid.round(1).tolist(),
+            'X': np.interp(grid, distance, x).round(1).tolist(),
+            'Y': np.interp(grid, distance, y).round(1).tolist(),
+            'Speed': np.interp(grid, distance, speed).round(1).tolist(),
+        },
+        'sectors': sectors,
+        'corners': corners,
+        'drs_zones': drs_zones,
+        'speed_trap': {'X': float(x[trap]), 'Y': float(y[trap]), 'Distance': float(distance[trap])},
+        'official_corners': official is not None,
+    }
+
+
+def load_geometry(year, name, root=None):
+    """Stored geometry of an event's circuit, or None."""
+    try:
+        with open(geometry_path(year, name, root)) as f:
+            geometry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return geometry if geometry.get('version') == GEOMETRY_VERSION else None
+
+
+def save_geometry(geometry, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(geometry, f)
+    os.replace(tmp_path, path)
+
+
+def circuit_geometry(session, root=None):
+    """
+    Geometry of the session's circuit: read from disk, or built and saved
+    when the session already has telemetry. Never triggers a telemetry load;
+    returns None if the circuit is unknown and telemetry is not loaded.
+    """
+    year = session.meta['year']
+    name = geometry_name(session.event, session.meta['event'])
+    geometry = load_geometry(year, name, root)
+    if geometry is None and session.has_telemetry:
+        geometry = build_geometry(session)
+        if geometry is not None:
+            save_geometry(geometry, geometry_path(year, name, root))
+    return geometry
@@ -0,0 +1,231 @@
+"""
+Whole-grid race analytics computed from the laps table.
+
+Every function here works on all drivers at once with grouped/vectorized
+pandas operations, so callers compute a table once and then filter it per
+driver instead of re-scanning the laps for each selection.
+"""
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# LAP CLASSIFICATION
+# ==============================================================================
+
+# FastF1 track status codes (a lap's TrackStatus lists every status seen during it)
+SAFETY_CAR_STATUS = '4'
+RED_FLAG_STATUS = '5'
+VSC_STATUS = '67'  # deployed, ending
+
+# A green-flag lap is an outlier when it is further from the driver's median than
+# OUTLIER_Z robust standard deviations (1.4826 * MAD) and OUTLIER_MIN_FRACTION of the median
+OUTLIER_Z = 3.5
+OUTLIER_MIN_FRACTION = 0.03
+
+LAP_FLAGS = ['IsInLap', 'IsOutLap', 'IsFirstLap', 'IsSafetyCar', 'IsVSC', 'IsRedFlag',
+             'IsInaccurate', 'IsOutlier', 'IsClean']
+
+
+def classify_laps(laps):
+    """
+    Lap-quality flags (LAP_FLAGS) for every lap of the grid in one
+    vectorized pass, aligned with `laps`. IsClean is the mask pace views
+    select from: a timed, accurate green-flag lap that is not lap 1, an
+    in/out lap or an outlier. Computed once when a session is stored.
+    """
+    def track_status(codes):
+        if 'TrackStatus' not in laps.columns:
+            return pd.Series(False, index=laps.index)
+        status = laps['TrackStatus'].astype('string').fillna('')
+        return status.str.contains(f"[{codes}]", regex=True).astype(bool)
+
+    flags = pd.DataFrame({
+        'IsInLap': laps['PitInTime'].notna(),
+        'IsOutLap': laps['PitOutTime'].notna(),
+        'IsFirstLap': laps['LapNumber'] == 1,
+        'IsSafetyCar': track_status(SAFETY_CAR_STATUS),
+        'IsVSC': track_status(VSC_STATUS),
+        'IsRedFlag': track_status(RED_FLAG_STATUS),
+    }, index=laps.index)
+    if 'IsAccurate' in laps.columns:
+        flags['IsInaccurate'] = ~(laps['IsAccurate'] == True)
+    else:
+        flags['IsInaccurate'] = False
+
+    # Outliers are judged against the driver's own green-flag racing laps
+    lap_sec = laps['LapTime'].dt.total_seconds()
+    green = lap_sec.notna() & ~flags.drop(columns='IsInaccurate').any(axis=1)
+    times = lap_sec.where(green)
+    by_driver = laps['Driver'].to_numpy()
+    median = times.groupby(by_driver, sort=False).transform('median')
+    deviation = (times - median).abs()
+    mad = deviation.groupby(by_driver, sort=False).transform('median')
+    limit = np.maximum(OUTLIER_Z * 1.4826 * mad, OUTLIER_MIN_FRACTION * median)
+    flags['IsOutlier'] = green & (deviation > limit)
+
+    flags['IsClean'] = green & ~flags['IsInaccurate'] & ~flags['IsOutlier']
+    return flags[LAP_FLAGS]
+
+
+# ==============================================================================
+# STINTS & PACE
+# ==============================================================================
+
+STINT_COLUMNS = ['Driver', 'Stint', 'Compound', 'StartLap', 'EndLap', 'Laps', 'MeanPace', 'MedianPace']
+
+
+def assign_stints(laps):
+    """
+    Stint number for every lap.
+    Uses FastF1's 'Stint' column and falls back to counting pit entries
+    (a stint ends on the lap that has a PitInTime).
+    """
+    pitted_before = laps['PitInTime'].notna().groupby(laps['Driver'], sort=False, observed=True).shift(fill_value=False)
+    derived = pitted_before.astype(int).groupby(laps['Driver'], sort=False, observed=True).cumsum() + 1
+    if 'Stint' in laps.columns:
+        return laps['Stint'].fillna(derived).astype(int)
+    return derived
+
+
+def compute_stints(laps):
+    """
+    One row per (driver, stint) for the full grid in a single grouped pass:
+    Driver, Stint, Compound, StartLap, EndLap, Laps, MeanPace, MedianPace.
+    """
+    if laps is None or len(laps) == 0:
+        return pd.DataFrame(columns=STINT_COLUMNS)
+
+    laps = laps.sort_values(['Driver', 'LapNumber'], kind='stable')
+    work = pd.DataFrame({
+        'Driver': laps['Driver'].to_numpy(),
+        'LapNumber': laps['LapNumber'].to_numpy(),
+        'Compound': laps['Compound'].to_numpy(),
+        'LapTimeSec': laps['LapTime'].dt.total_seconds().to_numpy(),
+    })
+    work['Stint'] = assign_stints(laps).to_numpy()
+
+    grouped = work.groupby(['Driver', 'Stint'], sort=False, observed=True)
+    stints = grouped.agg(
+        StartLap=('LapNumber', 'min'),
+        EndLap=('LapNumber', 'max'),
+        Laps=('LapNumber', 'size'),
+        MeanPace=('LapTimeSec', 'mean'),
+        MedianPace=('LapTimeSec', 'median'),
+    )
+
+    # Most used compound per stint (mode), without a Python-level apply
+    counts = work.dropna(subset=['Compound']).groupby(['Driver', 'Stint', 'Compound'], sort=False, observed=True).size()
+    counts = counts.sort_values(ascending=False, kind='stable').reset_index()
+    mode = counts.drop_duplicates(['Driver', 'Stint']).set_index(['Driver', 'Stint'])['Compound']
+    stints['Compound'] = mode.reindex(stints.index).fillna('UNKNOWN').to_numpy()
+
+    stints = stints.reset_index().sort_values(['Driver', 'Stint'], kind='stable').reset_index(drop=True)
+    stints['StartLap'] = stints['StartLap'].astype(int)
+    stints['EndLap'] = stints['EndLap'].astype(int)
+    return stints[STINT_COLUMNS]
+
+
+def compute_fastest_laps(laps):
+    """Fastest timed lap of every driver: Driver, LapNumber, LapTimeSec, Compound."""
+    timed = pd.DataFrame({
+        'Driver': laps['Driver'].to_numpy(),
+        'LapNumber': laps['LapNumber'].to_numpy(),
+        'LapTimeSec': laps['LapTime'].dt.total_seconds().to_numpy(),
+        'Compound': laps['Compound'].to_numpy(),
+    }).dropna(subset=['LapTimeSec'])
+    fastest = timed.loc[timed.groupby('Driver', sort=False, observed=True)['LapTimeSec'].idxmin()]
+    return fastest.sort_values('LapTimeSec').reset_index(drop=True)
+
+
+def compute_consistency(laps):
+    """Lap time consistency per driver on clean laps (IsClean, see classify_laps)."""
+    clean = laps[laps['IsClean']]
+    times = pd.DataFrame({
+        'Driver': clean['Driver'].to_numpy(),
+        'LapTimeSec': clean['LapTime'].dt.total_seconds().to_numpy(),
+    })
+    enough = times.groupby('Driver', sort=False, observed=True)['LapTimeSec'].transform('size') > 5
+    consistent = times[enough]
+
+    stats = consistent.groupby('Driver', sort=False, observed=True)['LapTimeSec'].agg(std_dev='std', mean='mean')
+    stats['consistency_score'] = 100 * (1 - stats['std_dev'] / stats['mean'])
+    return stats.reset_index()
+
+
+def compute_sector_stats(laps):
+    """Best and average sector times per driver on clean laps."""
+    clean = laps[laps['IsClean']]
+    sectors = pd.DataFrame({'Driver': clean['Driver'].to_numpy()})
+    for i in (1, 2, 3):
+        sectors[f'S{i}'] = clean[f'Sector{i}Time'].dt.total_seconds().to_numpy()
+
+    grouped = sectors.groupby('Driver', sort=False, observed=True)
+    stats = grouped[['S1', 'S2', 'S3']].min()
+    averages = grouped[['S1', 'S2', 'S3']].mean().add_suffix('_avg')
+    stats = stats.join(averages).dropna(subset=['S1', 'S2', 'S3'])
+    return stats.reset_index()
+
+
+def compute_degradation(laps):
+    """
+    Seconds lost per lap on each compound for every driver
+    ((last - first) / laps, compounds with more than 3 clean laps).
+    """
+    clean = laps[laps['IsClean']]
+    timed = pd.DataFrame({
+        'Driver': clean['Driver'].to_numpy(),
+        'Compound': clean['Compound'].to_numpy(),
+        'LapTimeSec': clean['LapTime'].dt.total_seconds().to_numpy(),
+    }).dropna()
+    grouped = timed.groupby(['Driver', 'Compound'], sort=False, observed=True)['LapTimeSec']
+    deg = grouped.agg(first='first', last='last', laps='size', avg_time='mean')
+    deg = deg[deg['laps'] > 3]
+    deg['rate'] = (deg['last'] - deg['first']) / deg['laps']
+    return deg.reset_index()[['Driver', 'Compound', 'rate', 'laps', 'avg_time']]
+
+
+# ==============================================================================
+# SESSION-WIDE METRICS
+# ==============================================================================
+
+METRIC_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'Stint', 'Compound', 'PitInTime', 'PitOutTime',
+                  'IsClean', 'Sector1Time', 'Sector2Time', 'Sector3Time']
+
+METRIC_BUILDERS = {
+    'stints': compute_stints,
+    'fastest_laps': compute_fastest_laps,
+    'consistency': compute_consistency,
+    'sectors': compute_sector_stats,
+    'degradation': compute_degradation,
+}
+
+
+def session_metrics(session):
+    """
+    All per-driver aggregates for the full grid, computed once per loaded
+    session and cached with it (in memory and in the store's derived tables).
+    Tabs filter these tables instead of recomputing on every rerun.
+    """
+    laps = None
+    metrics = {}
+    for name, builder in METRIC_BUILDERS.items():
+        def build(s, builder=builder):
+            nonlocal laps
+            if laps is None:
+                laps = s.get_laps(METRIC_COLUMNS)
+            return builder(laps)
+        metrics[name] = session.derived(name, build)
+    return metrics
+
+
+def driver_metrics(table, driver):
+    """Row of a per-driver metrics table as a dict (None if the driver is missing)."""
+    rows = table[table['Driver'] == driver]
+    return rows.iloc[0].to_dict() if len(rows) > 0 else None
+
+
+def driver_degradation(table, driver):
+    """Degradation rows of one driver keyed by compound."""
+    rows = table[table['Driver'] == driver]
+    return {r['Compound']: r for r in rows.to_dict('records')}
@@ -0,0 +1,218 @@
+"""
+Process-wide pool of stored sessions.
+
+Every Streamlit user used to keep their own StoredSession in
+st.session_state, so each user decoded (and kept) their own copy of the
+same laps and telemetry. The pool keeps one StoredSession per
+(year, event, session_code) for the whole server process; users only hold
+a SessionHandle (the key). Sessions are evicted least recently used first
+once the decoded data of all resident sessions exceeds the memory budget,
+and an evicted session is simply reopened from the on-disk store the next
+time a handle asks for it.
+
+LOAD DATA goes through load_async(): a background LoadJob fetches the
+session tier by tier (results, laps, telemetry) so the page can render
+each tier as soon as it is ready instead of waiting for all of them.
+
+    F1_POOL_MB   memory budget of the pool (default 1024)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import session_store
+
+POOL_BUDGET_MB = float(os.environ.get("F1_POOL_MB", 1024))
+
+# Tiers of a background load, in the order they become available
+LOAD_STAGES = ['results', 'laps', 'telemetry']
+# Sessions loaded concurrently in the background
+LOAD_WORKERS = 2
+
+
+class SessionHandle:
+    """What a user keeps in st.session_state: the key of a pooled session."""
+
+    __slots__ = ('pool', 'key')
+
+    def __init__(self, pool, key):
+        self.pool = pool
+        self.key = key
+
+    @property
+    def session(self):
+        """The pooled StoredSession (reopened from the store if it was evicted)."""
+        return self.pool.get(self.key)
+
+    def __repr__(self):
+        return f"SessionHandle{self.key}"
+
+
+class LoadJob:
+    """
+    Background load of one session, polled by the page. `ready` lists the
+    finished tiers: `results` / `event` are set after the results tier,
+    `handle` after the laps tier. A failed results or laps tier stops the
+    job; missing telemetry only leaves `error` set.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.stage = LOAD_STAGES[0]
+        self.ready = []
+        self.timings = {}
+        self.results = None
+        self.event = None
+        self.handle = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._events = {stage: threading.Event() for stage in LOAD_STAGES}
+
+    @property
+    def done(self):
+        return self.stage is None
+
+    @property
+    def progress(self):
+        return len(self.ready) / len(LOAD_STAGES)
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def message(self):
+        done = ", ".join(f"{stage} {self.timings[stage]:.1f} s" for stage in self.ready)
+        current = f"Loading {self.stage}..." if self.stage else "Loaded"
+        return f"{current} ({done})" if done else current
+
+    def wait(self, stage=LOAD_STAGES[-1], timeout=None):
+        """Block until `stage` is ready or the job stopped before it; True if it is ready."""
+        self._events[stage].wait(timeout)
+        return stage in self.ready
+
+    def _finish(self, stage):
+        self.timings[stage] = time.perf_counter() - self.started
+        self.ready.append(stage)
+        self._events[stage].set()
+
+    def _stop(self, error=None):
+        self.error = error
+        self.finished = time.perf_counter()
+        self.stage = None
+        for event in self._events.values():
+            event.set()
+
+
+class SessionPool:
+    """LRU pool of StoredSessions bounded by `budget_mb` of decoded data."""
+
+    def __init__(self, budget_mb=POOL_BUDGET_MB, root=None, fetch=None):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.root = root
+        self.fetch = fetch
+        self._sessions = OrderedDict()
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._loader = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, year, event, session_code):
+        """Handle to a session, loading it into the store first if needed."""
+        key = (year, event, session_code)
+        if self.get(key) is None:
+            return None
+        return SessionHandle(self, key)
+
+    def load_async(self, year, event, session_code):
+        """Start a background LoadJob for a session (or join the one already running)."""
+        key = (year, event, session_code)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.done:
+                if self._loader is None:
+                    self._loader = ThreadPoolExecutor(LOAD_WORKERS, thread_name_prefix="session-loader")
+                job = self._jobs[key] = LoadJob(key)
+                self._loader.submit(self._run, job)
+        return job
+
+    def job(self, key):
+        """The running LoadJob of a session, if any."""
+        job = self._jobs.get(key)
+        return job if job is not None and not job.done else None
+
+    def _run(self, job):
+        try:
+            job.results, job.event = session_store.load_results(*job.key, root=self.root, fetch=self.fetch)
+            job._finish('results')
+            job.stage = 'laps'
+            job.handle = self.acquire(*job.key)
+            if job.handle is None:
+                raise ValueError(f"no lap timing for {job.key}")
+            job._finish('laps')
+            job.stage = 'telemetry'
+            if not job.handle.session.ensure_telemetry(fetch=self.fetch):
+                raise ValueError(f"no telemetry for {job.key}")
+            job._finish('telemetry')
+            job._stop()
+        except Exception as e:
+            job._stop(e)
+
+    def get(self, key):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self.hits += 1
+                self._sessions.move_to_end(key)
+                self.trim()
+                return session
+            self.misses += 1
+
+        # Opening (or fetching) runs outside the lock so other sessions stay available
+        session = session_store.open_session(*key, root=self.root)
+        if session is None:
+            session = session_store.load_session(*key, root=self.root, fetch=self.fetch)
+        if session is None:
+            return None
+
+        with self._lock:
+            # Another user may have opened it meanwhile: everyone shares the first one
+            session = self._sessions.setdefault(key, session)
+            self._sessions.move_to_end(key)
+            self.trim()
+        return session
+
+    def trim(self):
+        """Evict least recently used sessions until the pool fits its budget (the newest always stays)."""
+        with self._lock:
+            sizes = {key: s.memory_usage() for key, s in self._sessions.items()}
+            total = sum(sizes.values())
+            while total > self.budget and len(self._sessions) > 1:
+                key, _ = self._sessions.popitem(last=False)
+                total -= sizes[key]
+                self.evictions += 1
+
+    def evict(self, key):
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self.evictions += 1
+
+    def stats(self):
+        """Resident sessions, decoded bytes (and bytes saved by compact dtypes), budget and counters."""
+        with self._lock:
+            sizes = {key: s.memory_usage() for key, s in self._sessions.items()}
+            return {
+                'resident': len(sizes),
+                'bytes': sum(sizes.values()),
+                'saved': sum(s.bytes_saved for s in self._sessions.values()),
+                'budget': self.budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'sessions': sizes,
+            }
@@ -0,0 +1,823 @@
+"""
+Columnar on-disk session store.
+
+A loaded FastF1 session is persisted as one directory per
+(year, event, session_code). Every table (laps, results, per-car telemetry)
+is written as one typed NumPy ``.npy`` file per column plus a small JSON
+schema, so a warm load only reads (memory-maps) the columns that are
+actually requested instead of unpickling a whole Session object.
+
+Layout::
+
+    cache/sessions/<year>/<event>/<session_code>/
+        meta.json
+        results.json  (results-only entry, written before the laps are stored)
+        laps/_schema.json, laps/000.npy, laps/001.npy, ...  (one file per column, incl. lap-quality flags)
+        results/...
+        telemetry/car/<driver>/...
+        telemetry/pos/<driver>/...
+        circuit_corners/...  (FastF1 circuit info, when it was available)
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from race_analytics import classify_laps
+
+STORE_DIR = os.path.join("cache", "sessions")
+STORE_VERSION = 3
+# Attempts to swap a freshly written table in while other writers race for it
+SWAP_RETRIES = 20
+# Attempts, and the pause between them, of a read that a table swap got in the way of
+READ_RETRIES = 20
+READ_RETRY_WAIT = 0.005
+
+# Telemetry channels kept per car (everything the dashboard plots)
+CAR_CHANNELS = ['SessionTime', 'Speed', 'RPM', 'nGear', 'Throttle', 'Brake', 'DRS']
+POS_CHANNELS = ['SessionTime', 'X', 'Y', 'Z']
+
+# Telemetry channel dtypes applied at load (FastF1 hands out 8 bytes per value for all of them)
+TELEMETRY_DTYPES = {'Speed': np.float32, 'RPM': np.float32, 'Throttle': np.float32, 'nGear': np.int8,
+                    'Brake': np.int8, 'DRS': np.int8, 'X': np.float32, 'Y': np.float32, 'Z': np.float32}
+# Suffix of the float-seconds companion of a laps timing column (LapTime -> LapTimeSec)
+SECONDS_SUFFIX = 'Sec'
+
+CORNER_FIELDS = ['X', 'Y', 'Number', 'Letter', 'Angle', 'Distance']
+EVENT_FIELDS = ['RoundNumber', 'Country', 'Location', 'OfficialEventName', 'EventDate', 'EventName']
+
+
+# ==============================================================================
+# COLUMN ENCODING
+# ==============================================================================
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_') or 'unknown'
+
+
+def _json_value(value):
+    if value is None or (np.isscalar(value) and pd.isna(value)):
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _encode_column(series):
+    """Convert a pandas Series into (ndarray, schema entry) without pickling."""
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().astype(np.int32)
+        return codes, {'kind': 'string', 'categories': [str(c) for c in dtype.categories]}
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return series.values.astype('timedelta64[ns]').view('i8'), {'kind': 'timedelta'}
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.dt.tz_localize(None) if getattr(series.dt, 'tz', None) else series
+        return values.values.astype('datetime64[ns]').view('i8'), {'kind': 'datetime'}
+    if pd.api.types.is_bool_dtype(dtype) and not isinstance(dtype, pd.BooleanDtype):
+        return series.values.astype(bool), {'kind': 'bool'}
+    if pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.BooleanDtype):
+        return series.to_numpy(), {'kind': 'numeric'}
+
+    # Nullable flags (e.g. 'Deleted' is bool | None) -> int8 with -1 as missing
+    if isinstance(dtype, pd.BooleanDtype) or pd.api.types.infer_dtype(series, skipna=True) == 'boolean':
+        flags = np.full(len(series), -1, dtype=np.int8)
+        mask = series.notna().to_numpy()
+        flags[mask] = series[mask].astype(bool).to_numpy()
+        return flags, {'kind': 'flag'}
+
+    # Strings (and anything else) -> dictionary encoding
+    as_str = series.where(series.isna(), series.astype(str))
+    codes, categories = pd.factorize(as_str, use_na_sentinel=True)
+    return codes.astype(np.int32), {'kind': 'string', 'categories': [str(c) for c in categories]}
+
+
+def _decode_column(values, spec, categorical=False):
+    kind = spec['kind']
+    if kind == 'timedelta':
+        return pd.to_timedelta(np.asarray(values).view('timedelta64[ns]'))
+    if kind == 'datetime':
+        return pd.to_datetime(np.asarray(values).view('datetime64[ns]'))
+    if kind == 'flag':
+        flags = np.asarray(values)
+        out = np.empty(len(flags), dtype=object)
+        out[:] = flags == 1
+        out[flags < 0] = None
+        return out
+    if kind == 'string' and categorical:
+        # Categories in sorted order, so sorting by the column matches sorting the strings
+        categories = np.asarray(spec['categories'], dtype=object)
+        order = np.argsort(categories, kind='stable')
+        rank = np.empty(len(order) + 1, dtype=np.int32)
+        rank[order] = np.arange(len(order))
+        rank[-1] = -1
+        return pd.Categorical.from_codes(rank[np.asarray(values)], categories[order])
+    if kind == 'string':
+        codes = np.asarray(values)
+        lookup = np.asarray(spec['categories'] + [None], dtype=object)
+        return lookup[codes]  # code -1 picks the trailing None
+    return values
+
+
+def _nbytes(value):
+    """
+    Heap memory held by a decoded column or table (object columns count
+    their pointers, categoricals their codes plus their category strings).
+    Memory-mapped columns are deliberately left out: they live in the OS
+    page cache, shared by every reader, and are not what the pool budget
+    can free by dropping a session.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, pd.Categorical):
+        return int(value.codes.nbytes + value.categories.memory_usage(deep=True))
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, (pd.Index, np.ndarray)):
+        return int(value.nbytes)
+    return 0
+
+
+def write_table(df, path):
+    """
+    Write a DataFrame as one .npy file per column. The table is written to
+    a private temporary directory and swapped in with renames, so
+    concurrent writers never share files. The swap takes two renames (old
+    table aside, new table in), and between them no table exists at `path`:
+    readers go through read_consistent(), which waits the swap out.
+    """
+    parent, name = os.path.split(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=f".{name}.", suffix=".tmp", dir=parent)
+
+    schema = {}
+    for i, col in enumerate(df.columns):
+        values, spec = _encode_column(df[col])
+        spec['file'] = f"{i:03d}.npy"
+        np.save(os.path.join(tmp_path, spec['file']), values, allow_pickle=False)
+        schema[str(col)] = spec
+
+    with open(os.path.join(tmp_path, "_schema.json"), "w") as f:
+        json.dump({'rows': len(df), 'columns': schema}, f)
+
+    # A directory cannot be replaced while it has files: move the old table aside first
+    aside = tmp_path + ".old"
+    for _ in range(SWAP_RETRIES):
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename(tmp_path, path)
+            break
+        except OSError:
+            # Another writer swapped its copy in between: retire that one as well
+            shutil.rmtree(aside, ignore_errors=True)
+    else:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise OSError(f"could not replace {path}")
+    shutil.rmtree(aside, ignore_errors=True)
+
+
+def _table_stamp(path):
+    """Identity of the table currently at `path` (its schema file's inode and mtime), or None."""
+    try:
+        st = os.stat(os.path.join(path, "_schema.json"))
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def _swap_in_progress(path):
+    """True while a write_table() swap has the old table at `path` moved aside."""
+    parent, name = os.path.split(path)
+    try:
+        return any(n.startswith(f".{name}.") and n.endswith(".old") for n in os.listdir(parent))
+    except FileNotFoundError:
+        return False
+
+
+def read_consistent(path, read):
+    """
+    Run `read()` on the table at `path` so that it sees exactly one version
+    of it: a read that finds the table moved aside by a swap, or that
+    straddles a swap (the table changed underneath it), is retried once the
+    new table is in place. A table that is simply not there fails at once.
+    """
+    for _ in range(READ_RETRIES):
+        stamp = _table_stamp(path)
+        if stamp is None:
+            # The swap may have finished between the two checks
+            if not _swap_in_progress(path) and _table_stamp(path) is None:
+                raise FileNotFoundError(os.path.join(path, "_schema.json"))
+        else:
+            try:
+                result = read()
+            except (OSError, ValueError, KeyError):
+                if _table_stamp(path) == stamp:
+                    raise
+            else:
+                if _table_stamp(path) == stamp:
+                    return result
+        time.sleep(READ_RETRY_WAIT)
+    raise OSError(f"{path} kept changing while it was read")
+
+
+def read_schema(path):
+    with open(os.path.join(path, "_schema.json")) as f:
+        return json.load(f)
+
+
+def read_column(path, column, schema=None, categorical=False):
+    """Memory-map and decode a single stored column (strings as categoricals if `categorical`)."""
+    schema = schema or read_schema(path)
+    spec = schema['columns'][column]
+    values = np.load(os.path.join(path, spec['file']), mmap_mode='r', allow_pickle=False)
+    return _decode_column(values, spec, categorical)
+
+
+def read_table(path, columns=None):
+    """Read a stored table; only the requested columns are touched on disk."""
+    def read():
+        schema = read_schema(path)
+        names = list(schema['columns']) if columns is None else [c for c in columns if c in schema['columns']]
+        return pd.DataFrame({c: read_column(path, c, schema) for c in names}, columns=names)
+
+    return read_consistent(path, read)
+
+
+# ==============================================================================
+# COMPACT DTYPES
+# ==============================================================================
+
+def compact_telemetry(df):
+    """Telemetry with TELEMETRY_DTYPES applied (integer channels stay float32 if they have gaps)."""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        dtype = TELEMETRY_DTYPES.get(col)
+        if dtype is not None and values.dtype != dtype:
+            if np.issubdtype(dtype, np.integer) and values.isna().any():
+                dtype = np.float32
+            values = values.astype(dtype)
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def bytes_saved(values):
+    """Bytes a decoded column saves against the 8 bytes per value FastF1 hands out."""
+    if isinstance(values, pd.Series):
+        values = values.array
+    return max(len(values) * 8 - int(values.nbytes), 0)
+
+
+def _seconds_base(column, stored):
+    """Timing column a `<column>Sec` name refers to, or None."""
+    base = column[:-len(SECONDS_SUFFIX)] if column.endswith(SECONDS_SUFFIX) else None
+    if base in stored and stored[base]['kind'] == 'timedelta':
+        return base
+    return None
+
+
+# ==============================================================================
+# SESSION STORE
+# ==============================================================================
+
+def session_dir(year, event, session_code, root=None):
+    return os.path.join(root or STORE_DIR, str(year), _slug(event), str(session_code))
+
+
+def has_session(year, event, session_code, root=None):
+    return os.path.exists(os.path.join(session_dir(year, event, session_code, root), "meta.json"))
+
+
+def _driver_numbers(session):
+    """Map FastF1 driver numbers to abbreviations."""
+    try:
+        return dict(zip(session.results['DriverNumber'].astype(str), session.results['Abbreviation']))
+    except Exception:
+        laps = session.laps
+        return dict(zip(laps['DriverNumber'].astype(str), laps['Driver']))
+
+
+def _write_meta(path, meta, name="meta.json"):
+    tmp_path = os.path.join(path, name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, name))
+
+
+def save_session(session, year, event, session_code, root=None, telemetry=True):
+    """
+    Persist a loaded FastF1 Session to the store.
+    The timing tier (laps, results) is always written; per-car telemetry only
+    when `telemetry` is set and the session was loaded with it.
+    """
+    path = session_dir(year, event, session_code, root)
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        os.remove(os.path.join(path, "meta.json"))
+    shutil.rmtree(os.path.join(path, "derived"), ignore_errors=True)
+
+    # Laps are stored grouped by driver so every driver is one contiguous block (see LapIndex)
+    laps = pd.DataFrame(session.laps).sort_values(['Driver', 'LapNumber'], kind='stable').reset_index(drop=True)
+    # Lap-quality flags (IsClean, IsInLap, ...) are stored with the laps, so views only select from them
+    laps = pd.concat([laps, classify_laps(laps)], axis=1)
+    write_table(laps, os.path.join(path, "laps"))
+    write_table(pd.DataFrame(session.results).reset_index(drop=True), os.path.join(path, "results"))
+
+    meta = {
+        'version': STORE_VERSION,
+        'year': year,
+        'event': event,
+        'session_code': session_code,
+        'session_name': getattr(session, 'name', session_code),
+        'event_info': {field: _json_value(session.event.get(field)) for field in EVENT_FIELDS},
+        'telemetry_loaded': False,
+        'telemetry_drivers': [],
+    }
+    # meta.json is written last: its presence marks a complete entry
+    _write_meta(path, meta)
+
+    if telemetry:
+        save_telemetry(session, path)
+    return path
+
+
+def save_telemetry(session, path):
+    """Add per-car telemetry of a telemetry-loaded FastF1 Session to a store entry."""
+    shutil.rmtree(os.path.join(path, "derived"), ignore_errors=True)
+    drivers = []
+    for number, abbr in _driver_numbers(session).items():
+        try:
+            car = session.car_data[number]
+            pos = session.pos_data[number]
+        except Exception:
+            continue
+        write_table(compact_telemetry(pd.DataFrame(car)[[c for c in CAR_CHANNELS if c in car.columns]]),
+                    os.path.join(path, "telemetry", "car", abbr))
+        write_table(compact_telemetry(pd.DataFrame(pos)[[c for c in POS_CHANNELS if c in pos.columns]]),
+                    os.path.join(path, "telemetry", "pos", abbr))
+        drivers.append(abbr)
+
+    # Official corner positions, when FastF1 can provide them (from its cache or the API)
+    try:
+        corners = pd.DataFrame(session.get_circuit_info().corners)
+        write_table(corners[[c for c in CORNER_FIELDS if c in corners.columns]].reset_index(drop=True),
+                    os.path.join(path, "circuit_corners"))
+    except Exception:
+        pass
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    meta['telemetry_loaded'] = True
+    meta['telemetry_drivers'] = drivers
+    _write_meta(path, meta)
+
+
+def open_session(year, event, session_code, root=None):
+    """Open a stored session, or return None if it is not (validly) stored."""
+    path = session_dir(year, event, session_code, root)
+    try:
+        stored = StoredSession(path)
+    except (OSError, ValueError):
+        return None
+    if stored.meta.get('version') != STORE_VERSION:
+        return None
+    return stored
+
+
+# ==============================================================================
+# FETCH COORDINATION
+# ==============================================================================
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` shared by every process (fcntl on POSIX, msvcrt on Windows)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s: keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution (and its result or error)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return call.result()
+
+
+_flights = SingleFlight()
+
+
+def fetch_lock(path):
+    """Cross-process lock for FastF1 fetches of the session stored at `path`."""
+    return file_lock(path + ".lock")
+
+
+# ==============================================================================
+# TIERED LOADING
+# ==============================================================================
+
+def _load_fastf1(year, event, session_code, telemetry, laps=True):
+    import fastf1
+    session = fastf1.get_session(year, event, session_code)
+    session.load(laps=laps, telemetry=telemetry, weather=False, messages=laps)
+    return session
+
+
+def save_results(session, year, event, session_code, root=None):
+    """
+    Persist the results of a FastF1 Session loaded without laps as a
+    results-only entry (results table + results.json). save_session later
+    rewrites the results together with the laps.
+    """
+    path = session_dir(year, event, session_code, root)
+    os.makedirs(path, exist_ok=True)
+    write_table(pd.DataFrame(session.results).reset_index(drop=True), os.path.join(path, "results"))
+    event_info = {field: _json_value(session.event.get(field)) for field in EVENT_FIELDS}
+    # results.json is written last: its presence marks a complete results-only entry
+    _write_meta(path, {'version': STORE_VERSION, 'event_info': event_info}, "results.json")
+
+
+def open_results(year, event, session_code, root=None):
+    """(results, event info) of a stored session or results-only entry, or None."""
+    stored = open_session(year, event, session_code, root)
+    if stored is not None:
+        return stored.results, stored.event
+    path = session_dir(year, event, session_code, root)
+    try:
+        with open(os.path.join(path, "results.json")) as f:
+            meta = json.load(f)
+        if meta.get('version') != STORE_VERSION:
+            return None
+        return read_table(os.path.join(path, "results")), pd.Series(meta['event_info'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_results(year, event, session_code, root=None, fetch=None):
+    """
+    Tier 0: (results, event info) of a session, from the store or from a
+    FastF1 load without laps, which skips the lap timing download. A fetch
+    is stored as a results-only entry and coordinated like load_session's:
+    one per session across threads, and under the session's file lock
+    across processes, which then find the entry stored.
+    """
+    stored = open_results(year, event, session_code, root)
+    if stored is not None:
+        return stored
+
+    def fetch_results():
+        with fetch_lock(session_dir(year, event, session_code, root)):
+            stored = open_results(year, event, session_code, root)
+            if stored is None:
+                session = (fetch or _load_fastf1)(year, event, session_code, telemetry=False, laps=False)
+                save_results(session, year, event, session_code, root)
+                stored = open_results(year, event, session_code, root)
+            return stored
+
+    return _flights.do(('results', session_dir(year, event, session_code, root)), fetch_results)
+
+
+def load_session(year, event, session_code, root=None, fetch=None):
+    """
+    Tier 1: serve a session from the store, fetching only timing data
+    (laps + results) through FastF1 on a miss. Telemetry is fetched later,
+    the first time a telemetry view asks for it.
+
+    Concurrent misses for the same session share one fetch: callers in
+    this process wait on the first one, other processes wait on its file
+    lock and then find the session stored. `fetch(year, event, code,
+    telemetry, laps=True)` replaces the FastF1 download (default _load_fastf1).
+    """
+    stored = open_session(year, event, session_code, root)
+    if stored is not None:
+        return stored
+
+    def fetch_timing():
+        with fetch_lock(session_dir(year, event, session_code, root)):
+            stored = open_session(year, event, session_code, root)
+            if stored is None:
+                session = (fetch or _load_fastf1)(year, event, session_code, telemetry=False)
+                save_session(session, year, event, session_code, root, telemetry=False)
+                stored = open_session(year, event, session_code, root)
+            return stored
+
+    return _flights.do(('timing', session_dir(year, event, session_code, root)), fetch_timing)
+
+
+def pick_fastest(laps):
+    """Fastest personal-best lap (same rule as FastF1's Laps.pick_fastest)."""
+    timed = laps.dropna(subset=['LapTime'])
+    if 'IsPersonalBest' in timed.columns:
+        best = timed[timed['IsPersonalBest'] == True]
+        if len(best) > 0:
+            timed = best
+    if len(timed) == 0:
+        return None
+    return timed.loc[timed['LapTime'].idxmin()]
+
+
+class LapIndex:
+    """
+    Row positions in a laps table stored sorted by (Driver, LapNumber):
+    driver -> contiguous slice and (driver, lap) -> row. Built once per session;
+    laps.iloc[slice] is a copy-free view.
+    """
+
+    def __init__(self, drivers, lap_numbers):
+        drivers = np.asarray(drivers, dtype=object)
+        lap_numbers = np.asarray(lap_numbers, dtype=float)
+        edges = np.flatnonzero(drivers[1:] != drivers[:-1]) + 1
+        bounds = np.concatenate([[0], edges, [len(drivers)]]).astype(int)
+        self.slices = {drivers[a]: slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a}
+        self.rows = {(d, lap): i for i, (d, lap) in enumerate(zip(drivers, lap_numbers)) if not np.isnan(lap)}
+
+    @property
+    def drivers(self):
+        return list(self.slices)
+
+    def positions(self, driver):
+        return self.slices.get(driver, slice(0, 0))
+
+    def row(self, driver, lap_number):
+        return self.rows.get((driver, float(lap_number)))
+
+    def driver_laps(self, laps, driver):
+        """View of one driver's laps (no boolean mask, no copy)."""
+        return laps.iloc[self.positions(driver)]
+
+    def lap(self, laps, driver, lap_number):
+        row = self.row(driver, lap_number)
+        return None if row is None else laps.iloc[row]
+
+
+def _read_derived(path):
+    """A stored derived table, or None if it is missing or unreadable (e.g. half written)."""
+    try:
+        return read_table(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class StoredSession:
+    """
+    Lightweight, lazily loaded view of a stored session.
+    Columns and per-car telemetry are decoded on first access and kept;
+    the telemetry tier itself is fetched on first use (see ensure_telemetry).
+    One object is shared by every user of the session pool, so whatever is
+    decoded is kept once (see _keep), whichever thread decoded it first.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.event = pd.Series(self.meta['event_info'])
+        self.name = self.meta['session_name']
+        self.weather_data = None
+        self._columns = {}
+        self._results = None
+        self._telemetry = {}
+        self._derived = {}
+        self._lap_index = None
+        self._lock = threading.Lock()
+        # Memory saved by compact dtypes in everything decoded so far
+        self.bytes_saved = 0
+
+    def _keep(self, cache, key, value, saved=0):
+        """Store a decoded value unless another thread already did; returns the kept one."""
+        with self._lock:
+            if key not in cache:
+                cache[key] = value
+                self.bytes_saved += saved
+            return cache[key]
+
+    @property
+    def key(self):
+        return (self.meta['year'], self.meta['event'], self.meta['session_code'])
+
+    # --- TIMING ---
+    def laps_columns(self):
+        table = os.path.join(self.path, "laps")
+        return read_consistent(table, lambda: list(read_schema(table)['columns']))
+
+    def get_laps(self, columns=None):
+        """
+        Laps table restricted to `columns` (all stored columns if None).
+        Strings come back categorical, and every timing column is also
+        available in float seconds as `<column>Sec` (LapTime -> LapTimeSec).
+        Columns are decoded once per session.
+        """
+        table = os.path.join(self.path, "laps")
+        names = read_consistent(table, lambda: self._decode_laps(table, columns))
+        return pd.DataFrame({c: self._columns[c] for c in names}, columns=names)
+
+    def _decode_laps(self, table, columns):
+        """Decode the requested laps columns not yet kept; returns their names."""
+        schema = read_schema(table)
+        stored = schema['columns']
+        if columns is None:
+            names = list(stored)
+        else:
+            names = [c for c in columns if c in stored or _seconds_base(c, stored)]
+        for col in names:
+            if col in self._columns:
+                continue
+            base = _seconds_base(col, stored) if col not in stored else None
+            if base is None:
+                values = read_column(table, col, schema, categorical=True)
+                saved = bytes_saved(values) if isinstance(values, pd.Categorical) else 0
+                self._keep(self._columns, col, values, saved)
+            else:
+                timing = self._columns.get(base)
+                if timing is None:
+                    timing = self._keep(self._columns, base, read_column(table, base, schema))
+                self._keep(self._columns, col, np.asarray(timing.total_seconds()))
+        return names
+
+    @property
+    def laps(self):
+        return self.get_laps()
+
+    @property
+    def lap_index(self):
+        if self._lap_index is None:
+            laps = self.get_laps(['Driver', 'LapNumber'])
+            self._lap_index = LapIndex(laps['Driver'].to_numpy(), laps['LapNumber'].to_numpy())
+        return self._lap_index
+
+    @property
+    def results(self):
+        if self._results is None:
+            self._results = read_table(os.path.join(self.path, "results"))
+        return self._results
+
+    def memory_usage(self):
+        """Bytes of decoded columns, results, telemetry and derived tables this object keeps."""
+        with self._lock:
+            held = list(self._columns.values()) + list(self._telemetry.values()) + list(self._derived.values())
+        return sum(_nbytes(v) for v in held) + _nbytes(self._results)
+
+    # --- DERIVED TABLES ---
+    def derived(self, name, build):
+        """
+        Table computed from this session and cached next to it on disk
+        (derived/<name>); `build(session)` only runs on a miss. Builds are
+        shared like fetches (one per session across threads and processes),
+        and a table that cannot be read is rebuilt.
+        """
+        if name not in self._derived:
+            path = os.path.join(self.path, "derived", name)
+
+            def build_table():
+                # Locked next to derived/, which save_session / save_telemetry remove
+                with fetch_lock(os.path.join(self.path, f"derived-{name}")):
+                    table = _read_derived(path)
+                    if table is None:
+                        table = build(self)
+                        write_table(table, path)
+                    return table
+
+            table = _read_derived(path)
+            if table is None:
+                table = _flights.do(('derived', path), build_table)
+            self._keep(self._derived, name, table)
+        return self._derived[name]
+
+    # --- TELEMETRY ---
+    @property
+    def has_telemetry(self):
+        return bool(self.meta.get('telemetry_loaded'))
+
+    @property
+    def telemetry_drivers(self):
+        return list(self.meta.get('telemetry_drivers', []))
+
+    def _reload_meta(self):
+        with open(os.path.join(self.path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+    def ensure_telemetry(self, fetch=None):
+        """
+        Fetch the telemetry tier into the store if it is not there yet (one
+        fetch per session across threads and processes, see load_session).
+        """
+        if not self.has_telemetry:
+            def fetch_telemetry():
+                with fetch_lock(self.path):
+                    self._reload_meta()
+                    if not self.has_telemetry:
+                        year, event, session_code = self.key
+                        save_telemetry((fetch or _load_fastf1)(year, event, session_code, telemetry=True), self.path)
+
+            _flights.do(('telemetry', self.path), fetch_telemetry)
+            self._reload_meta()
+        return self.has_telemetry
+
+    def _read_telemetry(self, kind, driver):
+        key = (kind, driver)
+        if key not in self._telemetry:
+            self.ensure_telemetry()
+            if driver not in self.telemetry_drivers:
+                return None
+            tel = compact_telemetry(read_table(os.path.join(self.path, "telemetry", kind, driver)))
+            saved = sum(bytes_saved(tel[c]) for c in tel.columns if c in TELEMETRY_DTYPES)
+            self._keep(self._telemetry, key, tel, saved)
+        return self._telemetry[key]
+
+    def car_data(self, driver):
+        return self._read_telemetry("car", driver)
+
+    def pos_data(self, driver):
+        return self._read_telemetry("pos", driver)
+
+    def circuit_corners(self):
+        """FastF1 circuit info corners (X, Y, Number, Letter, ...) or None."""
+        path = os.path.join(self.path, "circuit_corners")
+        if not os.path.exists(os.path.join(path, "_schema.json")):
+            return None
+        return read_table(path)
+
+    def lap_telemetry(self, driver, lap_number):
+        """
+        Car data for one lap merged with interpolated position data and
+        integrated Distance (equivalent to lap.get_telemetry().add_distance()).
+        Samples are taken from [LapStartTime, Time); a lap without both
+        timestamps gives an empty frame.
+        """
+        lap = self.lap_index.lap(self.get_laps(['LapStartTime', 'Time']), driver, lap_number)
+        if lap is None:
+            return None
+
+        car = self.car_data(driver)
+        pos = self.pos_data(driver)
+        if car is None or pos is None:
+            return None
+        start = stop = 0
+        if not (pd.isna(lap['LapStartTime']) or pd.isna(lap['Time'])):
+            car_t = car['SessionTime'].values.view('i8')
+            start, stop = np.searchsorted(car_t, [lap['LapStartTime'].value, lap['Time'].value], side='left')
+        tel = car.iloc[start:stop].reset_index(drop=True)
+
+        t = tel['SessionTime'].values.view('i8')
+        pos_t = pos['SessionTime'].values.view('i8')
+        for channel in ['X', 'Y', 'Z']:
+            if channel in pos.columns:
+                tel[channel] = np.interp(t, pos_t, pos[channel].to_numpy(dtype=float))
+
+        tel['Time'] = tel['SessionTime'] - lap['LapStartTime']
+        dt = np.diff(t, prepend=lap['LapStartTime'].value) / 1e9
+        tel['Distance'] = np.cumsum(tel['Speed'].to_numpy(dtype=float) / 3.6 * dt)
+        return tel
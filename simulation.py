@@ -0,0 +1,409 @@
+"""
+Championship maths: Monte Carlo title odds and exact clinch / elimination.
+
+Remaining races (and sprints) are simulated for the whole grid at once:
+every driver's performance in a race is drawn from a normal "form"
+distribution over finishing positions, the draws are ranked into a
+finishing order and scored with the real points tables. Seasons are
+simulated in chunks of (seasons, races, drivers) NumPy arrays, optionally
+spread over several processes.
+
+Clinch and elimination are exact: a driver is still in contention if some
+assignment of the remaining finishing positions (one driver per place per
+event) leaves them level or ahead of everyone. A polynomial relaxation and
+a greedy assignment settle almost every case; the rest fall back to a
+memoised search over the few rivals who could actually pass them.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+RACE_POINTS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=np.float32)
+SPRINT_POINTS = np.array([8, 7, 6, 5, 4, 3, 2, 1], dtype=np.float32)
+FASTEST_LAP_POINT = 1.0
+# Seasons in which the fastest lap scored a point (for a top-10 finisher)
+FASTEST_LAP_SEASONS = range(2019, 2025)
+
+DEFAULT_SEASONS = 100_000
+CHUNK_SEASONS = 10_000
+# Spread (positions) of a driver's finishing position when their history can't tell
+DEFAULT_FORM_SD = 3.0
+MIN_FORM_SD = 1.0
+# Races needed before a driver's own results define their form
+MIN_FORM_RACES = 3
+
+
+# ==============================================================================
+# FORM
+# ==============================================================================
+
+def _points_table(points, n_drivers):
+    """Points for P1..Pn (zeros beyond the scoring positions)."""
+    table = np.zeros(n_drivers, dtype=np.float32)
+    table[:min(len(points), n_drivers)] = points[:n_drivers]
+    return table
+
+
+def form_from_points(points, races, n_drivers=20):
+    """
+    Mean finishing position implied by average points per race: the
+    position whose race points match the average (interpolated), drivers
+    without points sit in the middle of the non-scoring places.
+    """
+    avg = np.asarray(points, dtype=float) / max(races, 1)
+    positions = np.arange(1, len(RACE_POINTS) + 1)
+    mean = np.interp(-avg, -RACE_POINTS.astype(float), positions)
+    return np.where(avg > 0, mean, (len(RACE_POINTS) + 1 + n_drivers) / 2)
+
+
+def driver_form(drivers, points, races, results=None):
+    """
+    (mean, sd) finishing position per driver. Drivers with at least
+    MIN_FORM_RACES stored race results use their own mean/std; the rest are
+    derived from their points per race with DEFAULT_FORM_SD.
+    """
+    mean = form_from_points(points, races, len(drivers))
+    sd = np.full(len(drivers), DEFAULT_FORM_SD)
+    if results is not None and len(results) > 0:
+        races_only = results[results['Kind'] == 'race']
+        stats = races_only.groupby('Driver')['Position'].agg(['mean', 'std', 'size']).reindex(drivers)
+        known = (stats['size'] >= MIN_FORM_RACES).to_numpy()
+        mean = np.where(known, stats['mean'].to_numpy(), mean)
+        sd = np.where(known, np.maximum(stats['std'].fillna(DEFAULT_FORM_SD).to_numpy(), MIN_FORM_SD), sd)
+    return mean, sd
+
+
+# ==============================================================================
+# SIMULATION
+# ==============================================================================
+
+def _score(order, table):
+    """Points per driver from finishing orders (driver indices, best first) along the last axis."""
+    points = np.empty(order.shape, dtype=np.float32)
+    np.put_along_axis(points, order, np.broadcast_to(table, order.shape), axis=-1)
+    return points
+
+
+def _simulate_chunk(args):
+    """Points scored over the remaining events by every driver, shape (n_seasons, n_drivers)."""
+    mean, sd, races, sprints, fastest_lap, n_seasons, seed = args
+    rng = np.random.default_rng(seed)
+    n = len(mean)
+    total = np.zeros((n_seasons, n), dtype=np.float32)
+
+    if races > 0:
+        perf = mean + sd * rng.standard_normal((n_seasons, races, n), dtype=np.float32)
+        order = np.argsort(perf, axis=-1)
+        points = _score(order, _points_table(RACE_POINTS, n))
+        if fastest_lap:
+            # Fastest lap: best of an independent pace draw, scores only inside the top ten
+            pace = mean + sd * rng.standard_normal((n_seasons, races, n), dtype=np.float32)
+            fl = np.argmin(pace, axis=-1)[..., None]
+            in_points = np.take_along_axis(points, fl, axis=-1) > 0
+            np.put_along_axis(points, fl, np.take_along_axis(points, fl, axis=-1) + FASTEST_LAP_POINT * in_points,
+                              axis=-1)
+        total += points.sum(axis=1)
+
+    if sprints > 0:
+        perf = mean + sd * rng.standard_normal((n_seasons, sprints, n), dtype=np.float32)
+        total += _score(np.argsort(perf, axis=-1), _points_table(SPRINT_POINTS, n)).sum(axis=1)
+    return total
+
+
+def simulate_points(mean, sd, races, sprints=0, fastest_lap=False, n_seasons=DEFAULT_SEASONS,
+                    seed=None, processes=1, chunk=CHUNK_SEASONS):
+    """
+    Points gained over `races` races and `sprints` sprints in `n_seasons`
+    simulated seasons, shape (n_seasons, n_drivers). Chunks run in
+    `processes` worker processes when processes > 1.
+    """
+    mean = np.asarray(mean, dtype=np.float32)
+    sd = np.asarray(sd, dtype=np.float32)
+    sizes = [min(chunk, n_seasons - start) for start in range(0, n_seasons, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(mean, sd, races, sprints, fastest_lap, size, s) for size, s in zip(sizes, seeds)]
+    if processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(job) for job in jobs]
+    return np.concatenate(parts)
+
+
+def max_points(races, sprints=0, fastest_lap=False):
+    """Most points a driver can still score."""
+    return races * (RACE_POINTS[0] + (FASTEST_LAP_POINT if fastest_lap else 0)) + sprints * SPRINT_POINTS[0]
+
+
+def simulate_championship(standings, races, sprints=0, results=None, completed_races=None, fastest_lap=False,
+                          n_seasons=DEFAULT_SEASONS, seed=None, processes=1):
+    """
+    Title odds for the full grid from current standings (Driver, Points).
+
+    Returns one row per driver: Driver, Points, Title% (share of simulated
+    seasons won, ties split), Expected points, P5/P50/P95 final points and
+    Max (everything still available), sorted by title chance.
+    """
+    drivers = standings['Driver'].tolist()
+    current = standings['Points'].to_numpy(dtype=np.float32)
+    mean, sd = driver_form(drivers, current, completed_races or 1, results)
+    final = current + simulate_points(mean, sd, races, sprints, fastest_lap, n_seasons, seed, processes)
+
+    best = final.max(axis=1, keepdims=True)
+    leaders = final == best
+    title = (leaders / leaders.sum(axis=1, keepdims=True)).mean(axis=0)
+    p5, p50, p95 = np.percentile(final, [5, 50, 95], axis=0)
+    table = pd.DataFrame({
+        'Driver': drivers,
+        'Points': current,
+        'Title%': 100 * title,
+        'Expected': final.mean(axis=0),
+        'P5': p5,
+        'P50': p50,
+        'P95': p95,
+        'Max': current + max_points(races, sprints, fastest_lap),
+    })
+    return table.sort_values(['Title%', 'Expected'], ascending=False).reset_index(drop=True)
+
+
+# ==============================================================================
+# CLINCH / ELIMINATION (EXACT)
+# ==============================================================================
+
+GRID_SIZE = 20
+
+
+def season_events(rounds):
+    """[(round, 'sprint' | 'race'), ...] for [(round, has_sprint), ...], in running order."""
+    events = []
+    for round_number, has_sprint in rounds:
+        if has_sprint:
+            events.append((round_number, 'sprint'))
+        events.append((round_number, 'race'))
+    return events
+
+
+def _event_points(kind, n_drivers=GRID_SIZE):
+    return _points_table(SPRINT_POINTS if kind == 'sprint' else RACE_POINTS, n_drivers).astype(float)
+
+
+def _relaxed(events, caps):
+    """
+    Polynomial relaxation of the assignment: slots may be split, but no k
+    drivers take more of an event than its k largest slots. So for every k
+    the k drivers with the least room must absorb what the others cannot.
+    """
+    n = len(caps)
+    top = [0] * (n + 1)    # top[k]: most points any k drivers can take
+    for ev in events:
+        run = 0
+        for k in range(1, n + 1):
+            run += ev[k - 1] if k <= len(ev) else 0
+            top[k] += run
+    room = 0
+    for k, cap in enumerate(sorted(caps), 1):
+        room += cap
+        if room < top[n] - top[n - k]:
+            return False
+    return True
+
+
+def _reachable(events):
+    """
+    Bitmask of the totals one driver can collect from `events` with at most
+    one slot per event (bit p set: p points reachable).
+    """
+    mask = 1
+    for ev in events:
+        grown = mask
+        for slot in set(ev):
+            grown |= mask << int(slot)
+        mask = grown
+    return mask
+
+
+def _usable(cap, mask):
+    """Most points a driver with `cap` room can really collect (`mask` from _reachable)."""
+    return (mask & ((2 << int(cap)) - 1)).bit_length() - 1
+
+
+def _greedy(events, caps):
+    """
+    Hand out all slots, largest first, each to the driver with the most room
+    left who has nothing from that event yet. True if nobody passes their cap.
+    """
+    caps = list(caps)
+    taken = [set() for _ in events]
+    for slot, e in sorted(((slot, e) for e, ev in enumerate(events) for slot in ev), reverse=True):
+        free = [j for j in range(len(caps)) if j not in taken[e]]
+        if not free:
+            return False
+        j = max(free, key=caps.__getitem__)
+        caps[j] -= slot
+        if caps[j] < 0:
+            return False
+        taken[e].add(j)
+    return True
+
+
+def _takes(events, lo, hi):
+    """
+    Every way one driver can take at most one slot per event for a total in
+    [lo, hi]: yields (picks, total) with picks[e] the slot index in events[e]
+    (None for nothing). Equal slots of an event are tried once.
+    """
+    most = [0] * (len(events) + 1)
+    for e in range(len(events) - 1, -1, -1):
+        most[e] = most[e + 1] + (events[e][0] if events[e] else 0)
+    picks = [None] * len(events)
+
+    def walk(e, total):
+        if total + most[e] < lo:
+            return
+        if e == len(events):
+            yield list(picks), total
+            return
+        tried = set()
+        for k, slot in enumerate(events[e]):
+            if slot in tried or total + slot > hi:
+                continue
+            tried.add(slot)
+            picks[e] = k
+            yield from walk(e + 1, total + slot)
+            picks[e] = None
+        yield from walk(e + 1, total)
+
+    return walk(0, 0)
+
+
+def _assign(events, caps):
+    """
+    Exact search: can the slots of every event (whole points, largest first)
+    go to distinct drivers per event without any driver passing its cap?
+
+    Drivers are decided one at a time, least room first. At every step the
+    caps are cut to what a driver can actually collect (a sum of at most one
+    slot per event), a polynomial relaxation rules out most dead ends (slots
+    may be split, but no k drivers take more of an event than its k largest
+    slots, so the k drivers with the least room must absorb what the others
+    cannot) and a greedy assignment settles most feasible states. All slots
+    must be taken, so the drivers together can leave only sum(caps) -
+    sum(slots) of their room unused, which leaves each of them few choices.
+    States are memoised on the remaining slots.
+    """
+    caps = sorted(caps)
+    seen = set()
+
+    def fits(j, events):
+        events = [ev for ev in events if ev]
+        if not events:
+            return True
+        key = (j, tuple(sorted(tuple(ev) for ev in events)))
+        if key in seen:
+            return False
+        seen.add(key)
+        reach = _reachable(events)
+        left = [_usable(cap, reach) for cap in caps[j:]]
+        if any(len(ev) > len(left) or ev[0] > left[-1] for ev in events) or not _relaxed(events, left):
+            return False
+        if _greedy(events, left):
+            return True
+        slack = sum(left) - sum(sum(ev) for ev in events)
+        for picks, total in _takes(events, left[0] - slack, left[0]):
+            rest = [[slot for k, slot in enumerate(ev) if k != pick] for ev, pick in zip(events, picks)]
+            if fits(j + 1, rest):
+                return True
+        return False
+
+    return fits(0, [list(ev) for ev in events])
+
+
+def rivals_can_stay_below(capacity, events):
+    """
+    Whether the points slots of the remaining events (arrays of positive
+    points the other drivers must take, one slot per driver per event) can
+    be handed out so that no driver j gains more than capacity[j].
+    """
+    capacity = np.asarray(capacity, dtype=float)
+    if (capacity < 0).any():
+        return False
+    events = [np.sort(ev)[::-1] for ev in events if len(ev)]
+    # Drivers who could take the biggest slot of every event never bind:
+    # give them the biggest slots and only search the rest
+    free = capacity >= sum(ev[0] for ev in events)
+    n_free = int(free.sum())
+    rest = [ev[n_free:].tolist() for ev in events if len(ev) > n_free]
+    caps = capacity[~free].tolist()
+    if any(len(ev) > len(caps) for ev in rest):
+        return False
+    return _assign(rest, caps)
+
+
+def can_still_win(points, i, events, fastest_lap=False, finish=None):
+    """
+    Exact check whether driver i can still finish level or ahead of every
+    rival. i takes P1 (and the fastest lap) in every event except those in
+    `finish` ({event index: position}); the other drivers' slots must fit
+    under i's total. Level on points counts as still possible (countback).
+    Standings shorter than the grid are filled with pointless cars.
+    """
+    finish = finish or {}
+    points = np.asarray(points, dtype=float)
+    points = np.concatenate([points, np.zeros(max(GRID_SIZE - len(points), 0))])
+    total = points[i]
+    slots = []
+    for e, (_, kind) in enumerate(events):
+        table = _event_points(kind)
+        pos = finish.get(e, 1) - 1
+        total += table[pos]
+        others = np.delete(table, pos)
+        # i sets the fastest lap; outside the top 10 it scores nothing for anyone
+        if fastest_lap and kind == 'race' and table[pos] > 0:
+            total += FASTEST_LAP_POINT
+        slots.append(others[others > 0])
+    return rivals_can_stay_below(total - np.delete(points, i), slots)
+
+
+def title_scenarios(standings, rounds, fastest_lap=False):
+    """
+    Exact title maths for the full grid from standings (Driver, Points) and
+    the remaining [(round, has_sprint), ...]:
+    Status (Champion / Contender / Eliminated), Max points, and per round
+    the worst race finish that keeps the driver's title hopes alive if
+    they win every other event ('Any' if no result can eliminate them).
+    """
+    drivers = standings['Driver'].tolist()
+    points = standings['Points'].to_numpy(dtype=float)
+    events = season_events(rounds)
+    alive = np.array([can_still_win(points, i, events, fastest_lap) for i in range(len(drivers))])
+
+    table = pd.DataFrame({
+        'Driver': drivers,
+        'Points': points,
+        'Max': points + max_points(len(rounds), sum(s for _, s in rounds), fastest_lap),
+    })
+    table['Status'] = np.where(alive, 'Contender', 'Eliminated')
+    if alive.sum() == 1:
+        table.loc[alive, 'Status'] = 'Champion'
+
+    race_index = {r: e for e, (r, kind) in enumerate(events) if kind == 'race'}
+    for round_number, _ in rounds:
+        needs = []
+        for i in range(len(drivers)):
+            if not alive[i] or alive.sum() == 1:
+                needs.append('-')
+                continue
+            # Worst finish that still keeps i alive (monotone in position)
+            lo, hi = 1, GRID_SIZE
+            if can_still_win(points, i, events, fastest_lap, {race_index[round_number]: GRID_SIZE}):
+                lo = GRID_SIZE
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if can_still_win(points, i, events, fastest_lap, {race_index[round_number]: mid}):
+                    lo = mid
+                else:
+                    hi = mid - 1
+            needs.append('Any' if lo == GRID_SIZE else f"P{lo}")
+        table[f"R{round_number}"] = needs
+    return table
@@ -0,0 +1,484 @@
+"""
+Vectorized telemetry engines.
+
+These work on the per-car arrays of a StoredSession: each car's data is
+read once and laps are located with np.searchsorted on SessionTime, so no
+per-lap get_telemetry() round trips are needed.
+"""
+import numpy as np
+import pandas as pd
+
+from race_analytics import session_metrics
+from session_store import pick_fastest
+
+LAP_SPEED_COLUMNS = ['Driver', 'LapNumber', 'MaxSpeed', 'AvgSpeed', 'Samples']
+
+
+def _ns(values):
+    """Timedelta column -> int64 nanoseconds (NaT becomes int64 min)."""
+    return np.asarray(values, dtype='timedelta64[ns]').view('i8')
+
+
+def lap_bounds(car_time_ns, lap_start, lap_end):
+    """[start, stop) sample index of every lap inside one car's data."""
+    start_ns = _ns(lap_start)
+    end_ns = _ns(lap_end)
+    starts = np.searchsorted(car_time_ns, start_ns, side='left')
+    stops = np.searchsorted(car_time_ns, end_ns, side='left')
+    valid = (start_ns != np.iinfo(np.int64).min) & (end_ns != np.iinfo(np.int64).min) & (stops > starts)
+    return starts, stops, valid
+
+
+def segment_reduce(values, starts, stops):
+    """Max, sum and count of values[start:stop] for every segment in one reduceat pass."""
+    padded = np.append(values, np.nan)
+    bounds = np.column_stack([starts, stops]).ravel()
+    seg_max = np.maximum.reduceat(padded, bounds)[::2]
+    seg_sum = np.add.reduceat(padded, bounds)[::2]
+    return seg_max, seg_sum, stops - starts
+
+
+def compute_lap_speeds(session):
+    """Max and average speed of every lap of every driver with telemetry."""
+    laps = session.get_laps(['LapNumber', 'LapStartTime', 'Time'])
+    frames = []
+
+    for driver, rows in session.lap_index.slices.items():
+        d_laps = laps.iloc[rows]
+        car = session.car_data(driver)
+        if car is None or len(car) == 0:
+            continue
+        starts, stops, valid = lap_bounds(_ns(car['SessionTime']), d_laps['LapStartTime'], d_laps['Time'])
+        if not valid.any():
+            continue
+        speed = car['Speed'].to_numpy(dtype=float)
+        seg_max, seg_sum, counts = segment_reduce(speed, starts[valid], stops[valid])
+        frames.append(pd.DataFrame({
+            'Driver': driver,
+            'LapNumber': d_laps['LapNumber'].to_numpy()[valid],
+            'MaxSpeed': seg_max,
+            'AvgSpeed': seg_sum / counts,
+            'Samples': counts,
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=LAP_SPEED_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[LAP_SPEED_COLUMNS]
+
+
+def lap_speeds(session):
+    """Per-lap speed table, cached with the session in the store."""
+    return session.derived("lap_speeds", compute_lap_speeds)
+
+
+def speed_trap_summary(lap_speed_df):
+    """Per driver: top speed of the session and the mean of per-lap maxima."""
+    summary = lap_speed_df.groupby('Driver', observed=True).agg(
+        max=('MaxSpeed', 'max'),
+        avg_max=('MaxSpeed', 'mean'),
+        laps=('MaxSpeed', 'size'),
+    )
+    return summary.sort_values('max', ascending=False)
+
+
+# ==============================================================================
+# DISTANCE-ALIGNED RESAMPLING
+# ==============================================================================
+
+CONTINUOUS_CHANNELS = ['Time', 'Speed', 'Throttle', 'RPM', 'X', 'Y']
+DISCRETE_CHANNELS = ['nGear', 'Brake', 'DRS']
+
+
+def lap_arrays(session, driver, lap_number):
+    """Raw telemetry of one lap as float arrays (Time in seconds from lap start)."""
+    tel = session.lap_telemetry(driver, lap_number)
+    if tel is None or len(tel) < 2:
+        return None
+    arrays = {'Distance': tel['Distance'].to_numpy(dtype=float),
+              'Time': tel['Time'].dt.total_seconds().to_numpy()}
+    for channel in CONTINUOUS_CHANNELS[1:] + DISCRETE_CHANNELS:
+        if channel in tel.columns:
+            arrays[channel] = tel[channel].to_numpy(dtype=float)
+    return arrays
+
+
+class AlignedLaps:
+    """
+    Any number of laps resampled onto one shared distance grid.
+    Every channel is a (n_laps, n_points) float32 array, so overlays,
+    deltas and mini-sector splits are plain NumPy operations.
+    """
+
+    def __init__(self, labels, distance, channels):
+        self.labels = labels
+        self.distance = distance
+        self.channels = channels
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, channel):
+        return self.channels[channel]
+
+    def frame(self, i):
+        """One lap as a DataFrame (Distance + every resampled channel)."""
+        data = {'Distance': self.distance}
+        data.update({name: values[i] for name, values in self.channels.items()})
+        return pd.DataFrame(data)
+
+
+def resample_laps(laps, resolution=10.0, labels=None, max_distance=None):
+    """
+    Interpolate raw lap arrays (see lap_arrays) onto a common distance grid
+    of `resolution` metres. The grid ends at the shortest lap so every
+    point is covered by every lap. Continuous channels are linearly
+    interpolated, discrete ones (gear, brake, DRS) hold the previous sample.
+    """
+    laps = [lap for lap in laps if lap is not None]
+    if not laps:
+        return None
+    end = min(lap['Distance'][-1] for lap in laps)
+    if max_distance is not None:
+        end = min(end, max_distance)
+    grid = np.arange(0.0, end, resolution)
+
+    names = [c for c in CONTINUOUS_CHANNELS + DISCRETE_CHANNELS if all(c in lap for lap in laps)]
+    channels = {name: np.empty((len(laps), len(grid)), dtype=np.float32) for name in names}
+    for i, lap in enumerate(laps):
+        dist = lap['Distance']
+        prev = np.clip(np.searchsorted(dist, grid, side='right') - 1, 0, len(dist) - 1)
+        for name in names:
+            if name in DISCRETE_CHANNELS:
+                channels[name][i] = lap[name][prev]
+            else:
+                channels[name][i] = np.interp(grid, dist, lap[name])
+
+    return AlignedLaps(labels or list(range(len(laps))), grid.astype(np.float32), channels)
+
+
+def align_laps(session, selection, resolution=10.0):
+    """Resample [(driver, lap_number), ...] of a session onto one distance grid."""
+    arrays = [lap_arrays(session, driver, lap) for driver, lap in selection]
+    labels = [sel for sel, arr in zip(selection, arrays) if arr is not None]
+    return resample_laps(arrays, resolution=resolution, labels=labels)
+
+
+# ==============================================================================
+# DELTA OVER DISTANCE
+# ==============================================================================
+
+def elapsed_time(aligned):
+    """
+    Time (s) since lap start at every grid point, shape (n_laps, n_points).
+    Uses the interpolated lap clock; without it, integrates dt = ds / v.
+    """
+    if 'Time' in aligned.channels:
+        return aligned['Time'].astype(np.float64)
+    speed_ms = np.maximum(aligned['Speed'].astype(np.float64), 1.0) / 3.6
+    ds = np.diff(aligned.distance.astype(np.float64), prepend=0.0)
+    mean_speed = np.concatenate([speed_ms[:, :1], (speed_ms[:, 1:] + speed_ms[:, :-1]) / 2], axis=1)
+    return np.cumsum(ds / mean_speed, axis=1)
+
+
+def delta_time(aligned, references=(0,)):
+    """
+    Running time delta of every lap against each reference lap.
+    Returns shape (n_references, n_laps, n_points); positive = slower than
+    the reference at that point of the lap.
+    """
+    times = elapsed_time(aligned)
+    refs = np.atleast_1d(np.asarray(references, dtype=int))
+    return times[np.newaxis, :, :] - times[refs][:, np.newaxis, :]
+
+
+def fastest_lap_selection(fastest_laps):
+    """[(driver, lap_number), ...] from the fastest_laps metrics table, quickest first."""
+    return list(zip(fastest_laps['Driver'], fastest_laps['LapNumber']))
+
+
+FIELD_DELTA_COLUMNS = ['Driver', 'LapNumber', 'Distance', 'Delta']
+
+
+def compute_field_delta(session, resolution=10.0):
+    """
+    Delta of every driver's fastest lap to the session's fastest lap, one
+    row per (driver, grid point), quickest driver first.
+    """
+    selection = fastest_lap_selection(session_metrics(session)['fastest_laps'])
+    aligned = align_laps(session, selection, resolution=resolution)
+    if aligned is None:
+        return pd.DataFrame(columns=FIELD_DELTA_COLUMNS)
+    n_points = len(aligned.distance)
+    return pd.DataFrame({
+        'Driver': np.repeat([d for d, _ in aligned.labels], n_points),
+        'LapNumber': np.repeat([lap for _, lap in aligned.labels], n_points),
+        'Distance': np.tile(aligned.distance, len(aligned)),
+        'Delta': delta_time(aligned, references=[0])[0].astype(np.float32).ravel(),
+    })[FIELD_DELTA_COLUMNS]
+
+
+def session_field_delta(session, resolution=10.0):
+    """Full grid delta table at `resolution` metres, cached with the session."""
+    return session.derived(f"field_delta_{resolution:g}", lambda s: compute_field_delta(s, resolution))
+
+
+# ==============================================================================
+# CORNER DETECTION
+# ==============================================================================
+
+CORNER_COLUMNS = ['Corner', 'Distance', 'X', 'Y', 'Curvature', 'MinSpeed', 'Gear']
+
+
+def _smooth(values, window):
+    """Centered moving average with edge padding (same length as the input)."""
+    if window < 2:
+        return values
+    padded = np.pad(values, window // 2, mode='edge')
+    kernel = np.ones(window) / window
+    return np.convolve(padded, kernel, mode='valid')[:len(values)]
+
+
+def curvature(distance, x, y, step=5.0, smoothing_m=40.0):
+    """
+    Absolute path curvature (1/m) on a uniform `step`-metre distance grid.
+    X/Y are smoothed before differentiating and the heading is unwrapped,
+    so the +-pi wrap of arctan2 does not show up as a corner.
+    Returns (grid, curvature).
+    """
+    grid = np.arange(distance[0], distance[-1], step)
+    window = max(1, int(round(smoothing_m / step)))
+    gx = _smooth(np.interp(grid, distance, x), window)
+    gy = _smooth(np.interp(grid, distance, y), window)
+    heading = np.unwrap(np.arctan2(np.gradient(gy), np.gradient(gx)))
+    return grid, np.abs(_smooth(np.gradient(heading, step), window))
+
+
+def detect_corners(distance, x, y, speed=None, gear=None, step=5.0, smoothing_m=40.0,
+                   min_separation_m=60.0, min_curvature=1 / 400):
+    """
+    Corners of one lap as curvature peaks at least `min_separation_m` apart
+    and tighter than a 1 / `min_curvature` metre radius. The apex is the
+    peak; MinSpeed is the lowest speed within half a separation of it and
+    Gear the gear at the apex. All steps are array operations.
+    """
+    from scipy.signal import find_peaks
+
+    distance = np.asarray(distance, dtype=float)
+    if len(distance) < 10:
+        return pd.DataFrame(columns=CORNER_COLUMNS)
+    grid, curv = curvature(distance, np.asarray(x, dtype=float), np.asarray(y, dtype=float), step, smoothing_m)
+    peaks, _ = find_peaks(curv, height=min_curvature, distance=max(1, int(min_separation_m / step)),
+                          prominence=min_curvature / 2)
+    apex = grid[peaks]
+    at_apex = np.clip(np.searchsorted(distance, apex), 0, len(distance) - 1)
+
+    corners = pd.DataFrame({
+        'Corner': np.arange(1, len(peaks) + 1),
+        'Distance': apex,
+        'X': np.asarray(x, dtype=float)[at_apex],
+        'Y': np.asarray(y, dtype=float)[at_apex],
+        'Curvature': curv[peaks],
+        'MinSpeed': np.nan,
+        'Gear': np.nan,
+    })
+    if speed is not None and len(peaks) > 0:
+        starts = np.searchsorted(distance, apex - min_separation_m / 2, side='left')
+        stops = np.maximum(np.searchsorted(distance, apex + min_separation_m / 2, side='right'), starts + 1)
+        padded = np.append(np.asarray(speed, dtype=float), np.nan)
+        corners['MinSpeed'] = np.minimum.reduceat(padded, np.column_stack([starts, stops]).ravel())[::2]
+    if gear is not None and len(peaks) > 0:
+        corners['Gear'] = np.asarray(gear, dtype=float)[at_apex]
+    return corners[CORNER_COLUMNS]
+
+
+def lap_corners(session, driver, lap_number):
+    """detect_corners() on one lap of a session."""
+    lap = lap_arrays(session, driver, lap_number)
+    if lap is None or 'X' not in lap:
+        return pd.DataFrame(columns=CORNER_COLUMNS)
+    return detect_corners(lap['Distance'], lap['X'], lap['Y'], lap.get('Speed'), lap.get('nGear'))
+
+
+def compute_corners(session):
+    """Corners of the circuit, detected on the session's fastest lap."""
+    ref = pick_fastest(session.get_laps(['Driver', 'LapNumber', 'LapTime', 'IsPersonalBest']))
+    if ref is None:
+        return pd.DataFrame(columns=CORNER_COLUMNS)
+    return lap_corners(session, ref['Driver'], ref['LapNumber'])
+
+
+def session_corners(session):
+    """Per-corner table (apex distance, min speed, gear), cached with the session."""
+    return session.derived("corners", compute_corners)
+
+
+# ==============================================================================
+# CORNER ANALYTICS (FULL GRID)
+# ==============================================================================
+
+CORNER_STAT_COLUMNS = ['Driver', 'LapNumber', 'Corner', 'EntrySpeed', 'MinSpeed', 'MinSpeedDistance',
+                       'BrakeStart', 'ThrottlePickup']
+CORNER_RESOLUTION_M = 5.0
+# Throttle (%) above which the driver counts as back on the power after the apex
+THROTTLE_PICKUP = 20.0
+
+
+def corner_windows(apex, grid):
+    """
+    Grid index windows around every apex: each corner reaches from the
+    midpoint with the previous apex to the midpoint with the next one.
+    Returns (starts, apex_idx, stops) with stops exclusive.
+    """
+    bounds = np.concatenate([[grid[0]], (apex[1:] + apex[:-1]) / 2, [grid[-1] + 1]])
+    starts = np.searchsorted(grid, bounds[:-1], side='left')
+    stops = np.maximum(np.searchsorted(grid, bounds[1:], side='left'), starts + 1)
+    apex_idx = np.clip(np.searchsorted(grid, apex), starts, stops - 1)
+    return starts, apex_idx, stops
+
+
+def corner_stats(aligned, apex):
+    """
+    Per-lap, per-corner entry speed, minimum speed, braking start and
+    throttle pickup from distance-aligned laps.
+
+    All laps and corners are handled at once: every corner window is padded
+    to the same width, giving (n_laps, n_corners, width) arrays. Entry speed
+    is the top speed between the window start and the apex, braking start
+    the first braking point in that stretch, throttle pickup the first point
+    at or after the minimum speed with throttle >= THROTTLE_PICKUP.
+    Returns a dict of (n_laps, n_corners) arrays (distances in metres).
+    """
+    grid = aligned.distance.astype(float)
+    starts, apex_idx, stops = corner_windows(np.asarray(apex, dtype=float), grid)
+    width = int((stops - starts).max())
+    cols = starts[:, None] + np.arange(width)[None, :]
+    valid = cols < stops[:, None]
+    approach = valid & (cols <= apex_idx[:, None])
+    cols = np.minimum(cols, len(grid) - 1)
+    dist = grid[cols]
+
+    speed = aligned['Speed'][:, cols].astype(float)
+    entry = np.where(approach, speed, -np.inf).max(axis=2)
+    low = np.where(valid, speed, np.inf)
+    min_pos = low.argmin(axis=2)
+    stats = {
+        'EntrySpeed': entry,
+        'MinSpeed': low.min(axis=2),
+        'MinSpeedDistance': dist[np.arange(len(cols))[None, :], min_pos],
+    }
+
+    def first(mask):
+        """Distance of the first True along each window (NaN if none)."""
+        hit = mask.any(axis=2)
+        return np.where(hit, dist[np.arange(len(cols))[None, :], mask.argmax(axis=2)], np.nan)
+
+    if 'Brake' in aligned.channels:
+        stats['BrakeStart'] = first(approach[None] & (aligned['Brake'][:, cols] > 0))
+    else:
+        stats['BrakeStart'] = np.full(entry.shape, np.nan)
+    if 'Throttle' in aligned.channels:
+        after_min = np.arange(width)[None, None, :] >= min_pos[:, :, None]
+        stats['ThrottlePickup'] = first(valid[None] & after_min & (aligned['Throttle'][:, cols] >= THROTTLE_PICKUP))
+    else:
+        stats['ThrottlePickup'] = np.full(entry.shape, np.nan)
+    return stats
+
+
+def compute_corner_stats(session):
+    """Corner stats of every driver's fastest lap, one row per (driver, corner)."""
+    corners = session_corners(session)
+    selection = fastest_lap_selection(session_metrics(session)['fastest_laps'])
+    aligned = align_laps(session, selection, resolution=CORNER_RESOLUTION_M) if len(corners) else None
+    if aligned is None:
+        return pd.DataFrame(columns=CORNER_STAT_COLUMNS)
+
+    apex = corners['Distance'].to_numpy(dtype=float)
+    keep = apex < aligned.distance[-1]
+    stats = corner_stats(aligned, apex[keep])
+    n_laps, n_corners = stats['MinSpeed'].shape
+    table = pd.DataFrame({
+        'Driver': np.repeat([d for d, _ in aligned.labels], n_corners),
+        'LapNumber': np.repeat([lap for _, lap in aligned.labels], n_corners),
+        'Corner': np.tile(corners['Corner'].to_numpy()[keep], n_laps),
+    })
+    for name in CORNER_STAT_COLUMNS[3:]:
+        table[name] = stats[name].ravel()
+    return table[CORNER_STAT_COLUMNS]
+
+
+def session_corner_stats(session):
+    """Grid x corners stats table, cached with the session."""
+    return session.derived("corner_stats", compute_corner_stats)
+
+
+def corner_matrix(table, metric):
+    """One metric of the corner stats as a drivers x corners matrix."""
+    return table.pivot(index='Driver', columns='Corner', values=metric)
+
+
+# ==============================================================================
+# MINI-SECTORS
+# ==============================================================================
+
+MINISECTOR_COLUMNS = ['Driver', 'LapNumber', 'Segment', 'Start', 'End', 'Time']
+DEFAULT_MINISECTORS = 25
+
+
+def minisector_times(aligned, n_segments=DEFAULT_MINISECTORS):
+    """
+    Time spent in each of `n_segments` equal-distance segments, for every
+    aligned lap at once. Returns (edges, times) with times shaped
+    (n_laps, n_segments).
+    """
+    grid = aligned.distance.astype(float)
+    edges = np.linspace(grid[0], grid[-1], n_segments + 1)
+    # Linear interpolation of every lap's elapsed time at the segment edges
+    i1 = np.clip(np.searchsorted(grid, edges, side='right'), 1, len(grid) - 1)
+    i0 = i1 - 1
+    frac = (edges - grid[i0]) / (grid[i1] - grid[i0])
+    elapsed = elapsed_time(aligned)
+    at_edges = elapsed[:, i0] + frac * (elapsed[:, i1] - elapsed[:, i0])
+    return edges, np.diff(at_edges, axis=1)
+
+
+def compute_minisectors(session, n_segments=DEFAULT_MINISECTORS):
+    """Mini-sector times of every driver's fastest lap, one row per (driver, segment)."""
+    selection = fastest_lap_selection(session_metrics(session)['fastest_laps'])
+    aligned = align_laps(session, selection, resolution=CORNER_RESOLUTION_M)
+    if aligned is None:
+        return pd.DataFrame(columns=MINISECTOR_COLUMNS)
+    edges, times = minisector_times(aligned, n_segments)
+    n_laps = len(aligned)
+    return pd.DataFrame({
+        'Driver': np.repeat([d for d, _ in aligned.labels], n_segments),
+        'LapNumber': np.repeat([lap for _, lap in aligned.labels], n_segments),
+        'Segment': np.tile(np.arange(1, n_segments + 1), n_laps),
+        'Start': np.tile(edges[:-1], n_laps),
+        'End': np.tile(edges[1:], n_laps),
+        'Time': times.ravel(),
+    })[MINISECTOR_COLUMNS]
+
+
+def session_minisectors(session, n_segments=DEFAULT_MINISECTORS):
+    """Mini-sector table for `n_segments` segments, cached with the session."""
+    return session.derived(f"minisectors_{n_segments}", lambda s: compute_minisectors(s, n_segments))
+
+
+def minisector_dominance(table, groups=None, drivers=None):
+    """
+    Fastest entry per segment: Segment, Start, End, Leader, Time, Gap (to
+    the second best). `groups` maps driver -> group (e.g. team) to rank
+    groups by their best driver; `drivers` restricts the comparison.
+    """
+    if drivers is not None:
+        table = table[table['Driver'].isin(drivers)]
+    table = table.dropna(subset=['Time'])
+    leader = table['Driver'] if groups is None else table['Driver'].map(groups)
+    best = table.groupby(['Segment', leader.rename('Leader')], sort=False, observed=True).agg(
+        Start=('Start', 'first'), End=('End', 'first'), Time=('Time', 'min')).reset_index()
+    best = best.sort_values(['Segment', 'Time'], kind='stable')
+    rank = best.groupby('Segment', sort=False, observed=True).cumcount()
+    leaders = best[rank == 0].set_index('Segment')
+    second = best[rank == 1].set_index('Segment')['Time']
+    leaders['Gap'] = second.reindex(leaders.index) - leaders['Time']
+    return leaders.reset_index()[['Segment', 'Start', 'End', 'Leader', 'Time', 'Gap']]
@@ -0,0 +1,204 @@
+"""
+Ergast store against a local stub server (no network needed).
+
+A small HTTP server answers the Ergast endpoints championship.py uses
+with canned JSON for a three-round season (round 2 is a sprint weekend),
+through the ERGAST_BASE_URL override. Run with:
+
+    python -m pytest test_championship.py
+"""
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import championship
+
+YEAR = 2024
+ROUNDS = [(1, "Bahrain Grand Prix", "2024-03-02", False),
+          (2, "Chinese Grand Prix", "2024-03-24", True),
+          (3, "Japanese Grand Prix", "2024-04-07", False)]
+DRIVERS = [("max_verstappen", "Max", "Verstappen", "VER", "red_bull", "Red Bull"),
+           ("norris", "Lando", "Norris", "NOR", "mclaren", "McLaren"),
+           ("leclerc", "Charles", "Leclerc", "LEC", "ferrari", "Ferrari")]
+RACE_POINTS = [25, 18, 15]
+SPRINT_POINTS = [8, 7, 6]
+
+
+def _driver(driver_id, given, family, code):
+    return {'driverId': driver_id, 'code': code, 'givenName': given, 'familyName': family,
+            'dateOfBirth': "1997-01-01", 'nationality': "Dutch"}
+
+
+def _constructor(constructor_id, name):
+    return {'constructorId': constructor_id, 'name': name, 'nationality': "Austrian"}
+
+
+def _race(round_number, name, date):
+    return {'season': str(YEAR), 'round': str(round_number), 'raceName': name, 'date': date, 'time': "15:00:00Z",
+            'Circuit': {'circuitId': f"c{round_number}", 'circuitName': name,
+                        'Location': {'lat': "0", 'long': "0", 'locality': name.split()[0], 'country': "X"}}}
+
+
+def _results(points):
+    rows = []
+    for position, (driver_id, given, family, code, team_id, team) in enumerate(DRIVERS):
+        rows.append({'number': str(position + 1), 'position': str(position + 1), 'positionText': str(position + 1),
+                     'points': str(points[position]), 'Driver': _driver(driver_id, given, family, code),
+                     'Constructor': _constructor(team_id, team), 'grid': str(position + 1), 'laps': "57",
+                     'status': "Finished"})
+    return rows
+
+
+def _mrdata(table, body):
+    return {'MRData': {'xmlns': "", 'series': "f1", 'url': "", 'limit': "100", 'offset': "0",
+                       'total': str(len(next(iter(body.values())))), table: dict(body, season=str(YEAR))}}
+
+
+def ergast_payload(path):
+    """Canned Ergast JSON for `path` (None for an unknown endpoint)."""
+    parts = path.strip("/").removesuffix(".json").split("/")
+    if parts[0] != str(YEAR):
+        return None
+    round_number = int(parts[1]) if len(parts) == 3 else None
+    endpoint = parts[-1]
+    rounds = [r for r in ROUNDS if round_number in (None, r[0])]
+
+    if endpoint == "races":
+        races = []
+        for number, name, date, sprint in ROUNDS:
+            race = _race(number, name, date)
+            if sprint:
+                race['Sprint'] = {'date': date, 'time': "11:00:00Z"}
+            races.append(race)
+        return _mrdata('RaceTable', {'Races': races})
+    if endpoint == "results":
+        return _mrdata('RaceTable', {'Races': [dict(_race(n, name, d), Results=_results(RACE_POINTS))
+                                               for n, name, d, _ in rounds]})
+    if endpoint == "sprint":
+        return _mrdata('RaceTable', {'Races': [dict(_race(n, name, d), SprintResults=_results(SPRINT_POINTS))
+                                               for n, name, d, sprint in rounds if sprint]})
+    if endpoint == "driverStandings":
+        standings = [{'position': str(i + 1), 'positionText': str(i + 1), 'points': str(p), 'wins': "1",
+                      'Driver': _driver(*d[:4]), 'Constructors': [_constructor(*d[4:])]}
+                     for i, (d, p) in enumerate(zip(DRIVERS, [83, 61, 51]))]
+        return _mrdata('StandingsTable', {'StandingsLists': [{'season': str(YEAR), 'round': "3",
+                                                               'DriverStandings': standings}]})
+    return None
+
+
+class StubErgast(ThreadingHTTPServer):
+    """Serves ergast_payload(); paths in `failing` answer 503 until they are removed."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests = []
+        self.failing = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/ergast/f1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0].removeprefix("/ergast/f1")
+        self.server.requests.append(path)
+        payload = None if path in self.server.failing else ergast_payload(path)
+        if payload is None:
+            self.send_response(503 if path in self.server.failing else 404)
+            self.end_headers()
+            return
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timestamp(date):
+    return pd.Timestamp(date).timestamp()
+
+
+class ErgastStoreTest(unittest.TestCase):
+    def setUp(self):
+        import fastf1
+        from fastf1.ergast import interface
+
+        self.server = StubErgast()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.root = tempfile.mkdtemp()
+        self.saved = (championship.ERGAST_BASE_URL, championship._client, championship._limiter,
+                      championship.OFFLINE, interface.BASE_URL)
+        championship.ERGAST_BASE_URL = self.server.url
+        championship._client = None
+        championship._limiter = championship.RateLimiter(1000)
+        championship.OFFLINE = False
+        # Plain requests (FastF1's HTTP cache would answer for the stub), cache dir kept out of ~/.cache
+        fastf1.Cache.enable_cache(self.root)
+        fastf1.Cache.set_disabled()
+
+    def tearDown(self):
+        import fastf1
+        from fastf1.ergast import interface
+
+        fastf1.Cache.set_enabled()
+        (championship.ERGAST_BASE_URL, championship._client, championship._limiter,
+         championship.OFFLINE, interface.BASE_URL) = self.saved
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_schedule_flags_sprint_weekends(self):
+        schedule = championship.season_schedule(YEAR, self.root, now=timestamp("2024-05-01"))
+        self.assertEqual(schedule['Round'].tolist(), [1, 2, 3])
+        self.assertEqual(schedule['Sprint'].tolist(), [False, True, False])
+
+    def test_update_results_fetches_races_and_sprints(self):
+        now = timestamp("2024-05-01")
+        results = championship.update_results(YEAR, self.root, now=now)
+        self.assertEqual(sorted(set(zip(results['Round'], results['Kind']))),
+                         [(1, 'race'), (2, 'race'), (2, 'sprint'), (3, 'race')])
+        self.assertEqual(results.loc[results['Code'] == "VER", 'Points'].sum(), 3 * 25 + 8)
+
+        # Everything is stored: later checks make no request
+        self.server.requests.clear()
+        championship.update_results(YEAR, self.root, now=now + 2 * championship.REFRESH_SECONDS)
+        self.assertEqual(self.server.requests, [])
+
+    def test_failed_sprint_request_is_retried(self):
+        championship.update_results(YEAR, self.root, now=timestamp("2024-03-10"))
+
+        # Round 2 has been raced, but its sprint request fails
+        self.server.failing.add(f"/{YEAR}/2/sprint.json")
+        now = timestamp("2024-03-25")
+        results = championship.update_results(YEAR, self.root, now=now)
+        self.assertNotIn((2, 'sprint'), set(zip(results['Round'], results['Kind'])))
+
+        # Once Ergast answers again the sprint is fetched, not treated as "no sprint"
+        self.server.failing.clear()
+        results = championship.update_results(YEAR, self.root, now=now + championship.REFRESH_SECONDS + 1)
+        self.assertIn((2, 'sprint'), set(zip(results['Round'], results['Kind'])))
+        self.assertEqual(results.loc[results['Code'] == "VER", 'Points'].sum(), 2 * 25 + 8)
+
+    def test_stored_table_serves_final_season_from_store(self):
+        after_season = timestamp("2025-01-01")
+        standings = championship.driver_standings(YEAR, self.root, now=after_season)
+        self.assertEqual(standings['Points'].tolist(), [83.0, 61.0, 51.0])
+
+        self.server.requests.clear()
+        again = championship.driver_standings(YEAR, self.root, now=after_season + 10 * championship.REFRESH_SECONDS)
+        self.assertEqual(self.server.requests, [])
+        pd.testing.assert_frame_equal(again, standings)
+
+
+if __name__ == "__main__":
+    unittest.main()